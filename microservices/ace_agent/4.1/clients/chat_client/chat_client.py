@@ -14,36 +14,219 @@ This sample python application showcases how any developer can communicate with
 
 import json
 import argparse
+import codecs
+import os
+import re
+import sys
+import time
 import uuid
 import aiohttp
 import asyncio
 
+# The latency statistics are shared with the other clients
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from latency_stats import summarize_latencies
+
 parser = argparse.ArgumentParser(description="Application to demonstrate interactions with Agent Server")
 parser.add_argument("--host", default="localhost", help="hostname to be used by the server")
 parser.add_argument("--port", default=9000, help="port to be used by the server")
-parser.add_argument("--timeout", default=15, help="Maximum time to wait for response")
+parser.add_argument("--timeout", default=15, type=float, help="Maximum time to wait for response")
+parser.add_argument(
+    "--benchmark",
+    default=None,
+    help="File with one query per line. Sends the queries for all users without interaction and reports latencies",
+)
+parser.add_argument("--users", default=10, type=int, help="Number of concurrent synthetic users in benchmark mode")
+parser.add_argument("--iterations", default=1, type=int, help="Number of times each user sends all benchmark queries")
+parser.add_argument("--report", default=None, help="Write the benchmark report as JSON to this file")
 
 args = parser.parse_args()
 
 user_id = str(uuid.uuid4())
 
 
-async def check_status():
+class ChatStreamDecoder:
+    """
+    Incremental decoder for streamed chat responses. Bytes can be fed in chunks of any size and the decoder returns
+    every JSON object as soon as it is complete. Supports newline delimited JSON, server-sent events (`data: {...}`)
+    and concatenated JSON objects without any delimiter, which is what the plugin servers stream.
+    Text that is not part of a JSON object is skipped and collected in `invalid`.
+    """
+
+    SSE_FIELDS = ("data:", "event:", "id:", "retry:", ":")
+    STRUCTURAL = re.compile(r'[{}\[\]"]')
+    STRING_SPECIAL = re.compile(r'["\\]')
+    VALUE_START = re.compile(r"[{\n]")
+    WHITESPACE = re.compile(r"\s*")
+
+    def __init__(self):
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._buffer = ""
+        self._pos = 0
+        self._value_start = None
+        self._depth = 0
+        self._in_string = False
+        self.invalid = []
+
+    def feed(self, data):
+        """
+        Add the next chunk of the stream and return the list of objects completed by it.
+        """
+        self._buffer += self._utf8.decode(data)
+        values = self._decode(final=False)
+        self._trim()
+        return values
+
+    def close(self):
+        """
+        Signal the end of the stream and return the remaining objects.
+        """
+        self._buffer += self._utf8.decode(b"", final=True)
+        values = self._decode(final=True)
+        if self._value_start is not None:
+            self.invalid.append(self._buffer[self._value_start :])
+        self._buffer = ""
+        self._pos = 0
+        self._value_start = None
+        return values
+
+    def _trim(self):
+        # Drop the consumed part of the buffer so it does not grow with the length of the stream
+        start = self._pos if self._value_start is None else self._value_start
+        if start:
+            self._buffer = self._buffer[start:]
+            self._pos -= start
+            if self._value_start is not None:
+                self._value_start = 0
+
+    def _decode(self, final):
+        values = []
+        while True:
+            if self._value_start is None and not self._skip_framing(final):
+                return values
+            value = self._scan_value()
+            if value is None:
+                return values
+            if value == "[DONE]":
+                continue
+            try:
+                values.append(json.loads(value))
+            except ValueError:
+                self.invalid.append(value)
+
+    def _skip_framing(self, final):
+        """
+        Skip whitespace, SSE fields and invalid text up to the start of the next JSON value.
+        Returns False if more data is needed.
+        """
+        buffer = self._buffer
+        while True:
+            self._pos = self.WHITESPACE.match(buffer, self._pos).end()
+            if self._pos == len(buffer):
+                return False
+            if buffer[self._pos] in "{[":
+                self._value_start = self._pos
+                self._depth = 0
+                self._in_string = False
+                return True
+
+            line_end = buffer.find("\n", self._pos)
+            line = buffer[self._pos :] if line_end < 0 else buffer[self._pos : line_end]
+            if line.startswith("data:"):
+                self._pos += 6 if line.startswith("data: ") else 5
+            elif line.startswith(self.SSE_FIELDS):
+                if line_end < 0 and not final:
+                    return False
+                self._pos = len(buffer) if line_end < 0 else line_end + 1
+            elif line_end < 0 and not final and any(field.startswith(line) for field in self.SSE_FIELDS):
+                # Possibly the beginning of an SSE field that is split across chunks
+                return False
+            else:
+                match = self.VALUE_START.search(buffer, self._pos)
+                if match is None and not final:
+                    return False
+                end = len(buffer) if match is None else match.start()
+                self.invalid.append(buffer[self._pos : end])
+                self._pos = end
+
+    def _scan_value(self):
+        """
+        Scan the current JSON value for its end. Returns the text of the value once it is complete, else None.
+        """
+        buffer = self._buffer
+        pos = self._pos
+        while True:
+            if self._in_string:
+                match = self.STRING_SPECIAL.search(buffer, pos)
+                if match is None:
+                    self._pos = len(buffer)
+                    return None
+                if match.group() == "\\":
+                    if match.end() == len(buffer):
+                        # Wait for the escaped character before continuing
+                        self._pos = match.start()
+                        return None
+                    pos = match.end() + 1
+                else:
+                    self._in_string = False
+                    pos = match.end()
+            else:
+                match = self.STRUCTURAL.search(buffer, pos)
+                if match is None:
+                    self._pos = len(buffer)
+                    return None
+                char = match.group()
+                pos = match.end()
+                if char == '"':
+                    self._in_string = True
+                elif char in "{[":
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._pos = pos
+                        value = buffer[self._value_start : pos]
+                        self._value_start = None
+                        return value
+
+
+async def iter_chat_responses(response):
+    """
+    Yield the decoded chat responses of a streaming or non-streaming /chat response as soon as they are complete.
+    """
+    decoder = ChatStreamDecoder()
+    async for chunk, _ in response.content.iter_chunks():
+        for parsed_chunk in decoder.feed(chunk):
+            yield parsed_chunk
+    for parsed_chunk in decoder.close():
+        yield parsed_chunk
+    for text in decoder.invalid:
+        print(f"Ignored invalid text in chat response: {text.strip()}")
+
+
+def create_session():
+    """
+    Create the HTTP session that is used for all requests. Connections are kept alive and reused between requests.
+    """
+    connector = aiohttp.TCPConnector(limit=max(args.users, 100))
+    return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(args.timeout))
+
+
+async def check_status(session):
     """
     Send a request to the isReady endpoint at the specified host and port.
-    Input: None
+    Input: HTTP session
     Output: True if server is active, else False
     """
 
     # Check if server is active and ready to process queries
     try:
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(args.timeout)) as session:
-            async with session.get(f"http://{args.host}:{args.port}/isReady") as resp:
-                if resp.ok:
-                    print("Server is active and ready to process queries!")
-                else:
-                    print("Server is not ready to process queries. Please ensure that server is running.")
-                    return False
+        async with session.get(f"http://{args.host}:{args.port}/isReady") as resp:
+            if resp.ok:
+                print("Server is active and ready to process queries!")
+            else:
+                print("Server is not ready to process queries. Please ensure that server is running.")
+                return False
     except:
         print("Could not reach server. Exiting.")
         return False
@@ -51,7 +234,7 @@ async def check_status():
     return True
 
 
-async def chat():
+async def chat(session):
     """
     Call the /chat endpoint of Chat Engine and handle the response (whether streaming or non-streaming).
     """
@@ -66,29 +249,23 @@ async def chat():
     # The fields in the current payload are mandatory, but some other information can also be passed.
     # Refer to Nvidia ACE Agent documentation to find out the valid data fields you can send.
     try:
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(args.timeout)) as session:
-            async with session.post(f"http://{args.host}:{args.port}/chat", json=payload) as response:
-                response.raise_for_status()
-
-                # In case of a streaming response, print each chunk as it is received
-                if response.headers.get("Transfer-Encoding") == "chunked":
-                    print("[BOT] ", end="", flush=True)
-                    async for chunk, _ in response.content.iter_chunks():
-                        if not chunk:
-                            break
-
-                        chunk = chunk.decode("utf-8")
-                        parsed_chunk = json.loads(chunk)
-                        if parsed_chunk["Response"]["IsFinal"]:
-                            print("")
-                            return
-                        else:
-                            print(parsed_chunk["Response"]["Text"], end="", flush=True)
-
-                # In case of a JSON response, return the value directly
-                else:
-                    response_data = await response.json()
-                    print(f"[BOT] {response_data['Response']['CleanedText']}")
+        async with session.post(f"http://{args.host}:{args.port}/chat", json=payload) as response:
+            response.raise_for_status()
+
+            # In case of a streaming response, print each chunk as it is received
+            if response.headers.get("Transfer-Encoding") == "chunked":
+                print("[BOT] ", end="", flush=True)
+                async for parsed_chunk in iter_chat_responses(response):
+                    if parsed_chunk["Response"]["IsFinal"]:
+                        print("")
+                        return
+                    else:
+                        print(parsed_chunk["Response"]["Text"], end="", flush=True)
+
+            # In case of a JSON response, return the value directly
+            else:
+                response_data = await response.json()
+                print(f"[BOT] {response_data['Response']['CleanedText']}")
 
     except KeyboardInterrupt:
         print("Force interrupting Chat Engine Sample App")
@@ -98,22 +275,113 @@ async def chat():
         return f"Ran into an error while querying the bot: {e}"
 
 
+class BenchmarkStats:
+    """
+    Latencies of all benchmark requests. The time to first chunk (TTFC) is the time until the first response object
+    was decoded, for a non-streaming response this is the complete response.
+    """
+
+    def __init__(self):
+        self.ttfc_ms = []
+        self.latency_ms = []
+        self.errors = 0
+        self.duration_s = 0.0
+
+    def report(self):
+        requests = len(self.latency_ms)
+        return {
+            "requests": requests,
+            "errors": self.errors,
+            "duration_s": round(self.duration_s, 3),
+            "requests_per_s": round(requests / self.duration_s, 3) if self.duration_s else 0.0,
+            "ttfc_ms": summarize_latencies(self.ttfc_ms),
+            "latency_ms": summarize_latencies(self.latency_ms),
+        }
+
+
+async def timed_query(session, user, query, stats):
+    """
+    Send a single query to the /chat endpoint and record the time to the first chunk and until the response ended.
+    """
+    payload = {"UserId": user, "Query": query}
+    start = time.perf_counter()
+    first_chunk = None
+    try:
+        async with session.post(f"http://{args.host}:{args.port}/chat", json=payload) as response:
+            response.raise_for_status()
+            async for _ in iter_chat_responses(response):
+                if first_chunk is None:
+                    first_chunk = time.perf_counter()
+    except Exception as e:
+        stats.errors += 1
+        print(f"Query '{query}' of user {user} failed: {e}")
+        return
+
+    end = time.perf_counter()
+    stats.ttfc_ms.append(((first_chunk or end) - start) * 1000)
+    stats.latency_ms.append((end - start) * 1000)
+
+
+async def benchmark_user(session, queries, stats):
+    """
+    Send all queries one after the other as a single synthetic user.
+    """
+    user = str(uuid.uuid4())
+    for _ in range(args.iterations):
+        for query in queries:
+            await timed_query(session, user, query, stats)
+
+
+async def benchmark(session):
+    """
+    Send the scripted queries of the benchmark file for all synthetic users concurrently and print the latencies.
+    """
+    with open(args.benchmark, "r", encoding="utf-8") as f:
+        queries = [line.strip() for line in f if line.strip()]
+
+    stats = BenchmarkStats()
+    start = time.perf_counter()
+    await asyncio.gather(*[benchmark_user(session, queries, stats) for _ in range(args.users)])
+    stats.duration_s = time.perf_counter() - start
+
+    report = stats.report()
+    print(
+        f"{report['requests']} requests ({report['errors']} errors) from {args.users} users "
+        f"in {report['duration_s']} s: {report['requests_per_s']} requests/s"
+    )
+    for name in ["ttfc_ms", "latency_ms"]:
+        values = report[name]
+        print(
+            f"{name[:-3].upper():<8} mean {values['mean']:.1f} ms, p50 {values['p50']:.1f} ms, "
+            f"p90 {values['p90']:.1f} ms, p99 {values['p99']:.1f} ms, max {values['max']:.1f} ms"
+        )
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+
+
 async def main():
     """
     Run the Chat Engine sample app functionality.
     Output: None
     """
 
-    server_up = await check_status()
-    if not server_up:
-        exit()
+    async with create_session() as session:
+        server_up = await check_status(session)
+        if not server_up:
+            exit()
 
-    while True:
-        try:
-            await chat()
-        except KeyboardInterrupt:
+        if args.benchmark:
+            await benchmark(session)
             return
 
+        while True:
+            try:
+                await chat(session)
+            except KeyboardInterrupt:
+                return
+
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,99 @@
+"""
+ copyright(c) 2024 NVIDIA Corporation.All rights reserved.
+
+ NVIDIA Corporation and its licensors retain all intellectual property
+ and proprietary rights in and to this software, related documentation
+ and any modifications thereto.Any use, reproduction, disclosure or
+ distribution of this software and related documentation without an express
+ license agreement from NVIDIA Corporation is strictly prohibited.
+"""
+
+"""
+Randomized check of the ChatStreamDecoder of chat_client.py. Random responses are framed as newline delimited JSON,
+server-sent events or concatenated JSON objects, split into chunks of random size and must decode to the same objects.
+
+    python chat_stream_decoder_check.py --trials 3000 --seed 1
+"""
+
+import argparse
+import json
+import random
+import sys
+
+parser = argparse.ArgumentParser(description="Randomized re-chunking check of the chat stream decoder")
+parser.add_argument("--trials", default=3000, type=int, help="Number of random streams to decode")
+parser.add_argument("--seed", default=1, type=int, help="Seed of the random streams")
+parser.add_argument("--max-chunk-size", default=40, type=int, help="Maximum size in bytes of a chunk")
+args = parser.parse_args()
+
+# chat_client parses the command line on import, do not pass it the arguments of this script
+sys.argv = sys.argv[:1]
+from chat_client import ChatStreamDecoder  # noqa: E402
+
+FRAMINGS = ["ndjson", "sse", "concatenated"]
+# Texts with characters that need escaping, look like JSON structure or are encoded in several bytes
+TEXTS = ["hello", 'quote " and \\ back', "brace } { [ ]", "data: {", "ünïcødé 🚀", "new\nline", ""]
+
+
+def random_response(rng, index):
+    return {
+        "Response": {
+            "Text": rng.choice(TEXTS) + str(index),
+            "IsFinal": rng.random() < 0.2,
+            "Json": {"list": [1, {"none": None}], "number": rng.random()},
+        }
+    }
+
+
+def frame(rng, responses, framing):
+    parts = []
+    for response in responses:
+        text = json.dumps(response, ensure_ascii=rng.random() < 0.5)
+        if framing == "ndjson":
+            parts.append(text + "\n")
+        elif framing == "sse":
+            comment = ": ping\n" if rng.random() < 0.2 else ""
+            parts.append(f"{comment}event: message\ndata: {text}\n\n")
+        else:
+            parts.append(text)
+    if framing == "sse":
+        parts.append("data: [DONE]\n\n")
+    return "".join(parts).encode("utf-8")
+
+
+def decode_in_chunks(rng, data, max_chunk_size):
+    decoder = ChatStreamDecoder()
+    values = []
+    position = 0
+    while position < len(data):
+        size = rng.randint(1, max_chunk_size)
+        values.extend(decoder.feed(data[position : position + size]))
+        position += size
+    values.extend(decoder.close())
+    return values, decoder.invalid
+
+
+def main():
+    rng = random.Random(args.seed)
+    failures = 0
+    for trial in range(args.trials):
+        framing = rng.choice(FRAMINGS)
+        responses = [random_response(rng, i) for i in range(rng.randint(0, 12))]
+        data = frame(rng, responses, framing)
+        values, invalid = decode_in_chunks(rng, data, args.max_chunk_size)
+        if values != responses or invalid:
+            failures += 1
+            print(f"FAIL trial {trial} ({framing}): {data!r}\n  decoded: {values}\n  invalid: {invalid}")
+
+    # Text between the objects is skipped and reported, the objects around it are still decoded
+    values, invalid = decode_in_chunks(rng, b'{"a": 1}Internal error in RAG stream{"b": 2}', args.max_chunk_size)
+    if values != [{"a": 1}, {"b": 2}] or not invalid:
+        failures += 1
+        print(f"FAIL text between objects: decoded {values}, invalid {invalid}")
+
+    print(f"{args.trials + 1 - failures} of {args.trials + 1} streams decoded correctly")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022-2024 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+
+"""
+Benchmark for creating action handlers and driving them through their states, as the event client does for
+every Start* event of a replayed event log.
+
+    python action_handler_benchmark.py --handlers 10000
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+from event_client import ActionHandler, InternalEvent, TimerActionHandler, new_event, new_uuid
+
+
+class _Element:
+    """Stands in for the TUI element of an action"""
+
+    def add_class(self, *names: str) -> "_Element":
+        return self
+
+    def remove_class(self, *names: str) -> "_Element":
+        return self
+
+    def update(self, renderable: Any = "") -> None:
+        pass
+
+
+class _App:
+    """Provides the parts of the app that the handlers use, without a terminal"""
+
+    def __init__(self) -> None:
+        self.element = _Element()
+
+    def query_one(self, selector: str, expect_type: Any = None) -> _Element:
+        return self.element
+
+    def schedule_action(self, handler: ActionHandler) -> None:
+        pass
+
+    def send_events(self, event: Any) -> None:
+        pass
+
+
+def create_handlers(app: _App, count: int) -> List[TimerActionHandler]:
+    return [TimerActionHandler(False, app) for _ in range(count)]
+
+
+def create_events(count: int) -> List[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]]:
+    """Start, Started and Finished event of one timer action per handler"""
+    events = []
+    for _ in range(count):
+        start = new_event("StartTimerBotAction", action_uid=new_uuid(), duration=1, timer_name="benchmark")
+        action_uid = start["action_uid"]
+        started = new_event("TimerBotActionStarted", action_uid=action_uid)
+        finished = new_event("TimerBotActionFinished", action_uid=action_uid, is_success=True)
+        events.append((start, started, finished))
+    return events
+
+
+def drive_handlers(
+    handlers: List[TimerActionHandler], events: List[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]]
+) -> None:
+    tick = InternalEvent("tick")
+    for handler, (start, started, finished) in zip(handlers, events):
+        handler.start(start)
+        handler.started(started)
+        handler.tick(tick)
+        handler.finished(finished)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark for creating and transitioning action handlers")
+    parser.add_argument("--handlers", default=10000, type=int, help="Number of handlers to create")
+    args = parser.parse_args(argv)
+    app = _App()
+
+    gc.collect()
+    start = time.perf_counter()
+    handlers = create_handlers(app, args.handlers)
+    create_s = time.perf_counter() - start
+
+    events = create_events(args.handlers)
+    start = time.perf_counter()
+    drive_handlers(handlers, events)
+    drive_s = time.perf_counter() - start
+
+    del handlers
+    gc.collect()
+    tracemalloc.start()
+    handlers = create_handlers(app, args.handlers)
+    memory_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"Handlers:            {args.handlers}")
+    print(f"Create:              {create_s * 1000:.1f} ms ({create_s / args.handlers * 1e6:.2f} us per handler)")
+    print(f"Start/tick/finish:   {drive_s * 1000:.1f} ms ({drive_s / args.handlers * 1e6:.2f} us per handler)")
+    print(f"Memory:              {memory_bytes / args.handlers / 1024:.2f} KB per handler")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,26 +15,36 @@
 ########################################################################################################################
 
 import asyncio
+import heapq
+import io
+import itertools
 import json
 import logging
+import os
+import sys
+import time
 import uuid
 from abc import ABC, abstractmethod
 from collections import deque, namedtuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Deque, Dict, List, Optional, Tuple, Type, Union
+from typing import IO, Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Type, Union
 from uuid import uuid4
 
 import redis.asyncio as redis
+from redis.exceptions import ResponseError
 import typer
 from rich import print
 from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal, Vertical
 from textual.reactive import reactive
+from textual.timer import Timer
 from textual.widget import Widget
 from textual.widgets import (
     Button,
+    DataTable,
     Footer,
     Header,
     Input,
@@ -44,10 +54,19 @@ from textual.widgets import (
     Static,
     TextLog,
 )
-from textual.worker import Worker, WorkerState
-from transitions import Machine
 from typing_extensions import Annotated
 
+# The latency statistics are shared with the other clients
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from latency_stats import percentile, summarize_latencies
+from umim_schemas import ValidationError, decode_event, decode_events
+
+try:
+    import zstandard
+except ImportError:
+    # Only needed for zstd compressed session logs
+    zstandard = None
+
 logging.basicConfig(filename="umim_compliance_errors.txt", level=logging.WARNING)
 logger = logging.getLogger("ace_sim")
 
@@ -58,11 +77,21 @@ create_pipeline = False
 app_in_active_mode = False
 redis_host = "localhost"
 redis_port = 6379
+event_provider_name = "redis"
+event_batch_size = 100
+event_consumer_group: Optional[str] = None
+event_consumer_name: Optional[str] = None
 ui_sidebar_open = False
 
 SYSTEM_EVENTS_STREAM = "ace_agent_system_events"
+# Source of all events created by this app
+SOURCE_UID = "umim_tui_app"
 
 MOTION_DURATION = 20
+# Seconds between two ticks of a running action that needs to be ticked regularly
+TICK_INTERVAL = 0.1
+# Number of finished actions that are remembered to ignore their late events (e.g. the echo of our own Started)
+FINISHED_ACTIONS_TO_REMEMBER = 1000
 
 EVENT_FIELDS_TO_HIDE = {
     "uid",
@@ -86,6 +115,9 @@ EVENT_FIELDS_TO_HIDE = {
 
 
 class EventProvider(ABC):
+    # Whether received events are acknowledged automatically with the next receive (for providers that track delivery)
+    auto_ack = True
+
     @abstractmethod
     async def receive_events(self, timeout_ms: Optional[int] = 500) -> List[str]:
         """Receive incoming events. Returns when it received one or more events"""
@@ -96,39 +128,246 @@ class EventProvider(ABC):
         """Publishes the event"""
         raise NotImplementedError
 
+    async def send_events_batch(self, events: List[Tuple[str, Union[str, Dict[str, Any]]]]) -> None:
+        """Publishes a batch of (channel_id, event_data) tuples in the given order"""
+        for channel_id, event_data in events:
+            await self.send_event(channel_id, event_data)
+
+    async def get_lag_ms(self) -> Dict[str, int]:
+        """Returns how far (in ms) the reader is behind the latest event of each channel"""
+        return {}
+
+    async def clear_channel(self, channel_id: str) -> None:
+        """Removes all events of the channel"""
+        raise NotImplementedError
+
+    async def receive_events_by_channel(self, timeout_ms: Optional[int] = 500) -> Dict[str, List[str]]:
+        """Like `receive_events` but returns the received events grouped by channel"""
+        raise NotImplementedError
+
+    def add_channel(self, channel_id: str, discard_existing_events: bool = True) -> None:
+        """Starts receiving the events of another channel"""
+        raise NotImplementedError
+
+    def remove_channel(self, channel_id: str) -> None:
+        """Stops receiving the events of the channel"""
+        raise NotImplementedError
+
+    def pop_unacked_event_ids(self) -> Dict[str, List[bytes]]:
+        """Returns the IDs of the received events that are not acknowledged yet and stops tracking them"""
+        return {}
+
+    async def ack_events(self, event_ids: Optional[Dict[str, List[bytes]]] = None) -> None:
+        """Acknowledges the given events, all received events if no IDs are given"""
+        pass
+
+
+def _flatten_events(events_by_channel: Dict[str, List[str]]) -> List[str]:
+    return [event for events in events_by_channel.values() for event in events]
+
+
+def _stream_id_to_ms(stream_id: str) -> int:
+    """Returns the millisecond timestamp part of a redis stream entry ID"""
+    return int(stream_id.split("-")[0])
+
 
 class RedisEventProvider(EventProvider):
+    """
+    Event provider based on redis streams.
+
+    By default every provider reads all events of its channels (XREAD). If a `consumer_group` is given, the
+    provider joins that group under `consumer_name` instead (XREADGROUP) so that several consumers can share the
+    events of a stream. Events returned by `receive_events` are acknowledged with the next call of
+    `receive_events` (or explicitly with `ack_events` if `auto_ack` is disabled). After a restart a consumer first
+    receives the events it had read but not acknowledged, and events that were left pending by other consumers for
+    longer than `claim_min_idle_ms` are claimed.
+    """
+
     def __init__(
         self,
         redis_host: str,
         redis_port: int,
         channels: List[str],
         discard_existing_events: bool = True,
+        batch_size: Optional[int] = None,
+        consumer_group: Optional[str] = None,
+        consumer_name: Optional[str] = None,
+        claim_min_idle_ms: int = 30000,
     ):
         super().__init__()
         self.redis: redis.Redis = redis.Redis(host=redis_host, port=redis_port)
+        self.batch_size = batch_size
+        self.consumer_group = consumer_group
+        self.consumer_name = consumer_name or f"consumer_{uuid.uuid4()}"
+        self.claim_min_idle_ms = claim_min_idle_ms
+        self._discard_existing_events = discard_existing_events
         self._channel_state: Dict[str, str] = dict(
             map(lambda c: (c, "$" if discard_existing_events else "0"), channels)
         )
+        self._groups_created = False
+        self._read_own_pending = True
+        # Last pending entry handed out per channel, so that the pending events are re-delivered only once
+        self._pending_cursor: Dict[str, str] = {channel: "0" for channel in channels}
+        self._last_claim = 0.0
+        self._unacked: Dict[str, List[bytes]] = {}
 
     async def receive_events(self, timeout_ms: Optional[int] = 500) -> List[str]:
         """Receive incoming events. Returns when it received one or more events"""
+        return _flatten_events(await self.receive_events_by_channel(timeout_ms))
+
+    async def receive_events_by_channel(self, timeout_ms: Optional[int] = 500) -> Dict[str, List[str]]:
+        """Receive incoming events of all channels with a single read. Returns when it received one or more events"""
         if timeout_ms is not None and timeout_ms < 100:
             logger.warning(f"Redis timeout resolution is about 100ms, but a timeout of {timeout_ms}ms was given.")
 
-        result = await self.redis.xread(streams=self._channel_state, block=timeout_ms)
-        event_list: List[str] = []
+        if self.consumer_group is not None:
+            return await self._receive_group_events(timeout_ms)
+
+        await self._resolve_latest_ids()
+        result = await self.redis.xread(streams=self._channel_state, count=self.batch_size, block=timeout_ms)
+        return self._collect_events(result)
+
+    def add_channel(self, channel_id: str, discard_existing_events: bool = True) -> None:
+        """Starts receiving the events of another channel (not supported for consumer groups)"""
+        assert self.consumer_group is None, "Channels cannot be added to a consumer group provider"
+        self._channel_state.setdefault(channel_id, "$" if discard_existing_events else "0")
+
+    def remove_channel(self, channel_id: str) -> None:
+        """Stops receiving the events of the channel (not supported for consumer groups)"""
+        assert self.consumer_group is None, "Channels cannot be removed from a consumer group provider"
+        self._channel_state.pop(channel_id, None)
+
+    async def _resolve_latest_ids(self) -> None:
+        """
+        Replaces "$" by the ID of the latest entry of the channel. Otherwise events that are added to one channel
+        while a read returns the events of another channel would be lost.
+        """
+        channels = [channel for channel, last_id in self._channel_state.items() if last_id == "$"]
+        if not channels:
+            return
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for channel in channels:
+                pipe.xinfo_stream(channel)
+            results = await pipe.execute(raise_on_error=False)
+        for channel, info in zip(channels, results):
+            if channel not in self._channel_state:
+                # Removed while the IDs were resolved
+                continue
+            # Channels that do not exist yet have no events to skip
+            self._channel_state[channel] = "0" if isinstance(info, Exception) else info["last-generated-id"].decode()
+
+    def _collect_events(self, result: List[Any], track_unacked: bool = False) -> Dict[str, List[str]]:
+        events_by_channel: Dict[str, List[str]] = {}
+
+        for channel, entries in result:
+            # Entries that were deleted from the stream while pending are returned without fields
+            entries = [(event_id, fields) for event_id, fields in entries if fields]
+            if not entries:
+                continue
+            channel_id = channel.decode()
+            events_by_channel.setdefault(channel_id, []).extend(
+                value.decode() for _, fields in entries for value in fields.values()
+            )
+            if channel_id in self._channel_state:
+                # Do not add the channel again if it was removed while reading
+                self._channel_state[channel_id] = entries[-1][0].decode()
+            if track_unacked:
+                self._unacked.setdefault(channel_id, []).extend(event_id for event_id, _ in entries)
+
+        return events_by_channel
+
+    async def _ensure_consumer_groups(self) -> None:
+        if self._groups_created:
+            return
 
-        for channel in result:
-            channel_id = str(channel[0].decode())
-            for event_id, value in channel[1]:
-                for key in value.keys():
-                    event_data = value[key].decode()
-                    event_list.append(event_data)
+        start_id = "$" if self._discard_existing_events else "0"
+        for channel in self._channel_state:
+            try:
+                await self.redis.xgroup_create(channel, self.consumer_group, id=start_id, mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+        self._groups_created = True
+
+    async def _claim_stale_events(self) -> Dict[str, List[str]]:
+        now = time.monotonic()
+        if now - self._last_claim < self.claim_min_idle_ms / 1000:
+            return {}
+        self._last_claim = now
+
+        events_by_channel: Dict[str, List[str]] = {}
+        for channel in self._channel_state:
+            result = await self.redis.xautoclaim(
+                channel,
+                self.consumer_group,
+                self.consumer_name,
+                self.claim_min_idle_ms,
+                start_id="0-0",
+                count=self.batch_size,
+            )
+            events_by_channel.update(self._collect_events([(channel.encode(), result[1])], track_unacked=True))
+        return events_by_channel
+
+    async def _receive_group_events(self, timeout_ms: Optional[int]) -> Dict[str, List[str]]:
+        await self._ensure_consumer_groups()
+        if self.auto_ack:
+            await self.ack_events()
+
+        while self._read_own_pending:
+            # Re-deliver events this consumer had read but not acknowledged before (e.g. before a crash)
+            result = await self.redis.xreadgroup(
+                self.consumer_group,
+                self.consumer_name,
+                streams=self._pending_cursor,
+                count=self.batch_size,
+            )
+            result = [(channel, entries) for channel, entries in result if entries]
+            if not result:
+                self._read_own_pending = False
+                break
+            for channel, entries in result:
+                self._pending_cursor[channel.decode()] = entries[-1][0].decode()
+            events_by_channel = self._collect_events(result, track_unacked=True)
+            if events_by_channel:
+                return events_by_channel
+
+        events_by_channel = await self._claim_stale_events()
+        if events_by_channel:
+            return events_by_channel
+
+        result = await self.redis.xreadgroup(
+            self.consumer_group,
+            self.consumer_name,
+            streams={channel: ">" for channel in self._channel_state},
+            count=self.batch_size,
+            block=timeout_ms,
+        )
+        return self._collect_events(result, track_unacked=True)
+
+    def pop_unacked_event_ids(self) -> Dict[str, List[bytes]]:
+        """Returns the IDs of the received events that are not acknowledged yet and stops tracking them"""
+        unacked, self._unacked = self._unacked, {}
+        return unacked
+
+    async def ack_events(self, event_ids: Optional[Dict[str, List[bytes]]] = None) -> None:
+        """
+        Acknowledge the given events, by default all events returned by `receive_events` so far
+        (consumer group mode only)
+        """
+        if event_ids is None:
+            event_ids = self.pop_unacked_event_ids()
+        if not event_ids:
+            return
 
-                self._channel_state[channel_id] = event_id.decode()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for channel, ids in event_ids.items():
+                pipe.xack(channel, self.consumer_group, *ids)
+            await pipe.execute()
 
-        return event_list
+    async def clear_channel(self, channel_id: str) -> None:
+        """Removes all events of the channel"""
+        await self.redis.delete(channel_id)
 
     async def send_event(self, channel_id: str, event_data: Union[str, Dict[str, Any]]) -> None:
         """Publishes the event"""
@@ -138,19 +377,693 @@ class RedisEventProvider(EventProvider):
 
         await self.redis.xadd(channel_id, {"event": event_data.encode()})
 
+    async def send_events_batch(self, events: List[Tuple[str, Union[str, Dict[str, Any]]]]) -> None:
+        """Publishes a batch of (channel_id, event_data) tuples in the given order using a single pipeline"""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for channel_id, event_data in events:
+                if isinstance(event_data, dict):
+                    event_data = json.dumps(event_data)
+                pipe.xadd(channel_id, {"event": event_data.encode()})
+            await pipe.execute()
+
+    async def get_lag_ms(self) -> Dict[str, int]:
+        """Returns how far (in ms) the last read event is behind the newest event of each channel"""
+        channels = list(self._channel_state.keys())
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for channel in channels:
+                pipe.xinfo_stream(channel)
+            results = await pipe.execute(raise_on_error=False)
+
+        lag: Dict[str, int] = {}
+        for channel, info in zip(channels, results):
+            last_read_id = self._channel_state[channel]
+            if isinstance(info, Exception) or last_read_id == "$":
+                lag[channel] = 0
+                continue
+            last_generated_id = info["last-generated-id"].decode()
+            lag[channel] = max(0, _stream_id_to_ms(last_generated_id) - _stream_id_to_ms(last_read_id))
+        return lag
+
+
+class InMemoryEventBroker:
+    """In-process event streams shared by all InMemoryEventProviders using the same broker"""
+
+    def __init__(self) -> None:
+        self.streams: Dict[str, List[str]] = {}
+        # Number of events removed from the front of each stream. Readers keep absolute positions.
+        self.trimmed: Dict[str, int] = {}
+        self._new_events: Optional[asyncio.Event] = None
+
+    def append(self, channel_id: str, events: List[str]) -> None:
+        self.streams.setdefault(channel_id, []).extend(events)
+        if self._new_events is not None:
+            self._new_events.set()
+            self._new_events = None
+
+    def read(self, channel_id: str, position: int, count: Optional[int] = None) -> Tuple[List[str], int]:
+        """Returns the events after the absolute position and the new position"""
+        stream = self.streams.get(channel_id, [])
+        start = max(position - self.trimmed.get(channel_id, 0), 0)
+        events = stream[start : start + count] if count else stream[start:]
+        return events, self.trimmed.get(channel_id, 0) + start + len(events)
+
+    def end_position(self, channel_id: str) -> int:
+        return self.trimmed.get(channel_id, 0) + len(self.streams.get(channel_id, []))
+
+    def clear(self, channel_id: str) -> None:
+        self.trimmed[channel_id] = self.end_position(channel_id)
+        self.streams[channel_id] = []
+
+    async def wait_for_events(self, timeout_ms: Optional[int]) -> None:
+        """Returns when new events were appended to any stream or the timeout expired"""
+        if self._new_events is None:
+            self._new_events = asyncio.Event()
+        # asyncio.wait_for can swallow a cancellation that arrives together with the event (before Python 3.12)
+        waiter = asyncio.ensure_future(self._new_events.wait())
+        try:
+            await asyncio.wait([waiter], timeout=timeout_ms / 1000 if timeout_ms is not None else None)
+        finally:
+            waiter.cancel()
+
+
+_default_in_memory_broker = InMemoryEventBroker()
+
+
+class InMemoryEventProvider(EventProvider):
+    """
+    Event provider based on in-process asyncio streams. Useful for tests and for benchmarking the action
+    handlers without any broker round-trip. All providers sharing a broker see each others events.
+    """
+
+    def __init__(
+        self,
+        channels: List[str],
+        discard_existing_events: bool = True,
+        batch_size: Optional[int] = None,
+        broker: Optional[InMemoryEventBroker] = None,
+    ):
+        super().__init__()
+        self.broker = broker or _default_in_memory_broker
+        self.batch_size = batch_size
+        self._channel_state: Dict[str, int] = {
+            c: self.broker.end_position(c) if discard_existing_events else 0 for c in channels
+        }
+
+    def _read_new_events(self) -> Dict[str, List[str]]:
+        events_by_channel: Dict[str, List[str]] = {}
+        for channel_id, position in self._channel_state.items():
+            events, self._channel_state[channel_id] = self.broker.read(channel_id, position, self.batch_size)
+            if events:
+                events_by_channel[channel_id] = events
+        return events_by_channel
+
+    async def receive_events(self, timeout_ms: Optional[int] = 500) -> List[str]:
+        """Receive incoming events. Returns when it received one or more events"""
+        return _flatten_events(await self.receive_events_by_channel(timeout_ms))
+
+    async def receive_events_by_channel(self, timeout_ms: Optional[int] = 500) -> Dict[str, List[str]]:
+        """Receive incoming events of all channels. Returns when it received one or more events"""
+        events_by_channel = self._read_new_events()
+        if not events_by_channel:
+            await self.broker.wait_for_events(timeout_ms)
+            events_by_channel = self._read_new_events()
+        return events_by_channel
+
+    def add_channel(self, channel_id: str, discard_existing_events: bool = True) -> None:
+        """Starts receiving the events of another channel"""
+        self._channel_state.setdefault(
+            channel_id, self.broker.end_position(channel_id) if discard_existing_events else 0
+        )
+
+    def remove_channel(self, channel_id: str) -> None:
+        """Stops receiving the events of the channel"""
+        self._channel_state.pop(channel_id, None)
+
+    async def send_event(self, channel_id: str, event_data: Union[str, Dict[str, Any]]) -> None:
+        """Publishes the event"""
+        if isinstance(event_data, dict):
+            event_data = json.dumps(event_data)
+        self.broker.append(channel_id, [event_data])
+
+    async def send_events_batch(self, events: List[Tuple[str, Union[str, Dict[str, Any]]]]) -> None:
+        """Publishes a batch of (channel_id, event_data) tuples in the given order"""
+        for channel_id, event_data in events:
+            if isinstance(event_data, dict):
+                event_data = json.dumps(event_data)
+            self.broker.append(channel_id, [event_data])
+
+    async def clear_channel(self, channel_id: str) -> None:
+        """Removes all events of the channel"""
+        self.broker.clear(channel_id)
+
+
+class FileEventProvider(EventProvider):
+    """
+    Event provider that keeps every channel as an append-only log file (one JSON event per line) in
+    `log_dir`. Can be used as a local broker stand-in to exchange events between processes without Redis.
+
+    The read offset of a channel is kept together with the first line of its log. A log that was cleared and
+    rewritten starts with another event (with another uid), so it is read from the beginning again even if it
+    already grew past the old offset.
+    """
+
+    # Number of bytes of the first line that identify a log
+    LOG_ID_SIZE = 256
+
+    def __init__(
+        self,
+        log_dir: Union[str, Path],
+        channels: List[str],
+        discard_existing_events: bool = True,
+        batch_size: Optional[int] = None,
+        poll_interval_ms: int = 20,
+    ):
+        super().__init__()
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.poll_interval_ms = poll_interval_ms
+        self._channel_state: Dict[str, int] = {c: self._log_size(c) if discard_existing_events else 0 for c in channels}
+        self._log_ids: Dict[str, bytes] = {c: self._log_id(c) for c in channels}
+
+    def _log_path(self, channel_id: str) -> Path:
+        return self.log_dir / f"{channel_id}.log"
+
+    def _log_size(self, channel_id: str) -> int:
+        try:
+            return self._log_path(channel_id).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _log_id(self, channel_id: str) -> bytes:
+        try:
+            with open(self._log_path(channel_id), "rb") as f:
+                return f.readline(self.LOG_ID_SIZE)
+        except FileNotFoundError:
+            return b""
+
+    def _read_new_events(self) -> Dict[str, List[str]]:
+        events_by_channel: Dict[str, List[str]] = {}
+        for channel_id, offset in self._channel_state.items():
+            lines: List[bytes] = []
+            try:
+                with open(self._log_path(channel_id), "rb") as f:
+                    log_id = f.readline(self.LOG_ID_SIZE)
+                    if offset and (log_id != self._log_ids.get(channel_id) or f.seek(0, io.SEEK_END) < offset):
+                        # The log was cleared (and maybe rewritten), start from the beginning
+                        offset = 0
+                    self._log_ids[channel_id] = log_id
+                    f.seek(offset)
+                    # Read at most batch_size lines instead of the whole backlog on every poll
+                    for line in itertools.islice(f, self.batch_size or None):
+                        # Only consume complete lines, a writer might still be appending to the last one
+                        if not line.endswith(b"\n"):
+                            break
+                        lines.append(line)
+            except FileNotFoundError:
+                # The log was cleared
+                self._channel_state[channel_id] = 0
+                continue
+
+            if lines:
+                events_by_channel[channel_id] = [line.decode().rstrip("\n") for line in lines]
+            self._channel_state[channel_id] = offset + sum(len(line) for line in lines)
+        return events_by_channel
+
+    async def receive_events(self, timeout_ms: Optional[int] = 500) -> List[str]:
+        """Receive incoming events. Returns when it received one or more events"""
+        return _flatten_events(await self.receive_events_by_channel(timeout_ms))
+
+    async def receive_events_by_channel(self, timeout_ms: Optional[int] = 500) -> Dict[str, List[str]]:
+        """Receive incoming events of all channels. Returns when it received one or more events"""
+        deadline = time.monotonic() + timeout_ms / 1000 if timeout_ms is not None else None
+        while True:
+            events_by_channel = self._read_new_events()
+            if events_by_channel or (deadline is not None and time.monotonic() >= deadline):
+                return events_by_channel
+            await asyncio.sleep(self.poll_interval_ms / 1000)
+
+    def add_channel(self, channel_id: str, discard_existing_events: bool = True) -> None:
+        """Starts receiving the events of another channel"""
+        if channel_id not in self._channel_state:
+            self._channel_state[channel_id] = self._log_size(channel_id) if discard_existing_events else 0
+            self._log_ids[channel_id] = self._log_id(channel_id)
+
+    def remove_channel(self, channel_id: str) -> None:
+        """Stops receiving the events of the channel"""
+        self._channel_state.pop(channel_id, None)
+        self._log_ids.pop(channel_id, None)
+
+    async def send_event(self, channel_id: str, event_data: Union[str, Dict[str, Any]]) -> None:
+        """Publishes the event"""
+        await self.send_events_batch([(channel_id, event_data)])
+
+    async def send_events_batch(self, events: List[Tuple[str, Union[str, Dict[str, Any]]]]) -> None:
+        """Publishes a batch of (channel_id, event_data) tuples in the given order with one write per channel"""
+        lines_per_channel: Dict[str, List[str]] = {}
+        for channel_id, event_data in events:
+            if isinstance(event_data, dict):
+                event_data = json.dumps(event_data)
+            # Line breaks in valid JSON can only be whitespace between tokens
+            lines_per_channel.setdefault(channel_id, []).append(event_data.replace("\n", " ") + "\n")
+
+        for channel_id, lines in lines_per_channel.items():
+            with open(self._log_path(channel_id), "ab") as f:
+                f.write("".join(lines).encode())
+
+    async def clear_channel(self, channel_id: str) -> None:
+        """Removes all events of the channel"""
+        self._log_path(channel_id).unlink(missing_ok=True)
+
+
+class EventConsumer:
+    """
+    Long-lived consumer that keeps a single blocking read open on an event provider and hands the
+    received batches to the application through an asyncio queue (of at most `max_queue_size` batches).
+
+    The consumer reads ahead of the application, so it disables the automatic acknowledgement of the provider.
+    Call `ack_events` once the events returned by `get_events` have been processed.
+    """
+
+    def __init__(self, event_provider: EventProvider, timeout_ms: Optional[int] = 500, max_queue_size: int = 0):
+        self.event_provider = event_provider
+        self.event_provider.auto_ack = False
+        self.timeout_ms = timeout_ms
+        self.queue: "asyncio.Queue[Tuple[List[str], Dict[str, List[bytes]]]]" = asyncio.Queue(max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._unacked: Dict[str, List[bytes]] = {}
+
+    def start(self) -> None:
+        """Start the consumer task (needs to be called from within a running event loop)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the consumer task. Events already in the queue are kept"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                events = await self.event_provider.receive_events(self.timeout_ms)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Receiving events failed: {e}")
+                await asyncio.sleep((self.timeout_ms or 500) / 1000)
+                continue
+
+            if events:
+                await self.queue.put((events, self.event_provider.pop_unacked_event_ids()))
+
+    async def get_events(self) -> List[str]:
+        """Wait for the next batch and return its events together with the events of all batches already queued"""
+        batches = [await self.queue.get()]
+        while not self.queue.empty():
+            batches.append(self.queue.get_nowait())
+
+        events: List[str] = []
+        for batch_events, event_ids in batches:
+            events.extend(batch_events)
+            for channel, ids in event_ids.items():
+                self._unacked.setdefault(channel, []).extend(ids)
+        return events
+
+    async def ack_events(self) -> None:
+        """Acknowledge the events returned by `get_events` so far"""
+        event_ids, self._unacked = self._unacked, {}
+        try:
+            await self.event_provider.ack_events(event_ids)
+        except Exception as e:
+            # Unacknowledged events stay pending and are delivered again after a restart
+            logger.error(f"Acknowledging events failed: {e}")
+
+    async def get_lag_ms(self) -> Dict[str, int]:
+        """Returns how far (in ms) the consumer is behind the latest event of each channel"""
+        return await self.event_provider.get_lag_ms()
+
+
+@dataclass
+class PublisherStats:
+    batches: int = 0
+    events: int = 0
+    failed_events: int = 0
+    max_batch_size: int = 0
+    last_flush_latency_ms: float = 0.0
+    max_flush_latency_ms: float = 0.0
+    total_flush_latency_ms: float = 0.0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.events / self.batches if self.batches else 0.0
+
+    @property
+    def mean_flush_latency_ms(self) -> float:
+        return self.total_flush_latency_ms / self.batches if self.batches else 0.0
+
+
+class EventPublisher:
+    """
+    Background publisher that coalesces all events queued within `flush_interval_ms` into a single
+    `send_events_batch` call of the event provider. Events are published in the order they were queued.
+    The flush latency is measured from queuing the oldest event of a batch until the batch was sent.
+    """
+
+    def __init__(self, event_provider: EventProvider, flush_interval_ms: float = 5, max_batch_size: int = 500):
+        self.event_provider = event_provider
+        self.flush_interval_ms = flush_interval_ms
+        self.max_batch_size = max_batch_size
+        self.stats = PublisherStats()
+        self.queue: "asyncio.Queue[Tuple[float, str, Union[str, Dict[str, Any]]]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        # Set while events are queued. The events stay in the queue until they are sent under the lock, so that
+        # `flush` and `stop` never overtake or drop a batch of the flusher task.
+        self._queued = asyncio.Event()
+        self._lock = asyncio.Lock()
+
+    def start(self) -> None:
+        """Start the flusher task (needs to be called from within a running event loop)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher task and publish all events that are still queued"""
+        if self._task is not None:
+            # The task is not sending while the lock is held, so no batch is cancelled half way
+            async with self._lock:
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+            self._task = None
+        await self.flush()
+
+    def publish(self, channel_id: str, event_data: Union[str, Dict[str, Any]]) -> None:
+        """Queue the event to be published with the next batch"""
+        self.queue.put_nowait((time.perf_counter(), channel_id, event_data))
+        self._queued.set()
+
+    def send_events_batch(self, events: List[Tuple[str, Union[str, Dict[str, Any]]]]) -> None:
+        """Queue a list of (channel_id, event_data) tuples to be published with the next batch"""
+        for channel_id, event_data in events:
+            self.publish(channel_id, event_data)
+
+    async def flush(self) -> None:
+        """Publish all queued events right away"""
+        async with self._lock:
+            while not self.queue.empty():
+                await self._send_batch(self._take_batch())
+
+    def _take_batch(self) -> List[Tuple[float, str, Union[str, Dict[str, Any]]]]:
+        batch = []
+        while not self.queue.empty() and len(batch) < self.max_batch_size:
+            batch.append(self.queue.get_nowait())
+        if self.queue.empty():
+            self._queued.clear()
+        return batch
+
+    async def _send_batch(self, batch: List[Tuple[float, str, Union[str, Dict[str, Any]]]]) -> None:
+        try:
+            await self.event_provider.send_events_batch([(channel_id, data) for _, channel_id, data in batch])
+        except Exception as e:
+            logger.error(f"Publishing {len(batch)} events failed: {e}")
+            self.stats.failed_events += len(batch)
+            return
+
+        latency_ms = (time.perf_counter() - batch[0][0]) * 1000
+        self.stats.batches += 1
+        self.stats.events += len(batch)
+        self.stats.max_batch_size = max(self.stats.max_batch_size, len(batch))
+        self.stats.last_flush_latency_ms = latency_ms
+        self.stats.max_flush_latency_ms = max(self.stats.max_flush_latency_ms, latency_ms)
+        self.stats.total_flush_latency_ms += latency_ms
+
+    async def _run(self) -> None:
+        while True:
+            await self._queued.wait()
+            # Give closely following events the chance to join the batch
+            await asyncio.sleep(self.flush_interval_ms / 1000)
+            async with self._lock:
+                batch = self._take_batch()
+                if batch:
+                    await self._send_batch(batch)
+
+
+_event_providers: Dict[str, Callable[..., EventProvider]] = {}
+
+
+def register_event_provider(name: str, factory: Callable[..., EventProvider]) -> None:
+    """
+    Register an event provider. The factory is called with
+    (host, port, channels, discard_existing_events, **provider_options)
+    """
+    _event_providers[name] = factory
+
+
+register_event_provider("redis", RedisEventProvider)
+register_event_provider(
+    "memory",
+    lambda host, port, channels, discard_existing_events, **options: InMemoryEventProvider(
+        channels, discard_existing_events, **options
+    ),
+)
+# For the file provider the host is the directory that contains the channel logs
+register_event_provider(
+    "file",
+    lambda host, port, channels, discard_existing_events, **options: FileEventProvider(
+        host or ".", channels, discard_existing_events, **options
+    ),
+)
+
 
 def event_provider_factory(
     provider_name: str,
     host: str,
     port: int,
-    channels=List[str],
+    channels: List[str],
     discard_existing_events: bool = True,
+    **provider_options,
 ) -> EventProvider:
-    providers = ["redis"]
+    if provider_name not in _event_providers:
+        raise Exception(
+            f"Event provider {provider_name} does not exist. Available providers { ','.join(_event_providers)}"
+        )
+    return _event_providers[provider_name](host, port, channels, discard_existing_events, **provider_options)
+
+
+########################################################################################################################
+# STREAM REGISTRY
+########################################################################################################################
+
+StreamInfo = namedtuple("StreamInfo", ["stream_uid", "acquired_at", "released_at", "user_uid"])
+
+PIPELINE_EVENTS = {"PipelineAcquired", "PipelineReleased"}
+
+
+class StreamRegistry(ABC):
+    """Index of the streams (pipelines) announced with PipelineAcquired and PipelineReleased on the system stream"""
+
+    @abstractmethod
+    async def update(self) -> int:
+        """Applies all system events published since the last update. Returns the number of pipeline events applied"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_streams(
+        self, active: bool = True, offset: int = 0, limit: Optional[int] = None
+    ) -> Tuple[List[StreamInfo], int]:
+        """
+        Returns a page of the active streams (longest running first) or of the completed streams (most recently
+        completed first) together with the total number of streams with that status.
+        """
+        raise NotImplementedError
+
+
+class ProviderStreamRegistry(StreamRegistry):
+    """Stream registry kept in memory that reads the system stream with any event provider"""
+
+    def __init__(self, event_provider: EventProvider) -> None:
+        self.event_provider = event_provider
+        self._active: Dict[str, StreamInfo] = {}
+        self._completed: Dict[str, StreamInfo] = {}
+
+    async def update(self) -> int:
+        applied = 0
+        while True:
+            events = await self.event_provider.receive_events(timeout_ms=0)
+            if not events:
+                return applied
+            for event in decode_received_events(events):
+                if event["type"].strip() not in PIPELINE_EVENTS:
+                    continue
+                self._apply(event)
+                applied += 1
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        stream_uid = event["stream_uid"]
+        if event["type"].strip() == "PipelineAcquired":
+            self._completed.pop(stream_uid, None)
+            self._active[stream_uid] = StreamInfo(stream_uid, event["event_created_at"], None, event.get("user_uid"))
+        else:
+            info = self._active.pop(stream_uid, None) or StreamInfo(stream_uid, None, None, None)
+            self._completed.pop(stream_uid, None)
+            self._completed[stream_uid] = info._replace(released_at=event["event_created_at"])
+
+    async def list_streams(
+        self, active: bool = True, offset: int = 0, limit: Optional[int] = None
+    ) -> Tuple[List[StreamInfo], int]:
+        # Both dicts are in the order in which the streams were acquired or released
+        streams = list(self._active.values()) if active else list(reversed(self._completed.values()))
+        end = offset + limit if limit is not None else None
+        return streams[offset:end], len(streams)
+
+
+# Applies a batch of pipeline events of the system stream to the registry. Entries up to the stored cursor have been
+# applied before and are skipped, which makes concurrent updates from several clients safe.
+# KEYS: active, completed, acquired_at, released_at, user_uid, cursor
+# ARGV: max completed streams, ID of the last entry of the batch, then entry ID, type, stream_uid, created_at, user_uid
+# for every pipeline event
+_UPDATE_STREAM_REGISTRY_SCRIPT = """
+local function parse_id(id)
+    local ms, seq = string.match(id, "(%d+)-(%d+)")
+    return tonumber(ms), tonumber(seq)
+end
+
+local function is_after(a, b)
+    local a_ms, a_seq = parse_id(a)
+    local b_ms, b_seq = parse_id(b)
+    return a_ms > b_ms or (a_ms == b_ms and a_seq > b_seq)
+end
+
+local cursor = redis.call("GET", KEYS[6]) or "0-0"
+local applied = 0
+for i = 3, #ARGV, 5 do
+    local id, event_type, stream_uid, created_at, user_uid = ARGV[i], ARGV[i + 1], ARGV[i + 2], ARGV[i + 3], ARGV[i + 4]
+    if is_after(id, cursor) then
+        local score = parse_id(id)
+        if event_type == "PipelineAcquired" then
+            redis.call("ZADD", KEYS[1], score, stream_uid)
+            redis.call("ZREM", KEYS[2], stream_uid)
+            redis.call("HSET", KEYS[3], stream_uid, created_at)
+            redis.call("HDEL", KEYS[4], stream_uid)
+            redis.call("HSET", KEYS[5], stream_uid, user_uid)
+        else
+            redis.call("ZREM", KEYS[1], stream_uid)
+            redis.call("ZADD", KEYS[2], score, stream_uid)
+            redis.call("HSET", KEYS[4], stream_uid, created_at)
+        end
+        applied = applied + 1
+    end
+end
+
+if is_after(ARGV[2], cursor) then
+    redis.call("SET", KEYS[6], ARGV[2])
+end
+
+local excess = redis.call("ZCARD", KEYS[2]) - tonumber(ARGV[1])
+if excess > 0 then
+    local removed = redis.call("ZRANGE", KEYS[2], 0, excess - 1)
+    redis.call("ZREMRANGEBYRANK", KEYS[2], 0, excess - 1)
+    for k = 3, 5 do
+        redis.call("HDEL", KEYS[k], unpack(removed))
+    end
+end
+return applied
+"""
+
+
+class RedisStreamRegistry(StreamRegistry):
+    """
+    Stream registry stored in redis next to the system stream. Active and completed streams are kept in sorted
+    sets (scored by the time of the PipelineAcquired or PipelineReleased event), the event details in hashes.
+    Each update only reads the system stream after the last applied entry, so listing streams does not depend
+    on the length of the system stream. Only the latest `max_completed` completed streams are kept.
+    """
+
+    def __init__(
+        self,
+        redis_host: str,
+        redis_port: int,
+        system_stream: str = SYSTEM_EVENTS_STREAM,
+        key_prefix: str = "ace_agent_stream_registry",
+        batch_size: int = 1000,
+        max_completed: int = 10000,
+    ) -> None:
+        self.redis: redis.Redis = redis.Redis(host=redis_host, port=redis_port)
+        self.system_stream = system_stream
+        self.batch_size = batch_size
+        self.max_completed = max_completed
+        key_names = ["active", "completed", "acquired_at", "released_at", "user_uid", "cursor"]
+        self.keys = [f"{key_prefix}:{name}" for name in key_names]
+        self._update_script = self.redis.register_script(_UPDATE_STREAM_REGISTRY_SCRIPT)
+
+    async def update(self) -> int:
+        cursor = await self.redis.get(self.keys[-1])
+        cursor = cursor.decode() if cursor else "0-0"
+        applied = 0
+        while True:
+            result = await self.redis.xread(streams={self.system_stream: cursor}, count=self.batch_size)
+            if not result:
+                return applied
+            entries = result[0][1]
+            args: List[Any] = [self.max_completed, entries[-1][0].decode()]
+            for entry_id, fields in entries:
+                try:
+                    event = decode_received_event(fields[b"event"].decode())
+                    event_type = event["type"].strip()
+                    if event_type in PIPELINE_EVENTS:
+                        args += [entry_id, event_type, event["stream_uid"], event["event_created_at"]]
+                        args.append(event.get("user_uid", ""))
+                except (AttributeError, KeyError, TypeError, ValueError):
+                    logger.warning(f"[Invalid system event] {entry_id.decode()}: {fields}")
+            applied += await self._update_script(keys=self.keys, args=args)
+            cursor = args[1]
+            if len(entries) < self.batch_size:
+                return applied
+
+    async def list_streams(
+        self, active: bool = True, offset: int = 0, limit: Optional[int] = None
+    ) -> Tuple[List[StreamInfo], int]:
+        key = self.keys[0] if active else self.keys[1]
+        end = offset + limit - 1 if limit is not None else -1
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zcard(key)
+            if active:
+                pipe.zrange(key, offset, end)
+            else:
+                pipe.zrevrange(key, offset, end)
+            total, members = await pipe.execute()
+        if not members:
+            return [], total
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for details_key in self.keys[2:5]:
+                pipe.hmget(details_key, members)
+            acquired_at, released_at, user_uid = await pipe.execute()
+
+        def text(value: Optional[bytes]) -> Optional[str]:
+            return value.decode() if value else None
+
+        streams = [
+            StreamInfo(member.decode(), text(acquired_at[i]), text(released_at[i]), text(user_uid[i]))
+            for i, member in enumerate(members)
+        ]
+        return streams, total
+
+
+def stream_registry_factory(provider_name: str, host: str, port: int) -> StreamRegistry:
     if provider_name == "redis":
-        return RedisEventProvider(host, port, channels, discard_existing_events)
-    else:
-        raise Exception(f"Event provider {provider_name} does not exist. Available providers { ','.join(providers)}")
+        return RedisStreamRegistry(host, port)
+    return ProviderStreamRegistry(
+        event_provider_factory(provider_name, host, port, [SYSTEM_EVENTS_STREAM], discard_existing_events=False)
+    )
 
 
 def new_uuid() -> str:
@@ -159,65 +1072,110 @@ def new_uuid() -> str:
     return str(uuid.uuid4())
 
 
-# Very basic event validation - will be replaced by validation based on pydantic models
+# Very basic event validation of the events created by this app. Received events are validated against the
+# typed models in umim_schemas.
 Property = namedtuple("Property", ["name", "type"])
 Validator = namedtuple("Validator", ["description", "function"])
+# A validator of the UMIM schema together with a predicate on the event type that selects the events it applies to
+EventRule = namedtuple("EventRule", ["applies_to", "validator"])
 
 
 def _has_property(e: Dict[str, Any], p: Property) -> bool:
     return p.name in e and type(e[p.name]) == p.type
 
 
-_event_validators = [
-    Validator("Events need to provide 'type'", lambda e: "type" in e),
-    Validator("Events need to provide 'uid'", lambda e: _has_property(e, Property("uid", str))),
-    Validator(
-        "Events need to provide 'event_created_at' of type 'str'",
-        lambda e: _has_property(e, Property("event_created_at", str)),
-    ),
-    Validator(
-        "Events need to provide 'source_uid' of type 'str'",
-        lambda e: _has_property(e, Property("source_uid", str)),
+def _requires(description: str, p: Property) -> Validator:
+    return Validator(description, lambda e: _has_property(e, p))
+
+
+def _any_type(event_type: str) -> bool:
+    return True
+
+
+def _type_contains(keyword: str) -> Callable[[str], bool]:
+    return lambda event_type: keyword in event_type
+
+
+def _type_is(name: str) -> Callable[[str], bool]:
+    return lambda event_type: event_type == name
+
+
+_type_validator = Validator("Events need to provide 'type'", lambda e: "type" in e)
+
+_event_schema = [
+    EventRule(_any_type, _requires("Events need to provide 'uid'", Property("uid", str))),
+    EventRule(
+        _any_type,
+        _requires("Events need to provide 'event_created_at' of type 'str'", Property("event_created_at", str)),
     ),
-    Validator(
-        "***Action events need to provide an 'action_uid' of type 'str'",
-        lambda e: "Action" not in e["type"] or _has_property(e, Property("action_uid", str)),
+    EventRule(_any_type, _requires("Events need to provide 'source_uid' of type 'str'", Property("source_uid", str))),
+    EventRule(
+        _type_contains("Action"),
+        _requires("***Action events need to provide an 'action_uid' of type 'str'", Property("action_uid", str)),
     ),
-    Validator(
-        "***ActionFinished events require 'action_finished_at' field of type 'str'",
-        lambda e: "ActionFinished" not in e["type"] or _has_property(e, Property("action_finished_at", str)),
+    EventRule(
+        _type_contains("ActionFinished"),
+        _requires(
+            "***ActionFinished events require 'action_finished_at' field of type 'str'",
+            Property("action_finished_at", str),
+        ),
     ),
-    Validator(
-        "***ActionFinished events require 'is_success' field of type 'bool'",
-        lambda e: "ActionFinished" not in e["type"] or _has_property(e, Property("is_success", bool)),
+    EventRule(
+        _type_contains("ActionFinished"),
+        _requires("***ActionFinished events require 'is_success' field of type 'bool'", Property("is_success", bool)),
     ),
-    Validator(
-        "Unsuccessful ***ActionFinished events need to provide 'failure_reason'.",
-        lambda e: "ActionFinished" not in e["type"] or (e["is_success"] or "failure_reason" in e),
+    EventRule(
+        _type_contains("ActionFinished"),
+        Validator(
+            "Unsuccessful ***ActionFinished events need to provide 'failure_reason'.",
+            lambda e: e["is_success"] or "failure_reason" in e,
+        ),
     ),
-    Validator(
-        "***StartUtteranceBotAction events need to provide 'script' of type 'str'",
-        lambda e: e["type"] != "StartUtteranceBotAction" or _has_property(e, Property("script", str)),
+    EventRule(
+        _type_is("StartUtteranceBotAction"),
+        _requires("***StartUtteranceBotAction events need to provide 'script' of type 'str'", Property("script", str)),
     ),
-    Validator(
-        "***UtteranceBotActionScriptUpdated events need to provide 'interim_script' of type 'str'",
-        lambda e: e["type"] != "UtteranceBotActionScriptUpdated " or _has_property(e, Property("interim_script", str)),
+    EventRule(
+        _type_is("UtteranceBotActionScriptUpdated"),
+        _requires(
+            "***UtteranceBotActionScriptUpdated events need to provide 'interim_script' of type 'str'",
+            Property("interim_script", str),
+        ),
     ),
-    Validator(
-        "***UtteranceBotActionFinished events need to provide 'final_script' of type 'str'",
-        lambda e: e["type"] != "UtteranceBotActionFinished" or _has_property(e, Property("final_script", str)),
+    EventRule(
+        _type_is("UtteranceBotActionFinished"),
+        _requires(
+            "***UtteranceBotActionFinished events need to provide 'final_script' of type 'str'",
+            Property("final_script", str),
+        ),
     ),
-    Validator(
-        "***UtteranceUserActionTranscriptUpdated events need to provide 'interim_transcript' of type 'str'",
-        lambda e: e["type"] != "UtteranceUserActionTranscriptUpdated"
-        or _has_property(e, Property("interim_transcript", str)),
+    EventRule(
+        _type_is("UtteranceUserActionTranscriptUpdated"),
+        _requires(
+            "***UtteranceUserActionTranscriptUpdated events need to provide 'interim_transcript' of type 'str'",
+            Property("interim_transcript", str),
+        ),
     ),
-    Validator(
-        "***UtteranceUserActionFinished events need to provide 'final_transcript' of type 'str'",
-        lambda e: e["type"] != "UtteranceUserActionFinished" or _has_property(e, Property("final_transcript", str)),
+    EventRule(
+        _type_is("UtteranceUserActionFinished"),
+        _requires(
+            "***UtteranceUserActionFinished events need to provide 'final_transcript' of type 'str'",
+            Property("final_transcript", str),
+        ),
     ),
 ]
 
+# Validators compiled from the schema for each event type seen so far
+_event_validators: Dict[str, Tuple[Validator, ...]] = {}
+
+
+def _validators_for_type(event_type: str) -> Tuple[Validator, ...]:
+    validators = _event_validators.get(event_type)
+    if validators is None:
+        validators = tuple(rule.validator for rule in _event_schema if rule.applies_to(event_type))
+        _event_validators[event_type] = validators
+    return validators
+
 
 _action_to_modality_info: Dict[str, Tuple[str, str]] = {
     "UtteranceBotAction": ("bot_speech", "replace"),
@@ -254,13 +1212,16 @@ def _update_action_properties(event_dict: Dict[str, Any]) -> None:
 
 def ensure_valid_event(event: Dict[str, Any]) -> None:
     """Performs basic event validation and throws an AssertionError if any of the validators fail."""
-    for validator in _event_validators:
+    assert _type_validator.function(event), _type_validator.description
+    for validator in _validators_for_type(event["type"]):
         assert validator.function(event), validator.description
 
 
 def is_valid_event(event: Dict[str, Any]) -> bool:
     """Performs a basic event validation and returns True if the event conforms."""
-    for validator in _event_validators:
+    if not _type_validator.function(event):
+        return False
+    for validator in _validators_for_type(event["type"]):
         if not validator.function(event):
             return False
     return True
@@ -273,7 +1234,7 @@ def new_event(event_type: str, **payload) -> Dict[str, Any]:
         "type": event_type,
         "uid": new_uuid(),
         "event_created_at": datetime.now(timezone.utc).isoformat(),
-        "source_uid": "umim_tui_app",
+        "source_uid": SOURCE_UID,
     }
 
     event = {**event, **payload}
@@ -308,6 +1269,7 @@ def _fix_event(event: Dict[str, Any]) -> None:
         del event["created_at"]
 
 
+@lru_cache(maxsize=1024)
 def _type_to_sign(event_type: str) -> str:
     if "Started" in event_type:
         return ":rocket: "
@@ -329,7 +1291,10 @@ def _timestamp(show_time: bool, timestamp: Optional[str] = None) -> str:
     if show_time:
         if timestamp:
             date = read_isoformat(timestamp)
-            date_str = date.strftime("%m/%d,%H:%M:%S.%f")
+            date_str = (
+                f"{date.month:02d}/{date.day:02d},"
+                f"{date.hour:02d}:{date.minute:02d}:{date.second:02d}.{date.microsecond:06d}"
+            )
             return f"[blue]{date_str}[/blue] "
         else:
             return "                      "
@@ -337,134 +1302,124 @@ def _timestamp(show_time: bool, timestamp: Optional[str] = None) -> str:
         return ""
 
 
+EventFormatter = Callable[[Dict[str, Any], str], str]
+
+
+def _status_str(event: Dict[str, Any]) -> str:
+    status = '"success"' if event["is_success"] else '"failure"'
+    reason = f', reason="{event["failure_reason"]}"' if not event["is_success"] else ""
+    return f"{status}{reason}"
+
+
+def _quoted_field(name: str) -> EventFormatter:
+    return lambda event, action_info: f'"{event[name]}"{action_info}'
+
+
+def _field(name: str, prefix: str = "") -> EventFormatter:
+    return lambda event, action_info: f"{prefix}{event[name]}{action_info}"
+
+
+def _action_info_only(event: Dict[str, Any], action_info: str) -> str:
+    return action_info
+
+
+def _finished_status(event: Dict[str, Any], action_info: str) -> str:
+    return f"{_status_str(event)}{action_info}"
+
+
+def _format_start_timer(event: Dict[str, Any], action_info: str) -> str:
+    return f'"{event["timer_name"]}", duration={event["duration"]}{action_info}'
+
+
+def _format_timer_started(event: Dict[str, Any], action_info: str) -> str:
+    return f'{read_isoformat(event["action_started_at"]).strftime("%H:%M:%S")}{action_info}'
+
+
+def _format_timer_finished(event: Dict[str, Any], action_info: str) -> str:
+    if not event["is_success"]:
+        return f"{_status_str(event)}{action_info}"
+    if event["was_stopped"]:
+        return f"was_stopped=True{action_info}"
+    return f'{read_isoformat(event["action_finished_at"]).strftime("%H:%M:%S")}{action_info}'
+
+
+def _format_gesture_finished(event: Dict[str, Any], action_info: str) -> str:
+    was_stopped = f", was_stopped={'True' if event['was_stopped'] else 'False'}"
+    return f"{_status_str(event)}{was_stopped}{action_info}"
+
+
+def _format_start_visual_information(event: Dict[str, Any], action_info: str) -> str:
+    return f'"{event["title"]}", summary={event.get("summary","")}{action_info}'
+
+
+def _format_form_inputs(event: Dict[str, Any], action_info: str) -> str:
+    inputs = ",".join([f'{input["id"]}="{input["value"]}"' for input in event["interim_inputs"]])
+    return f"{inputs}{action_info}"
+
+
+def _format_intent(event: Dict[str, Any], action_info: str) -> str:
+    return f'"{event["intent"]}"'
+
+
+def _format_generic(event: Dict[str, Any], action_info: str) -> str:
+    return ",".join([f"{key}={value}" for key, value in event.items()])
+
+
+# Parameter formatters for the short string representation of each event type
+_event_formatters: Dict[str, EventFormatter] = {
+    "StartTimerBotAction": _format_start_timer,
+    "TimerBotActionStarted": _format_timer_started,
+    "ChangeTimerBotAction": _field("duration", prefix="duration="),
+    "StopTimerBotAction": _action_info_only,
+    "TimerBotActionFinished": _format_timer_finished,
+    "UtteranceUserActionFinished": _quoted_field("final_transcript"),
+    "UtteranceUserActionTranscriptUpdated": _quoted_field("interim_transcript"),
+    "UtteranceUserActionStarted": _action_info_only,
+    "StartUtteranceBotAction": _quoted_field("script"),
+    "UtteranceBotActionStarted": _action_info_only,
+    "StopUtteranceBotAction": _action_info_only,
+    "UtteranceBotActionFinished": _quoted_field("final_script"),
+    "StartGestureBotAction": _quoted_field("gesture"),
+    "GestureBotActionStarted": _action_info_only,
+    "StopGestureBotAction": _action_info_only,
+    "GestureBotActionFinished": _format_gesture_finished,
+    "StartPostureBotAction": _quoted_field("posture"),
+    "PostureBotActionStarted": _action_info_only,
+    "StopPostureBotAction": _action_info_only,
+    "PostureBotActionFinished": _finished_status,
+    "AttentionUserActionStarted": _field("attention_level", prefix="level="),
+    "AttentionUserActionUpdated": _field("attention_level", prefix="level="),
+    "AttentionUserActionFinished": _finished_status,
+    "PresenceUserActionStarted": _action_info_only,
+    "PresenceUserActionFinished": _finished_status,
+    "StartVisualInformationSceneAction": _format_start_visual_information,
+    "VisualInformationSceneActionStarted": _action_info_only,
+    "StopVisualInformationSceneAction": _action_info_only,
+    "VisualInformationSceneActionConfirmationUpdated": _field("confirmation_status"),
+    "VisualInformationSceneActionFinished": _finished_status,
+    "StartVisualChoiceSceneAction": _quoted_field("prompt"),
+    "VisualChoiceSceneActionStarted": _action_info_only,
+    "VisualChoiceSceneActionConfirmationUpdated": _field("confirmation_status"),
+    "VisualChoiceSceneActionChoiceUpdated": _field("current_choice"),
+    "StopVisualChoiceSceneAction": _action_info_only,
+    "VisualChoiceSceneActionFinished": _finished_status,
+    "StartVisualFormSceneAction": _quoted_field("prompt"),
+    "VisualFormSceneActionStarted": _action_info_only,
+    "VisualFormSceneActionConfirmationUpdated": _field("confirmation_status"),
+    "VisualFormSceneActionInputUpdated": _format_form_inputs,
+    "StopVisualFormSceneAction": _action_info_only,
+    "VisualFormSceneActionFinished": _finished_status,
+    "UserIntent": _format_intent,
+    "BotIntent": _format_intent,
+}
+
+
 def _event_to_short_str(event: dict, show_time: bool = True) -> str:
     action_info = ""
     if "action_uid" in event:
         action_info = f", id={event['action_uid'][0:4]}.."
 
-    if event["type"] == "StartTimerBotAction":
-        param_str = f'"{event["timer_name"]}", duration={event["duration"]}{action_info}'
-    elif event["type"] == "TimerBotActionStarted":
-        param_str = f'{read_isoformat(event["action_started_at"]).strftime("%H:%M:%S")}{action_info}'
-    elif event["type"] == "ChangeTimerBotAction":
-        param_str = f"duration={event['duration']}{action_info}"
-    elif event["type"] == "StopTimerBotAction":
-        param_str = f"{action_info}"
-    elif event["type"] == "TimerBotActionFinished":
-        if not event["is_success"]:
-            status = '"success"' if event["is_success"] else '"failure"'
-            reason = f', reason="{event["failure_reason"]}"' if not event["is_success"] else ""
-            param_str = f"{status}{reason}{action_info}"
-        else:
-            if event["was_stopped"]:
-                param_str = f"was_stopped=True{action_info}"
-            else:
-                param_str = f'{read_isoformat(event["action_finished_at"]).strftime("%H:%M:%S")}{action_info}'
-    elif event["type"] == "UtteranceUserActionFinished":
-        param_str = f'"{event["final_transcript"]}"{action_info}'
-    elif event["type"] == "UtteranceUserActionTranscriptUpdated":
-        param_str = f'"{event["interim_transcript"]}"{action_info}'
-    elif event["type"] == "UtteranceUserActionStarted":
-        param_str = action_info
-
-    elif event["type"] == "StartUtteranceBotAction":
-        param_str = f'"{event["script"]}"{action_info}'
-    elif event["type"] == "UtteranceBotActionStarted":
-        param_str = action_info
-    elif event["type"] == "StopUtteranceBotAction":
-        param_str = action_info
-    elif event["type"] == "UtteranceBotActionFinished":
-        param_str = f'"{event["final_script"]}"{action_info}'
-
-    elif event["type"] == "StartGestureBotAction":
-        param_str = f'"{event["gesture"]}"{action_info}'
-    elif event["type"] == "GestureBotActionStarted":
-        param_str = action_info
-    elif event["type"] == "StopGestureBotAction":
-        param_str = action_info
-    elif event["type"] == "GestureBotActionFinished":
-        status = '"success"' if event["is_success"] else '"failure"'
-        was_stopped = f", was_stopped={'True' if event['was_stopped'] else 'False'}"
-        reason = f', reason="{event["failure_reason"]}"' if not event["is_success"] else ""
-        param_str = f"{status}{reason}{was_stopped}{action_info}"
-
-    elif event["type"] == "StartPostureBotAction":
-        param_str = f'"{event["posture"]}"{action_info}'
-    elif event["type"] == "PostureBotActionStarted":
-        param_str = action_info
-    elif event["type"] == "StopPostureBotAction":
-        param_str = action_info
-    elif event["type"] == "PostureBotActionFinished":
-        status = '"success"' if event["is_success"] else '"failure"'
-        reason = f', reason="{event["failure_reason"]}"' if not event["is_success"] else ""
-        param_str = f"{status}{reason}{action_info}"
-
-    elif event["type"] == "AttentionUserActionStarted":
-        param_str = f"level={event['attention_level']}{action_info}"
-    elif event["type"] == "AttentionUserActionUpdated":
-        param_str = f"level={event['attention_level']}{action_info}"
-    elif event["type"] == "AttentionUserActionFinished":
-        status = '"success"' if event["is_success"] else '"failure"'
-        reason = f', reason="{event["failure_reason"]}"' if not event["is_success"] else ""
-        param_str = f"{status}{reason}{action_info}"
-
-    elif event["type"] == "PresenceUserActionStarted":
-        param_str = action_info
-    elif event["type"] == "PresenceUserActionFinished":
-        status = '"success"' if event["is_success"] else '"failure"'
-        reason = f', reason="{event["failure_reason"]}"' if not event["is_success"] else ""
-        param_str = f"{status}{reason}{action_info}"
-
-    elif event["type"] == "StartVisualInformationSceneAction":
-        param_str = f'"{event["title"]}", summary={event.get("summary","")}{action_info}'
-    elif event["type"] == "VisualInformationSceneActionStarted":
-        param_str = action_info
-    elif event["type"] == "StopVisualInformationSceneAction":
-        param_str = action_info
-    elif event["type"] == "VisualInformationSceneActionConfirmationUpdated":
-        param_str = f"{event['confirmation_status']}{action_info}"
-    elif event["type"] == "VisualInformationSceneActionFinished":
-        status = '"success"' if event["is_success"] else '"failure"'
-        reason = f', reason="{event["failure_reason"]}"' if not event["is_success"] else ""
-        param_str = f"{status}{reason}{action_info}"
-
-    elif event["type"] == "StartVisualChoiceSceneAction":
-        param_str = f'"{event["prompt"]}"{action_info}'
-    elif event["type"] == "VisualChoiceSceneActionStarted":
-        param_str = action_info
-    elif event["type"] == "VisualChoiceSceneActionConfirmationUpdated":
-        param_str = f"{event['confirmation_status']}{action_info}"
-    elif event["type"] == "VisualChoiceSceneActionChoiceUpdated":
-        param_str = f"{event['current_choice']}{action_info}"
-    elif event["type"] == "StopVisualChoiceSceneAction":
-        param_str = action_info
-    elif event["type"] == "VisualChoiceSceneActionFinished":
-        status = '"success"' if event["is_success"] else '"failure"'
-        reason = f', reason="{event["failure_reason"]}"' if not event["is_success"] else ""
-        param_str = f"{status}{reason}{action_info}"
-
-    elif event["type"] == "StartVisualFormSceneAction":
-        param_str = f'"{event["prompt"]}"{action_info}'
-    elif event["type"] == "VisualFormSceneActionStarted":
-        param_str = action_info
-    elif event["type"] == "VisualFormSceneActionConfirmationUpdated":
-        param_str = f"{event['confirmation_status']}{action_info}"
-    elif event["type"] == "VisualFormSceneActionInputUpdated":
-        inputs = ",".join([f'{input["id"]}="{input["value"]}"' for input in event["interim_inputs"]])
-        param_str = f"{inputs}{action_info}"
-    elif event["type"] == "StopVisualFormSceneAction":
-        param_str = action_info
-    elif event["type"] == "VisualFormSceneActionFinished":
-        status = '"success"' if event["is_success"] else '"failure"'
-        reason = f', reason="{event["failure_reason"]}"' if not event["is_success"] else ""
-        param_str = f"{status}{reason}{action_info}"
-
-    elif event["type"] == "UserIntent":
-        param_str = f'"{event["intent"]}"'
-    elif event["type"] == "BotIntent":
-        param_str = f'"{event["intent"]}"'
-    else:
-        param_str = ",".join([f"{key}={value}" for key, value in event.items()])
+    param_str = _event_formatters.get(event["type"], _format_generic)(event, action_info)
 
     return (
         f"{_timestamp(show_time, event['event_created_at'])}{_type_to_sign(event['type'])}{event['type']}({param_str})"
@@ -492,6 +1447,40 @@ def pretty_event(event_data: Dict[str, Any], show_time: bool = True, strict: boo
         return ":ogre: [Malformed] " + str(event_data)
 
 
+def decode_received_event(event_str: str) -> Optional[Dict[str, Any]]:
+    """
+    Decode and validate a received event. An event that is not UMIM compliant is logged and returned as plain JSON.
+    Returns None if the event is not valid JSON.
+    """
+    try:
+        return decode_event(event_str)
+    except ValidationError as e:
+        errors = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+        logger.warning(f"[Not UMIM compliant] {event_str}\n[Error] {errors}\n\n")
+    try:
+        return json.loads(event_str)
+    except json.JSONDecodeError:
+        return None
+
+
+def decode_received_events(events: List[str]) -> List[Dict[str, Any]]:
+    """
+    Decode and validate a batch of received events. Events that are not UMIM compliant are logged and returned as
+    plain JSON so that they can still be shown. Events that are not valid JSON are dropped.
+    """
+    try:
+        return decode_events(events)
+    except ValidationError:
+        pass
+
+    event_list: List[Dict[str, Any]] = []
+    for event_str in events:
+        event = decode_received_event(event_str)
+        if event is not None:
+            event_list.append(event)
+    return event_list
+
+
 def try_parse_event(data):
     if isinstance(data, str):
         data = json.loads(data)
@@ -530,11 +1519,181 @@ class InternalEvent:
     data: Any = None
 
 
+class ActionScheduler:
+    """
+    Deadline heap of the action handlers that need to be ticked. Every handler has at most one pending
+    wake-up time; scheduling a handler again only moves its wake-up time forward.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, "ActionHandler"]] = []
+        self._deadlines: Dict["ActionHandler", float] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(self, handler: "ActionHandler", deadline: float) -> None:
+        current = self._deadlines.get(handler)
+        if current is not None and current <= deadline:
+            return
+        self._deadlines[handler] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), handler))
+
+    def unschedule(self, handler: "ActionHandler") -> None:
+        # Heap entries of unscheduled handlers are dropped lazily
+        self._deadlines.pop(handler, None)
+
+    def next_deadline(self) -> Optional[float]:
+        while self._heap:
+            deadline, _, handler = self._heap[0]
+            if self._deadlines.get(handler) == deadline:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: float) -> List["ActionHandler"]:
+        """Remove and return all handlers with a wake-up time up to `now`"""
+        due: List[ActionHandler] = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, handler = heapq.heappop(self._heap)
+            if self._deadlines.get(handler) == deadline:
+                del self._deadlines[handler]
+                due.append(handler)
+        return due
+
+
+class TransitionError(Exception):
+    """Raised when a trigger is not valid in the current state of an action handler"""
+
+
+# Transitions shared by all action handlers. Callbacks are given by name and resolved once per handler class.
+ACTION_TRANSITIONS = [
+    {"trigger": "start", "source": "init", "dest": "running", "before": ["update_action_state", "on_start"]},
+    {
+        "trigger": "started",
+        "source": "init",
+        "dest": "running",
+        "before": ["update_action_state", "on_started_from_init"],
+    },
+    {
+        "trigger": "started",
+        "source": "running",
+        "dest": "running",
+        "before": ["update_action_state", "on_started_from_running"],
+    },
+    {
+        "trigger": "change",
+        "source": "running",
+        "dest": "running",
+        "before": ["update_action_state", "on_change"],
+    },
+    {
+        "trigger": "promote",
+        "source": "running",
+        "dest": "running",
+        "before": ["update_action_state", "on_promote_when_running"],
+    },
+    {"trigger": "tick", "source": "running", "dest": "running", "before": ["update_action_state", "on_tick"]},
+    {
+        "trigger": "demote",
+        "source": "running",
+        "dest": "background",
+        "before": ["update_action_state", "on_demote"],
+    },
+    {
+        "trigger": "promote",
+        "source": "background",
+        "dest": "running",
+        "before": ["update_action_state", "on_promote"],
+    },
+    {
+        "trigger": "started",
+        "source": "background",
+        "dest": "background",
+        "before": ["update_action_state"],
+    },
+    {
+        "trigger": "stop",
+        "source": "running",
+        "dest": "finished",
+        "before": ["update_action_state", "on_stop_from_running"],
+    },
+    {
+        "trigger": "stop",
+        "source": "background",
+        "dest": "finished",
+        "before": ["update_action_state", "on_stop_from_background"],
+    },
+    {
+        "trigger": "finished",
+        "source": "running",
+        "dest": "finished",
+        "before": ["update_action_state", "on_finished_from_running"],
+    },
+    {
+        "trigger": "done",
+        "source": "running",
+        "dest": "finished",
+        "before": ["update_action_state", "on_done"],
+    },
+    {
+        "trigger": "finished",
+        "source": "finished",
+        "dest": "finished",
+        "before": ["update_action_state", "on_finished_from_finished"],
+    },
+    {
+        "trigger": "started",
+        "source": "finished",
+        "dest": "finished",
+        "before": ["update_action_state"],
+    },
+]
+
+# (dest, callbacks run before the state changes, callbacks run after the state changed)
+CompiledTransition = Tuple[str, Tuple[Callable[..., Any], ...], Tuple[Callable[..., Any], ...]]
+
+
+def _missing_callback(name: str) -> Callable[..., Any]:
+    # Handlers only fail once a transition needing the callback is actually triggered
+    def callback(handler: "ActionHandler", event: Union[InternalEvent, dict]) -> None:
+        raise AttributeError(f"'{type(handler).__name__}' object has no attribute '{name}'")
+
+    return callback
+
+
+def _compile_transitions(handler_class: type) -> Dict[Tuple[str, str], CompiledTransition]:
+    """
+    Builds the transition table of a handler class, keyed by (trigger, source state). Like a `transitions.Machine`
+    the `before` callbacks run first, followed by `on_exit_<source>`, the state change and `on_enter_<dest>`.
+    """
+    table: Dict[Tuple[str, str], CompiledTransition] = {}
+    for transition in ACTION_TRANSITIONS:
+        source, dest = transition["source"], transition["dest"]
+        before = [getattr(handler_class, name, None) or _missing_callback(name) for name in transition["before"]]
+        on_exit = getattr(handler_class, f"on_exit_{source}", None)
+        if on_exit is not None:
+            before.append(on_exit)
+        on_enter = getattr(handler_class, f"on_enter_{dest}", None)
+        table[(transition["trigger"], source)] = (dest, tuple(before), (on_enter,) if on_enter else ())
+    return table
+
+
 class ActionHandler(object):
+    __slots__ = ("active_mode", "app", "action_state", "task_done", "was_stopped", "state")
+
     states = ["init", "running", "background", "finished"]
     triggers: List[str]
     action_name: str
     tui_element_id: str
+    # Seconds between two ticks while the action is running. None if the action does not need to be ticked.
+    tick_interval: Optional[float] = None
+    transition_table: Dict[Tuple[str, str], CompiledTransition] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.transition_table = _compile_transitions(cls)
 
     def __init__(self, active_mode: bool, app: App) -> None:
         self.active_mode = active_mode
@@ -542,91 +1701,47 @@ class ActionHandler(object):
         self.action_state: Dict[str, Any] = {}
         self.task_done = False
         self.was_stopped = False
+        self.state = "init"
 
-        transitions = [
-            {"trigger": "start", "source": "init", "dest": "running", "before": ["update_action_state", "on_start"]},
-            {
-                "trigger": "started",
-                "source": "init",
-                "dest": "running",
-                "before": ["update_action_state", "on_started_from_init"],
-            },
-            {
-                "trigger": "started",
-                "source": "running",
-                "dest": "running",
-                "before": ["update_action_state", "on_started_from_running"],
-            },
-            {
-                "trigger": "change",
-                "source": "running",
-                "dest": "running",
-                "before": ["update_action_state", "on_change"],
-            },
-            {
-                "trigger": "promote",
-                "source": "running",
-                "dest": "running",
-                "before": ["update_action_state", "on_promote_when_running"],
-            },
-            {"trigger": "tick", "source": "running", "dest": "running", "before": ["update_action_state", "on_tick"]},
-            {
-                "trigger": "demote",
-                "source": "running",
-                "dest": "background",
-                "before": ["update_action_state", "on_demote"],
-            },
-            {
-                "trigger": "promote",
-                "source": "background",
-                "dest": "running",
-                "before": ["update_action_state", "on_promote"],
-            },
-            {
-                "trigger": "started",
-                "source": "background",
-                "dest": "background",
-                "before": ["update_action_state"],
-            },
-            {
-                "trigger": "stop",
-                "source": "running",
-                "dest": "finished",
-                "before": ["update_action_state", "on_stop_from_running"],
-            },
-            {
-                "trigger": "stop",
-                "source": "background",
-                "dest": "finished",
-                "before": ["update_action_state", "on_stop_from_background"],
-            },
-            {
-                "trigger": "finished",
-                "source": "running",
-                "dest": "finished",
-                "before": ["update_action_state", "on_finished_from_running"],
-            },
-            {
-                "trigger": "done",
-                "source": "running",
-                "dest": "finished",
-                "before": ["update_action_state", "on_done"],
-            },
-            {
-                "trigger": "finished",
-                "source": "finished",
-                "dest": "finished",
-                "before": ["update_action_state", "on_finished_from_finished"],
-            },
-            {
-                "trigger": "started",
-                "source": "finished",
-                "dest": "finished",
-                "before": ["update_action_state"],
-            },
-        ]
+    def trigger(self, trigger_name: str, event: Union[InternalEvent, dict]) -> bool:
+        transition = self.transition_table.get((trigger_name, self.state))
+        if transition is None:
+            raise TransitionError(f"Can't trigger event {trigger_name} from state {self.state}!")
+
+        dest, before, after = transition
+        for callback in before:
+            callback(self, event)
+        self.state = dest
+        for callback in after:
+            callback(self, event)
+        return True
+
+    def start(self, event: Union[InternalEvent, dict]) -> bool:
+        return self.trigger("start", event)
+
+    def started(self, event: Union[InternalEvent, dict]) -> bool:
+        return self.trigger("started", event)
+
+    def change(self, event: Union[InternalEvent, dict]) -> bool:
+        return self.trigger("change", event)
+
+    def promote(self, event: Union[InternalEvent, dict]) -> bool:
+        return self.trigger("promote", event)
 
-        self.machine = Machine(model=self, states=ActionHandler.states, initial="init", transitions=transitions)
+    def tick(self, event: Union[InternalEvent, dict]) -> bool:
+        return self.trigger("tick", event)
+
+    def demote(self, event: Union[InternalEvent, dict]) -> bool:
+        return self.trigger("demote", event)
+
+    def stop(self, event: Union[InternalEvent, dict]) -> bool:
+        return self.trigger("stop", event)
+
+    def finished(self, event: Union[InternalEvent, dict]) -> bool:
+        return self.trigger("finished", event)
+
+    def done(self, event: Union[InternalEvent, dict]) -> bool:
+        return self.trigger("done", event)
 
     def update_action_state(self, event: Union[InternalEvent, dict]) -> None:
         if isinstance(event, dict):
@@ -636,7 +1751,16 @@ class ActionHandler(object):
     def send_event(self, event: Union[InternalEvent, dict]) -> None:
         if not app_in_active_mode:
             return
-        self.app.run_worker(self.app.send_events(event), exclusive=False)
+        self.app.send_events(event)
+
+    def next_tick_at(self, now: float) -> Optional[float]:
+        """Returns the (monotonic) time at which the action needs to be ticked next, or None"""
+        if self.tick_interval is None or not self.active_mode:
+            return None
+        return now + self.tick_interval
+
+    def on_enter_running(self, event: Union[InternalEvent, dict]) -> None:
+        self.app.schedule_action(self)
 
     def on_started_from_running(self, event: Union[InternalEvent, dict]) -> None:
         pass
@@ -705,6 +1829,8 @@ class ActionHandler(object):
 
 
 class TimerActionHandler(ActionHandler):
+    __slots__ = ("timer_duration", "timer_start")
+
     triggers = [
         "StartTimerBotAction",
         "TimerBotActionStarted",
@@ -714,6 +1840,7 @@ class TimerActionHandler(ActionHandler):
     ]
     action_name = "TimerBotAction"
     tui_element_id = "#bot-timer"
+    tick_interval = TICK_INTERVAL
 
     def __init__(self, active_mode: bool, app: App) -> None:
         super().__init__(active_mode, app)
@@ -732,13 +1859,20 @@ class TimerActionHandler(ActionHandler):
 
     def on_change(self, event: Union[InternalEvent, dict]) -> None:
         assert isinstance(event, dict) and event["type"] == "ChangeTimerBotAction"
-        self.timer_duration = event["duration"]
+        self.timer_duration = timedelta(seconds=event["duration"])
 
         self._update_ui_element()
 
+    def next_tick_at(self, now: float) -> Optional[float]:
+        if not self.active_mode:
+            return None
+        # Refresh the countdown regularly but wake up exactly when the timer expires
+        remaining = self.timer_duration - (datetime.now(timezone.utc) - self.timer_start)
+        return now + min(self.tick_interval, max(remaining.total_seconds(), 0))
+
     def on_tick(self, event: Union[InternalEvent, dict]) -> None:
         if self.active_mode:
-            if datetime.now(timezone.utc) - self.timer_start > self.timer_duration:
+            if datetime.now(timezone.utc) - self.timer_start >= self.timer_duration:
                 self.task_done = True
             else:
                 difference = self.timer_duration - (datetime.now(timezone.utc) - self.timer_start)
@@ -761,6 +1895,8 @@ class TimerActionHandler(ActionHandler):
 
 
 class PresenceUserActionHandler(ActionHandler):
+    __slots__ = ()
+
     triggers = [
         "PresenceUserActionStarted",
         "PresenceUserActionFinished",
@@ -785,13 +1921,12 @@ _gesture_stack = deque([])
 
 
 class GestureActionHandler(ActionHandler):
+    __slots__ = ()
+
     triggers = ["StartGestureBotAction", "GestureBotActionStarted", "StopGestureBotAction", "GestureBotActionFinished"]
     action_name = "GestureBotAction"
     tui_element_id = "#bot-gesture"
-
-    def __init__(self, active_mode: bool, app: App) -> None:
-        super().__init__(active_mode, app)
-        self.progress = 0
+    tick_interval = MOTION_DURATION * TICK_INTERVAL
 
     @property
     def gesture(self) -> str:
@@ -814,11 +1949,9 @@ class GestureActionHandler(ActionHandler):
         self.app.current_animation = previous_gesture
 
     def on_tick(self, event: Union[InternalEvent, dict]) -> None:
+        # The only tick happens once the motion is complete
         if self.active_mode:
-            if self.progress < MOTION_DURATION:
-                self.progress += 1
-            else:
-                self.task_done = True
+            self.task_done = True
 
     def send_action_started_event(self) -> None:
         action_started = new_event("GestureBotActionStarted", action_uid=self.action_uid)
@@ -835,6 +1968,8 @@ class GestureActionHandler(ActionHandler):
 
 
 class FacialGestureActionHandler(ActionHandler):
+    __slots__ = ()
+
     triggers = [
         "StartFacialGestureBotAction",
         "FacialGestureBotActionStarted",
@@ -843,10 +1978,7 @@ class FacialGestureActionHandler(ActionHandler):
     ]
     action_name = "FacialGestureBotAction"
     tui_element_id = "#bot-facial-gesture"
-
-    def __init__(self, active_mode: bool, app: App) -> None:
-        super().__init__(active_mode, app)
-        self.progress = 0
+    tick_interval = MOTION_DURATION * TICK_INTERVAL
 
     @property
     def gesture(self) -> str:
@@ -863,11 +1995,9 @@ class FacialGestureActionHandler(ActionHandler):
         self.app.current_animation = self.gesture
 
     def on_tick(self, event: Union[InternalEvent, dict]) -> None:
+        # The only tick happens once the motion is complete
         if self.active_mode:
-            if self.progress < MOTION_DURATION:
-                self.progress += 1
-            else:
-                self.task_done = True
+            self.task_done = True
 
     def send_action_started_event(self) -> None:
         action_started = new_event("FacialGestureBotActionStarted", action_uid=self.action_uid)
@@ -881,6 +2011,8 @@ class FacialGestureActionHandler(ActionHandler):
 
 
 class MotionEffectActionHandler(ActionHandler):
+    __slots__ = ()
+
     triggers = [
         "StartMotionEffectCameraAction",
         "MotionEffectCameraActionStarted",
@@ -889,10 +2021,7 @@ class MotionEffectActionHandler(ActionHandler):
     ]
     action_name = "MotionEffectCameraAction"
     tui_element_id = "#camera-motion-effect"
-
-    def __init__(self, active_mode: bool, app: App) -> None:
-        super().__init__(active_mode, app)
-        self.progress = 0
+    tick_interval = MOTION_DURATION * TICK_INTERVAL
 
     @property
     def effect(self) -> str:
@@ -902,11 +2031,9 @@ class MotionEffectActionHandler(ActionHandler):
         return f"Camera Effect: {self.effect}"
 
     def on_tick(self, event: Union[InternalEvent, dict]) -> None:
+        # The only tick happens once the motion is complete
         if self.active_mode:
-            if self.progress < MOTION_DURATION:
-                self.progress += 1
-            else:
-                self.task_done = True
+            self.task_done = True
 
     def send_action_started_event(self) -> None:
         action_started = new_event("MotionEffectCameraActionStarted", action_uid=self.action_uid)
@@ -923,6 +2050,8 @@ class MotionEffectActionHandler(ActionHandler):
 
 
 class OverrideActionHandler(ActionHandler):
+    __slots__ = ("stopped_from_running",)
+
     action_stack: Deque[ActionHandler] = deque()
 
     def __init__(self, active_mode: bool, app: App) -> None:
@@ -975,6 +2104,8 @@ class OverrideActionHandler(ActionHandler):
 
 
 class PostureActionHandler(OverrideActionHandler):
+    __slots__ = ("progress",)
+
     triggers = ["StartPostureBotAction", "PostureBotActionStarted", "StopPostureBotAction", "PostureBotActionFinished"]
     action_name = "PostureBotAction"
     tui_element_id = "#bot-posture"
@@ -1021,6 +2152,8 @@ class PostureActionHandler(OverrideActionHandler):
 
 
 class PositionActionHandler(OverrideActionHandler):
+    __slots__ = ()
+
     triggers = [
         "StartPositionBotAction",
         "PositionBotActionStarted",
@@ -1057,6 +2190,8 @@ class PositionActionHandler(OverrideActionHandler):
 
 
 class CameraShotActionHandler(OverrideActionHandler):
+    __slots__ = ()
+
     triggers = [
         "StartShotCameraAction",
         "ShotCameraActionStarted",
@@ -1097,6 +2232,8 @@ class CameraShotActionHandler(OverrideActionHandler):
 
 
 class UtteranceBotActionHandler(ActionHandler):
+    __slots__ = ("progress",)
+
     triggers = [
         "StartUtteranceBotAction",
         "UtteranceBotActionStarted",
@@ -1105,6 +2242,7 @@ class UtteranceBotActionHandler(ActionHandler):
     ]
     action_name = "UtteranceBotAction"
     tui_element_id = "#bot-utterance"
+    tick_interval = TICK_INTERVAL
 
     @property
     def script(self) -> str:
@@ -1142,6 +2280,8 @@ class UtteranceBotActionHandler(ActionHandler):
 
 
 class VisualActionHandler(OverrideActionHandler):
+    __slots__ = ()
+
     tui_element_id = "#scene-ui"
     # All UI actions share one action stack
     action_stack: Deque[ActionHandler] = deque()
@@ -1188,6 +2328,8 @@ class VisualActionHandler(OverrideActionHandler):
 
 
 class VisualInformationActionHandler(VisualActionHandler):
+    __slots__ = ()
+
     triggers = [
         "StartVisualInformationSceneAction",
         "VisualInformationSceneActionStarted",
@@ -1242,6 +2384,8 @@ class VisualInformationActionHandler(VisualActionHandler):
 
 
 class VisualChoiceActionHandler(VisualActionHandler):
+    __slots__ = ()
+
     triggers = [
         "StartVisualChoiceSceneAction",
         "VisualChoiceSceneActionStarted",
@@ -1297,6 +2441,8 @@ class VisualChoiceActionHandler(VisualActionHandler):
 
 
 class VisualFormActionHandler(VisualActionHandler):
+    __slots__ = ()
+
     triggers = [
         "StartVisualFormSceneAction",
         "VisualFormSceneActionStarted",
@@ -1351,6 +2497,175 @@ class VisualFormActionHandler(VisualActionHandler):
         self.send_event(action_finished)
 
 
+########################################################################################################################
+# SESSION LOG
+########################################################################################################################
+
+# Number of events kept in memory for the interaction history of the UI
+INTERACTION_HISTORY_SIZE = 1000
+
+
+def _open_log(path: Path, mode: str) -> IO[str]:
+    """Opens a log file in text mode ('r' or 'a'). Files ending in .zst are zstd compressed."""
+    if path.suffix != ".zst":
+        return open(path, mode, encoding="utf-8")
+    if zstandard is None:
+        raise RuntimeError(f"The zstandard package is needed to open {path}. Install it with `pip install zstandard`")
+    if mode == "r":
+        stream = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+    else:
+        # Every session appends its own zstd frame
+        stream = zstandard.ZstdCompressor().stream_writer(open(path, "ab"), closefd=True)
+    return io.TextIOWrapper(stream, encoding="utf-8")
+
+
+class SessionLog:
+    """Append-only log of all events of a session with one JSON event per line (NDJSON)"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = _open_log(path, "a")
+
+    def append(self, event: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(event) + "\n")
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _iter_json_list(f: IO[str], chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """Decodes the elements of a JSON list chunk by chunk. The opening bracket has already been read."""
+    decoder = json.JSONDecoder()
+    buffer, position, eof = "", 0, False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            event, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        yield event
+
+
+def iter_event_log(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily reads the events of a session log (NDJSON, optionally zstd compressed). Event logs saved as a single
+    JSON list of events are supported as well.
+    """
+    with _open_log(path, "r") as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        if first == "[":
+            yield from _iter_json_list(f)
+            return
+
+        for line in itertools.chain([first + f.readline()], f):
+            if line.strip():
+                yield json.loads(line)
+
+
+########################################################################################################################
+# EVENT LOG REPLAY
+########################################################################################################################
+
+# Timestamps of action events that are set to the time of replay
+REPLAYED_TIMESTAMPS = ["event_created_at", "action_started_at", "action_updated_at", "action_finished_at"]
+
+
+def rebase_replayed_event(event: Dict[str, Any], action_uids: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Returns a copy of a recorded event with a new uid and timestamps set to now. Action UIDs are replaced
+    consistently (using `action_uids`) so that replayed actions do not collide with the recorded session.
+    """
+    replayed = dict(event)
+    replayed["uid"] = new_uuid()
+    now = datetime.now(timezone.utc).isoformat()
+    for timestamp in REPLAYED_TIMESTAMPS:
+        if timestamp in replayed:
+            replayed[timestamp] = now
+    if "action_uid" in replayed:
+        replayed["action_uid"] = action_uids.setdefault(replayed["action_uid"], new_uuid())
+    return replayed
+
+
+@dataclass
+class ReplayStats:
+    """
+    Latencies measured while replaying an event log:
+    - round trip: from publishing a replayed event until it is received back from the channel
+    - handler: time spent processing a received event in the action handlers
+    - response: from publishing a replayed event until the first event of another source (e.g. the bot) is received
+    - recorded response: the same as response but computed from the timestamps of the event log
+    """
+
+    events_sent: int = 0
+    events_received: int = 0
+    duration_s: float = 0.0
+    last_event_at: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.round_trip_ms: List[float] = []
+        self.handler_ms: List[float] = []
+        self.response_ms: List[float] = []
+        self.recorded_response_ms: List[float] = []
+        self._sent_at: Dict[str, float] = {}
+        self._awaiting_response_since: Optional[float] = None
+
+    def event_sent(self, event: Dict[str, Any], sent_at: float) -> None:
+        self.events_sent += 1
+        self.last_event_at = sent_at
+        self._sent_at[event["uid"]] = sent_at
+        self._awaiting_response_since = sent_at
+
+    def event_received(self, event: Dict[str, Any], received_at: float, handler_s: float) -> None:
+        self.events_received += 1
+        self.last_event_at = received_at
+        self.handler_ms.append(handler_s * 1000)
+        sent_at = self._sent_at.pop(event.get("uid", ""), None)
+        if sent_at is not None:
+            self.round_trip_ms.append((received_at - sent_at) * 1000)
+        elif self._awaiting_response_since is not None:
+            self.response_ms.append((received_at - self._awaiting_response_since) * 1000)
+            self._awaiting_response_since = None
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "events_sent": self.events_sent,
+            "events_received": self.events_received,
+            "events_lost": len(self._sent_at),
+            "duration_s": round(self.duration_s, 3),
+            "round_trip_ms": summarize_latencies(self.round_trip_ms),
+            "handler_ms": summarize_latencies(self.handler_ms),
+            "response_ms": summarize_latencies(self.response_ms),
+            "recorded_response_ms": summarize_latencies(self.recorded_response_ms),
+        }
+
+
+def print_replay_report(report: Dict[str, Any]) -> None:
+    print(
+        f"[green]Replayed {report['events_sent']} events in {report['duration_s']} s[/green] "
+        f"(received {report['events_received']}, lost {report['events_lost']})"
+    )
+    print(f"{'latency (ms)':<22}{'count':>8}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    for name in ["round_trip_ms", "handler_ms", "response_ms", "recorded_response_ms"]:
+        stats = report[name]
+        print(
+            f"{name[:-3]:<22}{stats['count']:>8}{stats['mean']:>10.2f}{stats['p50']:>10.2f}"
+            f"{stats['p90']:>10.2f}{stats['p99']:>10.2f}{stats['max']:>10.2f}"
+        )
+
+
 ########################################################################################################################
 # Textual UI
 ########################################################################################################################
@@ -1482,9 +2797,6 @@ class UmimTuiApp(App):
 
     show_sidebar = reactive(False)
 
-    event_worker: Optional[Worker] = None
-    interaction_history: List[Dict[str, Any]] = []
-
     utterance_to_process: Optional[Dict[str, Any]] = None
     motion_to_process: Optional[Dict[str, Any]] = None
 
@@ -1493,16 +2805,41 @@ class UmimTuiApp(App):
     show_system_events = False
     show_timestamps = False
 
-    def __init__(self, event_log_path: Optional[Path] = None):
+    def __init__(
+        self,
+        event_log_path: Optional[Path] = None,
+        replay_speed: Optional[float] = None,
+        replay_all: bool = False,
+        replay_idle_timeout: float = 2.0,
+        session_log: Optional[SessionLog] = None,
+        history_size: int = INTERACTION_HISTORY_SIZE,
+    ):
+        """
+        If `replay_speed` is set the events of the event log are replayed into the stream at that speed
+        (0 is as fast as possible) and the app exits with the `ReplayStats` once the stream has been idle for
+        `replay_idle_timeout` seconds. Unless `replay_all` is set only the events sent by this client are replayed.
+
+        All events are appended to the `session_log` if given, only the last `history_size` events are kept in memory.
+        """
         self.SUB_TITLE = f"Connected to stream {stream_id}"
         super().__init__()
 
         self.running_actions: Dict[str, ActionHandler] = {}
         self.latest_action_id_per_action: Dict[str, List[str]] = {}
+        # Insertion ordered, the oldest entries are dropped first
+        self.finished_action_uids: Dict[str, None] = {}
         self.trigger_to_handler: Dict[str, Type[ActionHandler]] = {}
+        self.action_scheduler = ActionScheduler()
+        self._action_timer: Optional[Timer] = None
+        self._action_timer_deadline = 0.0
         self.event_log_path = event_log_path
-        self.event_log_index = 0
-        self.event_log: List[Dict[str, Any]] = []
+        self.event_log: Iterator[Dict[str, Any]] = iter(())
+        self.interaction_history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self.session_log = session_log
+        self.replay_speed = replay_speed
+        self.replay_all = replay_all
+        self.replay_idle_timeout = replay_idle_timeout
+        self.replay_stats: Optional[ReplayStats] = ReplayStats() if replay_speed is not None else None
         self.current_animation = "idle"
 
         for handler_cls in [
@@ -1526,9 +2863,7 @@ class UmimTuiApp(App):
             self.trigger_to_handler[trigger] = handler_cls
 
     def _load_event_log(self) -> None:
-        with open(self.event_log_path, "r", encoding="utf-8") as f:
-            self.event_log = json.loads(f.read())
-            self.event_log_index = -1
+        self.event_log = iter_event_log(self.event_log_path)
 
     @property
     def chat_log(self) -> TextLog:
@@ -1542,20 +2877,33 @@ class UmimTuiApp(App):
 
     def on_mount(self) -> None:
         self.channel = channel_id
+        provider_options: Dict[str, Any] = {"batch_size": event_batch_size}
+        if event_consumer_group:
+            provider_options.update(consumer_group=event_consumer_group, consumer_name=event_consumer_name)
         self.event_client = event_provider_factory(
-            "redis",
+            event_provider_name,
             redis_host,
             redis_port,
             [self.channel],
             discard_existing_events=False,
+            **provider_options,
         )
+        self.event_consumer = EventConsumer(self.event_client, timeout_ms=200)
+        self.event_consumer.start()
+        self.event_publisher = EventPublisher(self.event_client)
+        self.event_publisher.start()
+        self.run_worker(self.process_events(), group="event_receivers", exclusive=False)
 
-        if create_pipeline:
-            self.run_worker(self.event_client.redis.delete(self.channel), exclusive=False)  # type: ignore
-            self.run_worker(self.send_pipeline_acquired(), exclusive=False)
+        if self.replay_stats is None and create_pipeline:
+            self.run_worker(self.prepare_pipeline(), exclusive=False)
 
-        self.update_timer = self.set_interval(1 / 10, self.update_time, pause=False)
-        self.action_task = self.set_interval(1 / 10, self.process_actions, pause=False)
+        self.lag_timer = self.set_interval(1, self.update_lag, pause=False)
+        self.session_log_timer = self.set_interval(1, self.flush_session_log, pause=False)
+
+    def on_ready(self) -> None:
+        # Replay once the first screen has been rendered so that rendering does not add to the measured latencies
+        if self.replay_stats is not None:
+            self.run_worker(self.replay_event_log(), exclusive=False)
 
     def on_input_changed(self, event: Input.Changed) -> None:
         """Called as the user types."""
@@ -1575,7 +2923,7 @@ class UmimTuiApp(App):
             action_started = new_event("UtteranceUserActionStarted", action_uid=new_uuid())
             self.user_utterance.interim_transcript = ""
             self.user_utterance.action_uid = action_started["action_uid"]
-            self.run_worker(self.send_events(action_started), exclusive=False)
+            self.send_events(action_started)
 
         if abs(self.user_utterance.interim_transcript.count(" ") - event.value.count(" ")) > 1:
             self.user_utterance.interim_transcript = event.value
@@ -1586,42 +2934,120 @@ class UmimTuiApp(App):
                 stability=0.1,
             )
 
-            self.run_worker(self.send_events(action_updated), exclusive=False)
+            self.send_events(action_updated)
 
-    async def process_actions(self) -> None:
-        handlers_to_remove = []
-        for handler in self.running_actions.values():
-            if handler.state == "finished":
-                handlers_to_remove.append(handler.action_uid)
-            else:
-                if handler.state == "running":
-                    if not handler.task_done:
-                        handler.tick(InternalEvent("tick"))
-                    else:
-                        handler.done(InternalEvent("done"))
-
-        for id in handlers_to_remove:
-            handler = self.running_actions[id]
-            self.latest_action_id_per_action[handler.action_name].remove(id)
-            del self.running_actions[id]
-
-    async def update_time(self) -> None:
-        if self.event_worker and (
-            self.event_worker.state == WorkerState.RUNNING or self.event_worker.state == WorkerState.PENDING
-        ):
+    def schedule_action(self, handler: ActionHandler) -> None:
+        """Register the next wake-up time of a running action handler"""
+        deadline = handler.next_tick_at(time.monotonic())
+        if deadline is None:
+            return
+        self.action_scheduler.schedule(handler, deadline)
+        self._arm_action_timer()
+
+    def _arm_action_timer(self) -> None:
+        deadline = self.action_scheduler.next_deadline()
+        if deadline is None:
             return
+        if self._action_timer is not None:
+            if self._action_timer_deadline <= deadline:
+                return
+            self._action_timer.stop()
+        self._action_timer_deadline = deadline
+        # Timers with a delay of 0 are never fired
+        self._action_timer = self.set_timer(max(deadline - time.monotonic(), 0.001), self.process_actions)
+
+    def _remove_if_finished(self, handler: ActionHandler) -> None:
+        if handler.state != "finished" or self.running_actions.get(handler.action_uid) is not handler:
+            return
+        self.action_scheduler.unschedule(handler)
+        self.latest_action_id_per_action[handler.action_name].remove(handler.action_uid)
+        del self.running_actions[handler.action_uid]
+        self.finished_action_uids[handler.action_uid] = None
+        if len(self.finished_action_uids) > FINISHED_ACTIONS_TO_REMEMBER:
+            del self.finished_action_uids[next(iter(self.finished_action_uids))]
 
-        self.event_worker = self.run_worker(self.process_events(), group="event_receivers", exclusive=False)
+    async def process_actions(self) -> None:
+        self._action_timer = None
+        for handler in self.action_scheduler.pop_due(time.monotonic()):
+            if handler.state == "running":
+                if not handler.task_done:
+                    # Entering the running state again schedules the next tick
+                    handler.tick(InternalEvent("tick"))
+                if handler.task_done:
+                    handler.done(InternalEvent("done"))
+            self._remove_if_finished(handler)
+        self._arm_action_timer()
+
+    def flush_session_log(self) -> None:
+        if self.session_log is not None:
+            self.session_log.flush()
+
+    async def update_lag(self) -> None:
+        lag = await self.event_consumer.get_lag_ms()
+        self.sub_title = f"Connected to stream {stream_id} (lag: {lag.get(self.channel, 0)} ms)"
 
     async def process_events(self) -> None:
-        events = await self.event_client.receive_events(200)
-        for event_str in events:
-            event = json.loads(event_str)
-            self.add_event(event)
+        while True:
+            events = await self.event_consumer.get_events()
+            for event in decode_received_events(events):
+                if self.replay_stats is None:
+                    self.add_event(event)
+                    continue
+                received_at = time.monotonic()
+                self.add_event(event)
+                self.replay_stats.event_received(event, received_at, time.monotonic() - received_at)
+            await self.event_consumer.ack_events()
+
+    async def replay_event_log(self) -> None:
+        """Publishes the events of the event log keeping their recorded timing scaled by the replay speed"""
+        assert self.replay_stats is not None and self.replay_speed is not None
+        stats = self.replay_stats
+        if create_pipeline:
+            await self.prepare_pipeline()
+
+        self._load_event_log()
+        action_uids: Dict[str, str] = {}
+        started_at = stats.last_event_at = time.monotonic()
+        first_created_at: Optional[float] = None
+        recorded_sent_at: Optional[float] = None
+        for event in self.event_log:
+            # Skip entries that are not UMIM events (e.g. errors of the app)
+            if "uid" not in event or "event_created_at" not in event:
+                continue
+            created_at = read_isoformat(event["event_created_at"]).timestamp()
+            if not self.replay_all and event.get("source_uid") != SOURCE_UID:
+                if recorded_sent_at is not None:
+                    stats.recorded_response_ms.append((created_at - recorded_sent_at) * 1000)
+                    recorded_sent_at = None
+                continue
+
+            if first_created_at is None:
+                first_created_at = created_at
+            if self.replay_speed > 0:
+                delay = started_at + (created_at - first_created_at) / self.replay_speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            replayed = rebase_replayed_event(event, action_uids)
+            stats.event_sent(replayed, time.monotonic())
+            self.event_publisher.publish(self.channel, replayed)
+            recorded_sent_at = created_at
+
+        while True:
+            idle = time.monotonic() - stats.last_event_at
+            if idle >= self.replay_idle_timeout:
+                break
+            await asyncio.sleep(self.replay_idle_timeout - idle)
+
+        stats.duration_s = stats.last_event_at - started_at
+        if create_pipeline:
+            await self.send_pipeline_released()
+        await self.event_publisher.flush()
+        self.exit(stats)
 
-    async def send_events(self, event_data: Union[str, dict]) -> None:
+    def send_events(self, event_data: Union[str, dict]) -> None:
         if isinstance(event_data, dict):
-            if event_data["action_uid"] == "LATEST":
+            if event_data.get("action_uid") == "LATEST":
                 action_name = self.trigger_to_handler[event_data["type"]].action_name
                 if (
                     action_name in self.latest_action_id_per_action
@@ -1631,7 +3057,11 @@ class UmimTuiApp(App):
                 else:
                     self.add_event({"type": "Error", "reason": f"LATEST used but no running {action_name}"})
 
-        await self.event_client.send_event(self.channel, event_data)
+        self.event_publisher.publish(self.channel, event_data)
+
+    async def prepare_pipeline(self) -> None:
+        await self.event_client.clear_channel(self.channel)
+        await self.send_pipeline_acquired()
 
     async def send_pipeline_acquired(self) -> None:
         session_user_id = new_uuid()
@@ -1759,21 +3189,30 @@ class UmimTuiApp(App):
             sidebar.add_class("-hidden")
 
     def _show_event(self, event: Dict[str, Any]) -> None:
+        # Nobody looks at the interaction history of a headless replay
+        if self.replay_stats is not None:
+            return
         if self.show_system_events or "is_system_action" not in event or not event["is_system_action"]:
             entry = pretty_event(event, show_time=self.show_timestamps)
             self.chat_log.write(entry)
             # self.update_ui(event)
 
     def action_save_interaction(self) -> None:
-        """An action to toggle showing all events ."""
-        if len(self.interaction_history) > 0:
-            with open(f"interaction_{channel_id}.json", "w", encoding="utf-8") as f:
-                f.write(json.dumps(self.interaction_history, indent=4))
+        """
+        An action to save the events of the session. Without a session log one is started with the events
+        still in the interaction history, all further events are appended to it as they arrive.
+        """
+        if self.session_log is None:
+            self.session_log = SessionLog(Path(f"interaction_{channel_id}.ndjson"))
+            for event in self.interaction_history:
+                self.session_log.append(event)
+        self.session_log.flush()
 
     def action_exit_app(self) -> None:
         """Exit the app"""
         if create_pipeline:
             asyncio.ensure_future(self.send_pipeline_released())
+        asyncio.ensure_future(self.event_publisher.flush())
         self.exit()
 
     def on_input_submitted(self, event: Input.Submitted) -> None:
@@ -1783,6 +3222,8 @@ class UmimTuiApp(App):
     def add_event(self, event_dict: Dict[str, Any]) -> None:
         self._show_event(event_dict)
         self.interaction_history.append(event_dict)
+        if self.session_log is not None:
+            self.session_log.append(event_dict)
 
         # Is it a UMIM event?
         if "uid" in event_dict:
@@ -1795,6 +3236,9 @@ class UmimTuiApp(App):
                 action_uid = event["action_uid"]
                 handler = None
 
+                if action_uid in self.finished_action_uids:
+                    # Late event of a finished action, e.g. the echo of a Started that was sent before the Stop
+                    return
                 if action_uid in self.running_actions:
                     handler = self.running_actions[action_uid]
                 elif ("Started" in event["type"] or "Start" in event["type"]) and event[
@@ -1815,6 +3259,7 @@ class UmimTuiApp(App):
                         handler.stop(event)
                     elif "Finished" in event["type"]:
                         handler.finished(event)
+                    self._remove_if_finished(handler)
             except Exception as e:
                 self.add_event(
                     {
@@ -1826,15 +3271,13 @@ class UmimTuiApp(App):
     def send_event(self, event_description: str) -> None:
         if event_description[:5] == "/bot ":
             event = new_event("StartUtteranceBotAction", script=event_description[5:])
-            self.run_worker(self.send_events(event), exclusive=False)
+            self.send_events(event)
         elif event_description.startswith("{"):
             try:
                 event_json = json.loads(event_description)
                 event_type = event_json["type"]
                 del event_json["type"]
-                self.run_worker(
-                    self.send_events(json.dumps(new_event(event_type=event_type, **event_json))), exclusive=False
-                )
+                self.send_events(json.dumps(new_event(event_type=event_type, **event_json)))
             except Exception as e:
                 self.add_event({"type": "Error", "reason": str(e)})
         else:
@@ -1845,38 +3288,223 @@ class UmimTuiApp(App):
                 is_success=True,
             )
             self.user_utterance = UserUtteranceState(in_progress=False, interim_transcript="", action_uid="")
-            self.run_worker(self.send_events(action_finished), exclusive=False)
+            self.send_events(action_finished)
+
+
+def stream_channel(stream_uid: str) -> str:
+    return f"umim_events_{stream_uid}"
+
+
+class StreamMetrics:
+    """Live metrics of a single stream shown in the dashboard"""
+
+    # Seconds over which the event rate is computed
+    RATE_WINDOW = 10.0
+
+    def __init__(self, stream_uid: str) -> None:
+        self.stream_uid = stream_uid
+        self.active = True
+        # When the stream was released (time.monotonic)
+        self.released_at: Optional[float] = None
+        self.events = 0
+        self.last_event_at: Optional[float] = None
+        # Action name of all actions that were started but did not finish yet
+        self.open_actions: Dict[str, str] = {}
+        # Time from user utterance finished to bot utterance started
+        self.response_latencies_ms: Deque[float] = deque(maxlen=100)
+        self._user_utterance_finished_at: Optional[datetime] = None
+        self._received_at: Deque[float] = deque()
+
+    def add_event(self, event: Dict[str, Any], received_at: float) -> None:
+        event_type = event["type"]
+        self.events += 1
+        self.last_event_at = received_at
+        self._received_at.append(received_at)
+
+        action_uid = event.get("action_uid")
+        if action_uid:
+            if "Finished" in event_type:
+                self.open_actions.pop(action_uid, None)
+            elif "Start" in event_type:
+                self.open_actions[action_uid] = get_action_name(event_type)
+
+        if event_type == "UtteranceUserActionFinished":
+            self._user_utterance_finished_at = read_isoformat(event["event_created_at"])
+        elif event_type == "UtteranceBotActionStarted" and self._user_utterance_finished_at is not None:
+            latency = read_isoformat(event["event_created_at"]) - self._user_utterance_finished_at
+            self.response_latencies_ms.append(latency.total_seconds() * 1000)
+            self._user_utterance_finished_at = None
+
+    def event_rate(self, now: float) -> float:
+        while self._received_at and self._received_at[0] < now - self.RATE_WINDOW:
+            self._received_at.popleft()
+        return len(self._received_at) / self.RATE_WINDOW
+
+
+class DashboardApp(App):
+    """Live metrics of many streams read with a single multiplexed read"""
 
+    TITLE = "ACE CLI Simulator"
+    SUB_TITLE = "Dashboard"
+
+    BINDINGS = [("ctrl+c", "quit", "Exit")]
+
+    # Seconds for which a released stream is still shown
+    RELEASED_STREAM_RETENTION = 60.0
+
+    COLUMNS = [
+        ("Stream", "stream"),
+        ("Status", "status"),
+        ("Events", "events"),
+        ("Events/s", "rate"),
+        ("Open actions", "open_actions"),
+        ("Response p50 (ms)", "response_p50"),
+        ("Response p90 (ms)", "response_p90"),
+        ("Last event (s ago)", "last_event"),
+    ]
 
-async def list_all_active_streams(redis_host, redis_port) -> None:
-    event_client = event_provider_factory(
-        "redis",
-        redis_host,
-        redis_port,
-        [SYSTEM_EVENTS_STREAM],
-        discard_existing_events=False,
-    )
+    def __init__(self, stream_uids: Optional[List[str]] = None, discovery_interval: float = 5.0):
+        """
+        Shows the given streams. Without `stream_uids` all active streams of the stream registry are shown and
+        the registry is checked for new streams every `discovery_interval` seconds.
+        """
+        super().__init__()
+        self.metrics: Dict[str, StreamMetrics] = {}
+        self.stream_uids = stream_uids
+        self.discovery_interval = discovery_interval
+        self._streams_added = asyncio.Event()
 
-    streams = {}
-    events = await event_client.receive_events()
-    for event_str in events:
-        event = json.loads(event_str)
-        if event["type"].strip() == "PipelineAcquired":
-            streams[event["stream_uid"]] = ("ACTIVE", event["event_created_at"])
-        elif event["type"].strip() == "PipelineReleased":
-            streams[event["stream_uid"]] = ("DONE", event["event_created_at"])
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)
+        yield DataTable()
+        yield Footer()
+
+    @property
+    def table(self) -> DataTable:
+        return self.query_one(DataTable)
 
-    active_streams = [(id, status) for id, status in streams.items() if status[0] != "DONE"]
-    completed_streams = [(id, status) for id, status in streams.items() if status[0] == "DONE"]
-    print(f"[green]Active streams:[/green]")
-    for id, status in active_streams:
-        time_difference = datetime.now(timezone.utc) - read_isoformat(status[1])
-        print(f"Stream {id} is running since: {status[1]} (for {time_difference})")
+    def on_mount(self) -> None:
+        for label, key in self.COLUMNS:
+            self.table.add_column(label, key=key)
+
+        self.event_client = event_provider_factory(
+            event_provider_name, redis_host, redis_port, [], batch_size=event_batch_size
+        )
+        if self.stream_uids is not None:
+            for stream_uid in self.stream_uids:
+                self.watch_stream(stream_uid, discard_existing_events=True)
+        else:
+            self.registry = stream_registry_factory(event_provider_name, redis_host, redis_port)
+            self.run_worker(self.discover_streams(discard_existing_events=True), exclusive=False)
+            self.set_interval(self.discovery_interval, self.discover_streams, pause=False)
+
+        self.run_worker(self.process_events(), exclusive=False)
+        self.set_interval(1, self.update_table, pause=False)
+
+    def watch_stream(self, stream_uid: str, discard_existing_events: bool) -> None:
+        metrics = self.metrics.get(stream_uid)
+        if metrics is not None:
+            if metrics.active:
+                return
+            # The stream was acquired again after its release, start with new metrics
+            self.drop_stream(stream_uid)
+        self.metrics[stream_uid] = StreamMetrics(stream_uid)
+        self.event_client.add_channel(stream_channel(stream_uid), discard_existing_events)
+        self.table.add_row(*[""] * len(self.COLUMNS), key=stream_uid)
+        self._streams_added.set()
+
+    async def discover_streams(self, discard_existing_events: bool = False) -> None:
+        """Watches all new active streams. Events that were sent before the dashboard started are skipped."""
+        await self.registry.update()
+        active_streams, _ = await self.registry.list_streams(active=True)
+        active_uids = {stream.stream_uid for stream in active_streams}
+        for stream_uid in active_uids:
+            self.watch_stream(stream_uid, discard_existing_events)
+
+        now = time.monotonic()
+        for stream_uid, metrics in list(self.metrics.items()):
+            if stream_uid in active_uids:
+                continue
+            if metrics.active:
+                # No more events are expected, stop reading the channel but keep showing the stream for a while
+                metrics.active = False
+                metrics.released_at = now
+                self.event_client.remove_channel(stream_channel(stream_uid))
+            elif now - metrics.released_at >= self.RELEASED_STREAM_RETENTION:
+                self.drop_stream(stream_uid)
+
+    def drop_stream(self, stream_uid: str) -> None:
+        """Stops reading the stream and removes its metrics"""
+        self.event_client.remove_channel(stream_channel(stream_uid))
+        del self.metrics[stream_uid]
+        self.table.remove_row(stream_uid)
 
-    print("\n[red]The following streams are completed:[/red]")
-    for id, status in completed_streams:
-        time_difference = datetime.now(timezone.utc) - read_isoformat(status[1])
-        print(f"Stream {id} is done. Closed since {status[1]} (for {time_difference})")
+    async def process_events(self) -> None:
+        channel_to_stream = {}
+        while True:
+            if not any(metrics.active for metrics in self.metrics.values()):
+                # All streams were released (or none was found yet), there are no channels to read
+                self._streams_added.clear()
+                await self._streams_added.wait()
+            events_by_channel = await self.event_client.receive_events_by_channel(timeout_ms=500)
+            received_at = time.monotonic()
+            for channel, events in events_by_channel.items():
+                if channel not in channel_to_stream:
+                    channel_to_stream = {stream_channel(stream_uid): stream_uid for stream_uid in self.metrics}
+                metrics = self.metrics.get(channel_to_stream.get(channel))
+                if metrics is None:
+                    # The stream was dropped while its events were read
+                    continue
+                for event in decode_received_events(events):
+                    try:
+                        metrics.add_event(event, received_at)
+                    except (AttributeError, KeyError, TypeError, ValueError) as e:
+                        logger.warning(f"[Invalid event] Skipped event of {metrics.stream_uid} ({e!r}): {event}")
+
+    def update_table(self) -> None:
+        now = time.monotonic()
+        total_rate = 0.0
+        for stream_uid, metrics in self.metrics.items():
+            rate = metrics.event_rate(now)
+            total_rate += rate
+            latencies = sorted(metrics.response_latencies_ms)
+            row = {
+                "stream": stream_uid,
+                "status": "ACTIVE" if metrics.active else "DONE",
+                "events": str(metrics.events),
+                "rate": f"{rate:.1f}",
+                "open_actions": str(len(metrics.open_actions)),
+                "response_p50": f"{percentile(latencies, 50):.0f}" if latencies else "-",
+                "response_p90": f"{percentile(latencies, 90):.0f}" if latencies else "-",
+                "last_event": f"{now - metrics.last_event_at:.1f}" if metrics.last_event_at is not None else "-",
+            }
+            for column, value in row.items():
+                self.table.update_cell(stream_uid, column, value)
+
+        self.sub_title = f"Dashboard: {len(self.metrics)} streams, {total_rate:.1f} events/s"
+
+
+async def list_all_active_streams(redis_host, redis_port, offset: int = 0, limit: Optional[int] = None) -> None:
+    registry = stream_registry_factory(event_provider_name, redis_host, redis_port)
+    await registry.update()
+
+    def page_info(streams: List[StreamInfo], total: int) -> str:
+        if not streams:
+            return f"none of {total}"
+        return f"{offset + 1}-{offset + len(streams)} of {total}"
+
+    now = datetime.now(timezone.utc)
+    active_streams, total = await registry.list_streams(active=True, offset=offset, limit=limit)
+    print(f"[green]Active streams ({page_info(active_streams, total)}):[/green]")
+    for stream in active_streams:
+        time_difference = now - read_isoformat(stream.acquired_at)
+        print(f"Stream {stream.stream_uid} is running since: {stream.acquired_at} (for {time_difference})")
+
+    completed_streams, total = await registry.list_streams(active=False, offset=offset, limit=limit)
+    print(f"\n[red]The following streams are completed ({page_info(completed_streams, total)}):[/red]")
+    for stream in completed_streams:
+        time_difference = now - read_isoformat(stream.released_at)
+        print(f"Stream {stream.stream_uid} is done. Closed since {stream.released_at} (for {time_difference})")
 
 
 @cli.command()
@@ -1887,9 +3515,51 @@ def main(
     create: bool = True,
     active_mode: bool = True,
     list_streams: bool = False,
+    dashboard: Annotated[
+        bool, typer.Option(help="Show live metrics of many streams instead of a single stream.")
+    ] = False,
+    dashboard_streams: Annotated[
+        Optional[str],
+        typer.Option(help="Comma separated stream IDs shown in the dashboard. All active streams if not set."),
+    ] = None,
+    list_offset: Annotated[int, typer.Option(help="Number of streams to skip when listing streams.")] = 0,
+    list_limit: Annotated[
+        Optional[int], typer.Option(help="Maximum number of active and completed streams to list.")
+    ] = 50,
+    event_provider: Annotated[str, typer.Option(help="Event provider to use (redis, memory or file).")] = "redis",
     event_provider_host: Optional[str] = None,
     event_provider_port: Optional[int] = None,
     event_log: Optional[Path] = typer.Option(None),
+    replay: Annotated[
+        bool,
+        typer.Option(
+            help="Replay the events sent by this client in --event-log into the stream without UI and print a "
+            "latency report. Handlers run in passive mode."
+        ),
+    ] = False,
+    replay_speed: Annotated[float, typer.Option(help="Replay speed factor. 0 replays as fast as possible.")] = 1.0,
+    replay_all: Annotated[bool, typer.Option(help="Replay all events of the event log.")] = False,
+    replay_idle_timeout: Annotated[
+        float, typer.Option(help="Seconds without new events after which the replay is finished.")
+    ] = 2.0,
+    replay_report: Annotated[
+        Optional[Path], typer.Option(help="Write the replay latency report as JSON to this file.")
+    ] = None,
+    session_log: Annotated[
+        Optional[Path],
+        typer.Option(help="Append all events to this NDJSON file as they arrive (zstd compressed if it ends in .zst)."),
+    ] = None,
+    history_size: Annotated[
+        int, typer.Option(help="Number of events kept in memory for the interaction history.")
+    ] = INTERACTION_HISTORY_SIZE,
+    batch_size: Annotated[int, typer.Option(help="Maximum number of events fetched from Redis per read.")] = 100,
+    consumer_group: Annotated[
+        Optional[str],
+        typer.Option(help="Redis consumer group to join. Events of the stream are shared between its consumers."),
+    ] = None,
+    consumer_name: Annotated[
+        Optional[str], typer.Option(help="Consumer name within the consumer group. Random if not set.")
+    ] = None,
 ) -> None:
     global channel_id
     global create_pipeline
@@ -1897,11 +3567,20 @@ def main(
     global app_in_active_mode
     global redis_port
     global redis_host
+    global event_provider_name
+    global event_batch_size
+    global event_consumer_group
+    global event_consumer_name
 
     stream_id = stream or new_uuid()
-    channel_id = f"umim_events_{stream_id}"
+    channel_id = stream_channel(stream_id)
     create_pipeline = create
-    app_in_active_mode = active_mode
+    # Replayed events take the place of the events the client would send in active mode
+    app_in_active_mode = active_mode and not replay
+    event_provider_name = event_provider
+    event_batch_size = batch_size
+    event_consumer_group = consumer_group
+    event_consumer_name = consumer_name
 
     if event_provider_port:
         redis_port = event_provider_port
@@ -1909,11 +3588,44 @@ def main(
         redis_host = event_provider_host
 
     if list_streams:
-        asyncio.run(list_all_active_streams(redis_host, redis_port))
+        asyncio.run(list_all_active_streams(redis_host, redis_port, list_offset, list_limit))
         return
 
-    app = UmimTuiApp(event_log)
-    app.run()
+    if dashboard:
+        stream_uids = None
+        if dashboard_streams:
+            stream_uids = [uid.strip() for uid in dashboard_streams.split(",") if uid.strip()]
+        DashboardApp(stream_uids).run()
+        return
+
+    log = SessionLog(session_log) if session_log else None
+    if replay:
+        if event_log is None:
+            raise typer.BadParameter("--replay needs an --event-log")
+        app = UmimTuiApp(
+            event_log,
+            replay_speed=replay_speed,
+            replay_all=replay_all,
+            replay_idle_timeout=replay_idle_timeout,
+            session_log=log,
+            history_size=history_size,
+        )
+    else:
+        app = UmimTuiApp(event_log, session_log=log, history_size=history_size)
+
+    try:
+        result = app.run(headless=replay)
+    finally:
+        if app.session_log is not None:
+            app.session_log.close()
+
+    if replay:
+        if result is None:
+            raise typer.Exit(code=1)
+        report = result.report()
+        print_replay_report(report)
+        if replay_report:
+            replay_report.write_text(json.dumps(report, indent=4), encoding="utf-8")
 
 
 if __name__ == "__main__":
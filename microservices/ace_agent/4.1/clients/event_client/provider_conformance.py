@@ -0,0 +1,224 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022-2024 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+
+"""
+Conformance checks for the event providers of the event client. Every registered provider has to pass the same
+checks for sending, receiving, batching, lag, clearing, adding and removing channels.
+
+    python provider_conformance.py --providers memory file redis
+
+The redis provider runs against fakeredis if it is installed, else against the redis server given by --host/--port.
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from event_client import EventProvider, InMemoryEventBroker, event_provider_factory
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+RECEIVE_TIMEOUT_MS = 100
+
+
+class ProviderFixture:
+    """Creates providers of one kind that all share the same broker, log directory or redis server"""
+
+    def __init__(self, name: str, host: str, port: int, use_fakeredis: bool) -> None:
+        self.name = name
+        self.host = host
+        self.port = port
+        self._broker = InMemoryEventBroker()
+        self._log_dir = tempfile.TemporaryDirectory()
+        self._fake_server = fakeredis.FakeServer() if use_fakeredis else None
+
+    def create(self, channels: List[str], discard_existing_events: bool = True, **options) -> EventProvider:
+        if self.name == "memory":
+            options["broker"] = self._broker
+        host = self._log_dir.name if self.name == "file" else self.host
+        provider = event_provider_factory(self.name, host, self.port, channels, discard_existing_events, **options)
+        if self._fake_server is not None:
+            provider.redis = fakeredis.aioredis.FakeRedis(server=self._fake_server)
+        return provider
+
+    def close(self) -> None:
+        self._log_dir.cleanup()
+
+
+def new_channel() -> str:
+    return f"conformance_{uuid.uuid4().hex[:8]}"
+
+
+async def receive_until(provider: EventProvider, count: int, timeout_s: float = 2.0) -> Dict[str, List[List[str]]]:
+    """Receive until `count` events arrived. Returns the received batches per channel"""
+    batches: Dict[str, List[List[str]]] = {}
+    received = 0
+    deadline = time.monotonic() + timeout_s
+    while received < count and time.monotonic() < deadline:
+        for channel, events in (await provider.receive_events_by_channel(RECEIVE_TIMEOUT_MS)).items():
+            batches.setdefault(channel, []).append(events)
+            received += len(events)
+    return batches
+
+
+async def start_reading(provider: EventProvider) -> None:
+    """
+    Start receiving with an empty read. Providers may skip existing events relative to their first read
+    (like the "$" ID of redis streams), so only events sent after it are guaranteed to be received.
+    """
+    assert await provider.receive_events(RECEIVE_TIMEOUT_MS) == [], "received events that should be discarded"
+
+
+def flat(batches: Dict[str, List[List[str]]], channel: str) -> List[str]:
+    return [event for batch in batches.get(channel, []) for event in batch]
+
+
+async def check_send_receive(fixture: ProviderFixture) -> None:
+    channel = new_channel()
+    writer = fixture.create([channel])
+    await writer.send_event(channel, {"type": "Old"})
+    reader = fixture.create([channel])
+    history_reader = fixture.create([channel], discard_existing_events=False)
+    await start_reading(reader)
+    await writer.send_event(channel, {"type": "New"})
+    await writer.send_event(channel, '{"type": "Text"}')
+
+    events = flat(await receive_until(reader, 2), channel)
+    assert events == ['{"type": "New"}', '{"type": "Text"}'], f"existing events were not discarded: {events}"
+    history = flat(await receive_until(history_reader, 3), channel)
+    assert len(history) == 3 and '"Old"' in history[0], f"existing events were not received: {history}"
+
+    start = time.monotonic()
+    assert await reader.receive_events(RECEIVE_TIMEOUT_MS) == [], "received events twice"
+    assert time.monotonic() - start < RECEIVE_TIMEOUT_MS / 1000 + 1.0, "receive did not return after its timeout"
+
+
+async def check_batch(fixture: ProviderFixture) -> None:
+    channels = [new_channel(), new_channel()]
+    writer = fixture.create(channels)
+    reader = fixture.create(channels, batch_size=100)
+    await start_reading(reader)
+    await writer.send_events_batch([(channels[i % 2], {"type": "Event", "index": i}) for i in range(250)])
+
+    batches = await receive_until(reader, 250)
+    for offset, channel in enumerate(channels):
+        assert all(len(batch) <= 100 for batch in batches[channel]), "batch size was not respected"
+        indexes = [int(event.split('"index": ')[1].rstrip("}")) for event in flat(batches, channel)]
+        assert indexes == list(range(offset, 250, 2)), f"events of {channel} are missing or out of order"
+
+
+async def check_lag(fixture: ProviderFixture) -> None:
+    channel = new_channel()
+    writer = fixture.create([channel])
+    reader = fixture.create([channel], batch_size=1)
+    await start_reading(reader)
+    await writer.send_event(channel, {"type": "First"})
+    await receive_until(reader, 1)
+    await asyncio.sleep(0.01)
+    await writer.send_events_batch([(channel, {"type": "Later"})] * 3)
+
+    lag = await reader.get_lag_ms()
+    assert set(lag) <= {channel}, f"lag reported for unknown channels: {lag}"
+    assert all(isinstance(value, int) and value >= 0 for value in lag.values()), f"invalid lag: {lag}"
+    await receive_until(reader, 3)
+    assert all(value == 0 for value in (await reader.get_lag_ms()).values()), "lag is not 0 after reading all"
+
+
+async def check_clear(fixture: ProviderFixture) -> None:
+    channel = new_channel()
+    writer = fixture.create([channel])
+    reader = fixture.create([channel])
+    await start_reading(reader)
+    await writer.send_events_batch([(channel, {"type": "Before"})] * 3)
+    await receive_until(reader, 3)
+
+    await writer.clear_channel(channel)
+    assert await fixture.create([channel], discard_existing_events=False).receive_events(RECEIVE_TIMEOUT_MS) == []
+    await writer.send_event(channel, {"type": "After"})
+    assert flat(await receive_until(reader, 1), channel) == ['{"type": "After"}'], "lost events after clearing"
+
+
+async def check_add_channel(fixture: ProviderFixture) -> None:
+    first, second = new_channel(), new_channel()
+    writer = fixture.create([first, second])
+    reader = fixture.create([first])
+    await start_reading(reader)
+    await writer.send_event(second, {"type": "Before"})
+    reader.add_channel(second)
+    await start_reading(reader)
+    await writer.send_event(second, {"type": "After"})
+    await writer.send_event(first, {"type": "First"})
+
+    batches = await receive_until(reader, 2)
+    assert flat(batches, second) == ['{"type": "After"}'], f"added channel: {flat(batches, second)}"
+    assert flat(batches, first) == ['{"type": "First"}'], f"existing channel: {flat(batches, first)}"
+
+
+async def check_remove_channel(fixture: ProviderFixture) -> None:
+    first, second = new_channel(), new_channel()
+    writer = fixture.create([first, second])
+    reader = fixture.create([first, second])
+    await start_reading(reader)
+    reader.remove_channel(second)
+    await writer.send_event(second, {"type": "Removed"})
+    await writer.send_event(first, {"type": "First"})
+
+    batches = await receive_until(reader, 2, timeout_s=0.5)
+    assert second not in batches, f"removed channel: {flat(batches, second)}"
+    assert flat(batches, first) == ['{"type": "First"}'], f"remaining channel: {flat(batches, first)}"
+
+
+CHECKS: Dict[str, Callable[[ProviderFixture], "asyncio.Future[None]"]] = {
+    "send/receive": check_send_receive,
+    "batch": check_batch,
+    "lag": check_lag,
+    "clear": check_clear,
+    "add channel": check_add_channel,
+    "remove channel": check_remove_channel,
+}
+
+
+async def run(providers: List[str], host: str, port: int) -> int:
+    failures = 0
+    for name in providers:
+        if name == "redis" and fakeredis is None:
+            print(f"fakeredis is not installed, testing the redis provider against {host}:{port}")
+        fixture = ProviderFixture(name, host, port, use_fakeredis=name == "redis" and fakeredis is not None)
+        try:
+            for check_name, check in CHECKS.items():
+                try:
+                    await check(fixture)
+                    print(f"PASS {name:<8} {check_name}")
+                except Exception as e:
+                    failures += 1
+                    print(f"FAIL {name:<8} {check_name}: {type(e).__name__}: {e}")
+        finally:
+            fixture.close()
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Conformance checks for the event providers of the event client")
+    parser.add_argument("--providers", nargs="+", default=["memory", "file", "redis"], help="Providers to check")
+    parser.add_argument("--host", default="localhost", help="Redis host if fakeredis is not installed")
+    parser.add_argument("--port", default=6379, type=int, help="Redis port if fakeredis is not installed")
+    args = parser.parse_args(argv)
+    return 1 if asyncio.run(run(args.providers, args.host, args.port)) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022-2024 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+
+"""
+Benchmark for rendering the short string of recorded events, as the event client does for every event of the chat
+log. The formatter lookup in _event_formatters is compared against comparing the event type with every entry in turn
+and formatting the timestamp with strftime, as the elif chain did before the dispatch table.
+
+    python render_benchmark.py --events 100000
+"""
+
+import argparse
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from event_client import (
+    _event_formatters,
+    _event_to_short_str,
+    _format_generic,
+    _type_to_sign,
+    new_event,
+    new_uuid,
+    read_isoformat,
+)
+
+
+def event_to_short_str_chain(event: Dict[str, Any], show_time: bool = True) -> str:
+    """Renders the event like _event_to_short_str, with one type comparison per formatter until one matches"""
+    action_info = ""
+    if "action_uid" in event:
+        action_info = f", id={event['action_uid'][0:4]}.."
+
+    formatter = _format_generic
+    for event_type, type_formatter in _event_formatters.items():
+        if event["type"] == event_type:
+            formatter = type_formatter
+            break
+    param_str = formatter(event, action_info)
+
+    timestamp = ""
+    if show_time:
+        timestamp = f"[blue]{read_isoformat(event['event_created_at']).strftime('%m/%d,%H:%M:%S.%f')}[/blue] "
+    return f"{timestamp}{_type_to_sign.__wrapped__(event['type'])}{event['type']}({param_str})"
+
+
+def create_events(count: int) -> List[Dict[str, Any]]:
+    """A mix of the events of a conversation with utterances, gestures, a timer and intents"""
+    templates = [
+        new_event("UtteranceUserActionStarted", action_uid=new_uuid()),
+        new_event("UtteranceUserActionTranscriptUpdated", action_uid=new_uuid(), interim_transcript="what is"),
+        new_event("UtteranceUserActionFinished", action_uid=new_uuid(), final_transcript="what is up", is_success=True),
+        new_event("UserIntent", intent="ask status"),
+        new_event("BotIntent", intent="respond status"),
+        new_event("StartUtteranceBotAction", script="All good"),
+        new_event("UtteranceBotActionStarted", action_uid=new_uuid()),
+        new_event("UtteranceBotActionFinished", action_uid=new_uuid(), final_script="All good", is_success=True),
+        new_event("StartGestureBotAction", gesture="wave"),
+        new_event("GestureBotActionFinished", action_uid=new_uuid(), is_success=True, was_stopped=False),
+        new_event("StartTimerBotAction", timer_name="idle", duration=5),
+        new_event("TimerBotActionFinished", action_uid=new_uuid(), is_success=True, was_stopped=True),
+    ]
+    return [templates[i % len(templates)] for i in range(count)]
+
+
+def run(
+    render: Callable[[Dict[str, Any], bool], str], events: List[Dict[str, Any]], show_time: bool, repeat: int
+) -> float:
+    """Best time of `repeat` runs over all events"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for event in events:
+            render(event, show_time)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark for rendering the short string of events")
+    parser.add_argument("--events", default=100000, type=int, help="Number of events to render")
+    parser.add_argument("--repeat", default=7, type=int, help="Number of runs, the best one is reported")
+    args = parser.parse_args(argv)
+
+    events = create_events(args.events)
+    for show_time in [True, False]:
+        if any(_event_to_short_str(e, show_time) != event_to_short_str_chain(e, show_time) for e in events[:100]):
+            print("The dispatch table does not render the events like the type comparisons")
+            return 1
+
+    print(f"Events:              {args.events}")
+    for show_time, label in [(True, "With timestamps"), (False, "Without timestamps")]:
+        chain_s = run(event_to_short_str_chain, events, show_time, args.repeat)
+        table_s = run(_event_to_short_str, events, show_time, args.repeat)
+        print(f"{label + ':':<21}{chain_s:.3f} s with type comparisons, {table_s:.3f} s with the dispatch table")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022-2024 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+
+
+# UMIM LOAD GENERATOR
+# Simulates many concurrent users that talk to a bot through the ACE Agent event interface. Every user gets its own
+# stream and sends user utterances (and optionally presence and visual form events) at configurable rates. The time
+# until the bot starts to respond with a StartUtteranceBotAction is measured and reported with percentiles.
+########################################################################################################################
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import typer
+from rich import print
+from typing_extensions import Annotated
+
+from event_client import (
+    SOURCE_UID,
+    SYSTEM_EVENTS_STREAM,
+    EventProvider,
+    EventPublisher,
+    decode_received_events,
+    event_provider_factory,
+    new_event,
+    new_uuid,
+    stream_channel,
+    summarize_latencies,
+)
+
+cli = typer.Typer()
+
+DEFAULT_UTTERANCES = [
+    "hi there",
+    "what can you do for me",
+    "tell me something interesting",
+    "how is the weather today",
+    "thank you, that is all",
+]
+
+
+@dataclass
+class LoadConfig:
+    users: int = 10
+    duration: float = 60.0
+    # Users are started evenly spread over the ramp up time
+    ramp_up: float = 5.0
+    # Mean time between the end of a bot response and the next user utterance (exponentially distributed)
+    think_time: float = 3.0
+    transcript_updates: int = 3
+    transcript_update_interval: float = 0.2
+    # Mean time between changes of the user presence. 0 disables presence events.
+    presence_interval: float = 0.0
+    # Mean time between form inputs while the bot shows a visual form. 0 disables visual form events.
+    form_interval: float = 0.0
+    response_timeout: float = 10.0
+    # Time the simulated client needs to "speak" a bot utterance before sending UtteranceBotActionFinished
+    bot_utterance_duration: float = 0.5
+    create_pipelines: bool = True
+    stream_prefix: str = "loadgen"
+    utterances: List[str] = field(default_factory=lambda: list(DEFAULT_UTTERANCES))
+
+
+@dataclass
+class LoadStats:
+    turns: int = 0
+    timeouts: int = 0
+    events_received: int = 0
+    duration_s: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.response_latencies_ms: List[float] = []
+
+    def report(self, events_sent: int, failed_events: int) -> Dict[str, Any]:
+        duration = self.duration_s or 1.0
+        return {
+            "turns": self.turns,
+            "timeouts": self.timeouts,
+            "events_sent": events_sent,
+            "failed_events": failed_events,
+            "events_received": self.events_received,
+            "duration_s": round(self.duration_s, 3),
+            "turns_per_s": round(self.turns / duration, 3),
+            "events_sent_per_s": round(events_sent / duration, 3),
+            "events_received_per_s": round(self.events_received / duration, 3),
+            "response_ms": summarize_latencies(self.response_latencies_ms),
+        }
+
+
+class SimulatedUser:
+    """
+    A user talking to the bot on its own stream. The user also plays the part of the interactive system and
+    acknowledges the bot actions (Started, and Finished for bot utterances or when an action is stopped).
+    """
+
+    def __init__(self, generator: "LoadGenerator", stream_uid: str) -> None:
+        self.generator = generator
+        self.config = generator.config
+        self.stream_uid = stream_uid
+        self.channel = stream_channel(stream_uid)
+        self.present = False
+        self.form_action_uid: Optional[str] = None
+        self._response: Optional[asyncio.Future] = None
+        # Timer that finishes the bot utterance and its script, by action_uid of the running bot utterances
+        self._utterances: Dict[str, Tuple[asyncio.TimerHandle, str]] = {}
+
+    def send(self, event_type: str, **payload: Any) -> Dict[str, Any]:
+        event = new_event(event_type, **payload)
+        self.generator.publisher.publish(self.channel, event)
+        return event
+
+    async def run(self, start_delay: float, end_time: float) -> None:
+        await asyncio.sleep(start_delay)
+        if self.config.create_pipelines:
+            self.generator.publisher.publish(
+                SYSTEM_EVENTS_STREAM, new_event("PipelineAcquired", stream_uid=self.stream_uid, user_uid=new_uuid())
+            )
+
+        tasks = [asyncio.create_task(self._talk(end_time))]
+        if self.config.presence_interval > 0:
+            tasks.append(asyncio.create_task(self._change_presence(end_time)))
+        if self.config.form_interval > 0:
+            tasks.append(asyncio.create_task(self._fill_forms(end_time)))
+        await asyncio.gather(*tasks)
+
+        if self.config.create_pipelines:
+            self.generator.publisher.publish(
+                SYSTEM_EVENTS_STREAM, new_event("PipelineReleased", stream_uid=self.stream_uid)
+            )
+
+    async def _sleep_until_next(self, mean_interval: float, end_time: float) -> bool:
+        """Sleeps for an exponentially distributed time. Returns False if the test ends before."""
+        delay = random.expovariate(1 / mean_interval) if mean_interval > 0 else 0
+        if time.monotonic() + delay >= end_time:
+            await asyncio.sleep(max(end_time - time.monotonic(), 0))
+            return False
+        await asyncio.sleep(delay)
+        return True
+
+    async def _talk(self, end_time: float) -> None:
+        stats = self.generator.stats
+        while await self._sleep_until_next(self.config.think_time, end_time):
+            transcript = random.choice(self.config.utterances)
+            action_uid = new_uuid()
+            self.send("UtteranceUserActionStarted", action_uid=action_uid)
+            words = transcript.split()
+            for i in range(self.config.transcript_updates):
+                await asyncio.sleep(self.config.transcript_update_interval)
+                interim = " ".join(words[: max(1, len(words) * (i + 1) // (self.config.transcript_updates + 1))])
+                self.send(
+                    "UtteranceUserActionTranscriptUpdated",
+                    action_uid=action_uid,
+                    interim_transcript=interim,
+                    stability=0.1,
+                )
+
+            self._response = asyncio.get_running_loop().create_future()
+            self.send(
+                "UtteranceUserActionFinished", action_uid=action_uid, final_transcript=transcript, is_success=True
+            )
+            sent_at = time.monotonic()
+            try:
+                received_at = await asyncio.wait_for(self._response, self.config.response_timeout)
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                continue
+            finally:
+                self._response = None
+            stats.turns += 1
+            stats.response_latencies_ms.append((received_at - sent_at) * 1000)
+
+    async def _change_presence(self, end_time: float) -> None:
+        action_uid = new_uuid()
+        while await self._sleep_until_next(self.config.presence_interval, end_time):
+            if self.present:
+                self.send("PresenceUserActionFinished", action_uid=action_uid, is_success=True)
+                action_uid = new_uuid()
+            else:
+                self.send("PresenceUserActionStarted", action_uid=action_uid)
+            self.present = not self.present
+
+    async def _fill_forms(self, end_time: float) -> None:
+        while await self._sleep_until_next(self.config.form_interval, end_time):
+            if self.form_action_uid is None:
+                continue
+            if random.random() < 0.8:
+                value = random.choice(self.config.utterances)
+                self.send(
+                    "VisualFormSceneActionInputUpdated",
+                    action_uid=self.form_action_uid,
+                    interim_inputs=[{"id": "input", "value": value}],
+                )
+            else:
+                self.send(
+                    "VisualFormSceneActionConfirmationUpdated",
+                    action_uid=self.form_action_uid,
+                    confirmation_status="confirm",
+                )
+
+    def on_event(self, event: Dict[str, Any], received_at: float) -> None:
+        event_type = event["type"]
+        action_uid = event.get("action_uid")
+        if event_type.startswith("Start") and action_uid:
+            self.send(event_type[len("Start") :] + "Started", action_uid=action_uid)
+            if event_type == "StartUtteranceBotAction":
+                if self._response is not None and not self._response.done():
+                    self._response.set_result(received_at)
+                timer = asyncio.get_running_loop().call_later(
+                    self.config.bot_utterance_duration, self._finish_utterance, action_uid
+                )
+                self._utterances[action_uid] = (timer, event.get("script", ""))
+            elif event_type == "StartVisualFormSceneAction":
+                self.form_action_uid = action_uid
+        elif event_type.startswith("Stop") and action_uid:
+            if action_uid == self.form_action_uid:
+                self.form_action_uid = None
+            if event_type == "StopUtteranceBotAction":
+                utterance = self._utterances.pop(action_uid, None)
+                if utterance is None:
+                    # The utterance already finished
+                    return
+                timer, script = utterance
+                timer.cancel()
+                self._finish_action("UtteranceBotAction", action_uid, is_success=False, final_script=script)
+            else:
+                self._finish_action(event_type[len("Stop") :], action_uid, is_success=False)
+
+    def _finish_utterance(self, action_uid: str) -> None:
+        _, script = self._utterances.pop(action_uid)
+        self._finish_action("UtteranceBotAction", action_uid, final_script=script)
+
+    def _finish_action(self, action_name: str, action_uid: str, is_success: bool = True, **payload: Any) -> None:
+        payload.update(action_uid=action_uid, is_success=is_success)
+        if not is_success:
+            payload["was_stopped"] = True
+            payload["failure_reason"] = "stopped"
+        self.send(f"{action_name}Finished", **payload)
+
+
+class LoadGenerator:
+    """Runs the simulated users. All user streams are read with a single multiplexed read."""
+
+    def __init__(self, config: LoadConfig, event_provider: EventProvider) -> None:
+        self.config = config
+        self.event_provider = event_provider
+        self.publisher = EventPublisher(event_provider)
+        self.stats = LoadStats()
+        self.users: Dict[str, SimulatedUser] = {}
+        for i in range(config.users):
+            user = SimulatedUser(self, f"{config.stream_prefix}_{i}_{new_uuid()[:8]}")
+            self.users[user.channel] = user
+
+    async def run(self) -> LoadStats:
+        for channel in self.users:
+            self.event_provider.add_channel(channel, discard_existing_events=False)
+        self.publisher.start()
+        receiver = asyncio.create_task(self._receive())
+
+        started_at = time.monotonic()
+        end_time = started_at + self.config.ramp_up + self.config.duration
+        ramp_up_step = self.config.ramp_up / len(self.users) if self.users else 0
+        await asyncio.gather(*[user.run(i * ramp_up_step, end_time) for i, user in enumerate(self.users.values())])
+        self.stats.duration_s = time.monotonic() - started_at
+
+        receiver.cancel()
+        try:
+            await receiver
+        except asyncio.CancelledError:
+            pass
+        await self.publisher.stop()
+        return self.stats
+
+    async def _receive(self) -> None:
+        while True:
+            events_by_channel = await self.event_provider.receive_events_by_channel(timeout_ms=500)
+            received_at = time.monotonic()
+            for channel, events in events_by_channel.items():
+                user = self.users[channel]
+                for event in decode_received_events(events):
+                    # Skip the events of the simulated users
+                    if event.get("source_uid") == SOURCE_UID:
+                        continue
+                    self.stats.events_received += 1
+                    user.on_event(event, received_at)
+
+
+def print_load_report(report: Dict[str, Any]) -> None:
+    print(
+        f"[green]{report['turns']} turns in {report['duration_s']} s[/green] ({report['turns_per_s']} turns/s, "
+        f"{report['timeouts']} timeouts)"
+    )
+    print(
+        f"Events sent: {report['events_sent']} ({report['events_sent_per_s']}/s, {report['failed_events']} failed), "
+        f"received: {report['events_received']} ({report['events_received_per_s']}/s)"
+    )
+    latency = report["response_ms"]
+    print(
+        f"Response latency (ms): mean {latency['mean']:.1f}, p50 {latency['p50']:.1f}, p90 {latency['p90']:.1f}, "
+        f"p99 {latency['p99']:.1f}, max {latency['max']:.1f}"
+    )
+
+
+@cli.command()
+def main(
+    users: Annotated[int, typer.Option(help="Number of concurrent simulated users.")] = 10,
+    duration: Annotated[float, typer.Option(help="Seconds to run after all users started.")] = 60.0,
+    ramp_up: Annotated[float, typer.Option(help="Seconds over which the users are started.")] = 5.0,
+    think_time: Annotated[
+        float, typer.Option(help="Mean seconds between a bot response and the next utterance.")
+    ] = 3.0,
+    transcript_updates: Annotated[int, typer.Option(help="Number of transcript updates per utterance.")] = 3,
+    presence_interval: Annotated[
+        float, typer.Option(help="Mean seconds between user presence changes. 0 disables presence events.")
+    ] = 0.0,
+    form_interval: Annotated[
+        float, typer.Option(help="Mean seconds between inputs to a shown visual form. 0 disables form events.")
+    ] = 0.0,
+    response_timeout: Annotated[float, typer.Option(help="Seconds to wait for the bot to respond.")] = 10.0,
+    utterances: Annotated[Optional[Path], typer.Option(help="File with one user utterance per line.")] = None,
+    create_pipelines: Annotated[
+        bool, typer.Option(help="Send PipelineAcquired and PipelineReleased for every simulated user.")
+    ] = True,
+    stream_prefix: Annotated[str, typer.Option(help="Prefix of the stream IDs of the simulated users.")] = "loadgen",
+    event_provider: Annotated[str, typer.Option(help="Event provider to use (redis, memory or file).")] = "redis",
+    event_provider_host: str = "localhost",
+    event_provider_port: int = 6379,
+    batch_size: Annotated[int, typer.Option(help="Maximum number of events fetched per stream and read.")] = 100,
+    report: Annotated[Optional[Path], typer.Option(help="Write the report as JSON to this file.")] = None,
+) -> None:
+    config = LoadConfig(
+        users=users,
+        duration=duration,
+        ramp_up=ramp_up,
+        think_time=think_time,
+        transcript_updates=transcript_updates,
+        presence_interval=presence_interval,
+        form_interval=form_interval,
+        response_timeout=response_timeout,
+        create_pipelines=create_pipelines,
+        stream_prefix=stream_prefix,
+    )
+    if utterances:
+        lines = utterances.read_text(encoding="utf-8").splitlines()
+        config.utterances = [line.strip() for line in lines if line.strip()]
+
+    provider = event_provider_factory(
+        event_provider, event_provider_host, event_provider_port, [], batch_size=batch_size
+    )
+    generator = LoadGenerator(config, provider)
+    stats = asyncio.run(generator.run())
+
+    load_report = stats.report(generator.publisher.stats.events, generator.publisher.stats.failed_events)
+    print_load_report(load_report)
+    if report:
+        report.write_text(json.dumps(load_report, indent=4), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,494 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022-2024 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA Corporation or
+# its affiliates is strictly prohibited.
+
+"""
+Typed models of the UMIM events used by the ACE Agent event interface.
+
+The models are TypedDicts so that decoded events stay plain dictionaries and can be used by existing dict based
+code (e.g. the event client TUI) as well as by any server side consumer. `decode_event` and `decode_events` parse
+and validate raw JSON in a single pass. Events of unknown types are only checked against the common UMIM fields.
+"""
+
+from typing import Any, Dict, List, Union
+
+from pydantic import AfterValidator, ConfigDict, Discriminator, Tag, TypeAdapter, ValidationError, with_config
+from typing_extensions import Annotated, Literal, NotRequired, TypedDict
+
+__all__ = [
+    "UMIM_EVENT_MODELS",
+    "UmimEvent",
+    "ValidationError",
+    "decode_event",
+    "decode_events",
+    "validate_event",
+]
+
+_config = ConfigDict(extra="allow", strict=True)
+
+Number = Union[int, float]
+
+
+########################################################################################################################
+# BASE EVENTS
+########################################################################################################################
+
+
+@with_config(_config)
+class Event(TypedDict):
+    type: str
+    uid: str
+    event_created_at: str
+    source_uid: str
+
+
+@with_config(_config)
+class ActionEvent(Event):
+    action_uid: str
+
+
+@with_config(_config)
+class ActionStartedEvent(ActionEvent):
+    action_started_at: NotRequired[str]
+
+
+@with_config(_config)
+class ActionFinishedEvent(ActionEvent):
+    action_finished_at: str
+    is_success: bool
+    failure_reason: NotRequired[str]
+    was_stopped: NotRequired[bool]
+
+
+########################################################################################################################
+# SYSTEM AND INTENT EVENTS
+########################################################################################################################
+
+
+@with_config(_config)
+class PipelineAcquired(Event):
+    type: Literal["PipelineAcquired"]
+    stream_uid: str
+    user_uid: NotRequired[str]
+
+
+@with_config(_config)
+class PipelineReleased(Event):
+    type: Literal["PipelineReleased"]
+    stream_uid: str
+
+
+@with_config(_config)
+class UserIntent(Event):
+    type: Literal["UserIntent"]
+    intent: str
+
+
+@with_config(_config)
+class BotIntent(Event):
+    type: Literal["BotIntent"]
+    intent: str
+
+
+########################################################################################################################
+# TIMER BOT ACTION
+########################################################################################################################
+
+
+@with_config(_config)
+class StartTimerBotAction(ActionEvent):
+    type: Literal["StartTimerBotAction"]
+    timer_name: str
+    duration: Number
+
+
+@with_config(_config)
+class TimerBotActionStarted(ActionStartedEvent):
+    type: Literal["TimerBotActionStarted"]
+    action_started_at: str
+
+
+@with_config(_config)
+class ChangeTimerBotAction(ActionEvent):
+    type: Literal["ChangeTimerBotAction"]
+    duration: Number
+
+
+@with_config(_config)
+class StopTimerBotAction(ActionEvent):
+    type: Literal["StopTimerBotAction"]
+
+
+@with_config(_config)
+class TimerBotActionFinished(ActionFinishedEvent):
+    type: Literal["TimerBotActionFinished"]
+
+
+########################################################################################################################
+# UTTERANCE USER ACTION
+########################################################################################################################
+
+
+@with_config(_config)
+class UtteranceUserActionStarted(ActionStartedEvent):
+    type: Literal["UtteranceUserActionStarted"]
+
+
+@with_config(_config)
+class UtteranceUserActionTranscriptUpdated(ActionEvent):
+    type: Literal["UtteranceUserActionTranscriptUpdated"]
+    interim_transcript: str
+    stability: NotRequired[Number]
+
+
+@with_config(_config)
+class UtteranceUserActionFinished(ActionFinishedEvent):
+    type: Literal["UtteranceUserActionFinished"]
+    final_transcript: str
+
+
+########################################################################################################################
+# UTTERANCE BOT ACTION
+########################################################################################################################
+
+
+@with_config(_config)
+class StartUtteranceBotAction(ActionEvent):
+    type: Literal["StartUtteranceBotAction"]
+    script: str
+
+
+@with_config(_config)
+class UtteranceBotActionStarted(ActionStartedEvent):
+    type: Literal["UtteranceBotActionStarted"]
+
+
+@with_config(_config)
+class UtteranceBotActionScriptUpdated(ActionEvent):
+    type: Literal["UtteranceBotActionScriptUpdated"]
+    interim_script: str
+
+
+@with_config(_config)
+class StopUtteranceBotAction(ActionEvent):
+    type: Literal["StopUtteranceBotAction"]
+
+
+@with_config(_config)
+class UtteranceBotActionFinished(ActionFinishedEvent):
+    type: Literal["UtteranceBotActionFinished"]
+    final_script: str
+
+
+########################################################################################################################
+# GESTURE AND POSTURE BOT ACTIONS
+########################################################################################################################
+
+
+@with_config(_config)
+class StartGestureBotAction(ActionEvent):
+    type: Literal["StartGestureBotAction"]
+    gesture: str
+
+
+@with_config(_config)
+class GestureBotActionStarted(ActionStartedEvent):
+    type: Literal["GestureBotActionStarted"]
+
+
+@with_config(_config)
+class StopGestureBotAction(ActionEvent):
+    type: Literal["StopGestureBotAction"]
+
+
+@with_config(_config)
+class GestureBotActionFinished(ActionFinishedEvent):
+    type: Literal["GestureBotActionFinished"]
+
+
+@with_config(_config)
+class StartPostureBotAction(ActionEvent):
+    type: Literal["StartPostureBotAction"]
+    posture: str
+
+
+@with_config(_config)
+class PostureBotActionStarted(ActionStartedEvent):
+    type: Literal["PostureBotActionStarted"]
+
+
+@with_config(_config)
+class StopPostureBotAction(ActionEvent):
+    type: Literal["StopPostureBotAction"]
+
+
+@with_config(_config)
+class PostureBotActionFinished(ActionFinishedEvent):
+    type: Literal["PostureBotActionFinished"]
+
+
+########################################################################################################################
+# ATTENTION AND PRESENCE USER ACTIONS
+########################################################################################################################
+
+
+@with_config(_config)
+class AttentionUserActionStarted(ActionStartedEvent):
+    type: Literal["AttentionUserActionStarted"]
+    attention_level: Number
+
+
+@with_config(_config)
+class AttentionUserActionUpdated(ActionEvent):
+    type: Literal["AttentionUserActionUpdated"]
+    attention_level: Number
+
+
+@with_config(_config)
+class AttentionUserActionFinished(ActionFinishedEvent):
+    type: Literal["AttentionUserActionFinished"]
+
+
+@with_config(_config)
+class PresenceUserActionStarted(ActionStartedEvent):
+    type: Literal["PresenceUserActionStarted"]
+
+
+@with_config(_config)
+class PresenceUserActionFinished(ActionFinishedEvent):
+    type: Literal["PresenceUserActionFinished"]
+
+
+########################################################################################################################
+# VISUAL SCENE ACTIONS
+########################################################################################################################
+
+
+@with_config(_config)
+class StartVisualInformationSceneAction(ActionEvent):
+    type: Literal["StartVisualInformationSceneAction"]
+    title: str
+    summary: NotRequired[str]
+    content: NotRequired[List[Dict[str, Any]]]
+    support_prompts: NotRequired[List[str]]
+
+
+@with_config(_config)
+class VisualInformationSceneActionStarted(ActionStartedEvent):
+    type: Literal["VisualInformationSceneActionStarted"]
+
+
+@with_config(_config)
+class StopVisualInformationSceneAction(ActionEvent):
+    type: Literal["StopVisualInformationSceneAction"]
+
+
+@with_config(_config)
+class VisualInformationSceneActionConfirmationUpdated(ActionEvent):
+    type: Literal["VisualInformationSceneActionConfirmationUpdated"]
+    confirmation_status: str
+
+
+@with_config(_config)
+class VisualInformationSceneActionFinished(ActionFinishedEvent):
+    type: Literal["VisualInformationSceneActionFinished"]
+
+
+@with_config(_config)
+class StartVisualChoiceSceneAction(ActionEvent):
+    type: Literal["StartVisualChoiceSceneAction"]
+    prompt: str
+    options: NotRequired[List[Dict[str, Any]]]
+    support_prompts: NotRequired[List[str]]
+
+
+@with_config(_config)
+class VisualChoiceSceneActionStarted(ActionStartedEvent):
+    type: Literal["VisualChoiceSceneActionStarted"]
+
+
+@with_config(_config)
+class VisualChoiceSceneActionConfirmationUpdated(ActionEvent):
+    type: Literal["VisualChoiceSceneActionConfirmationUpdated"]
+    confirmation_status: str
+
+
+@with_config(_config)
+class VisualChoiceSceneActionChoiceUpdated(ActionEvent):
+    type: Literal["VisualChoiceSceneActionChoiceUpdated"]
+    current_choice: List[str]
+
+
+@with_config(_config)
+class StopVisualChoiceSceneAction(ActionEvent):
+    type: Literal["StopVisualChoiceSceneAction"]
+
+
+@with_config(_config)
+class VisualChoiceSceneActionFinished(ActionFinishedEvent):
+    type: Literal["VisualChoiceSceneActionFinished"]
+
+
+@with_config(_config)
+class FormInput(TypedDict):
+    id: str
+    value: NotRequired[str]
+    description: NotRequired[str]
+
+
+@with_config(_config)
+class StartVisualFormSceneAction(ActionEvent):
+    type: Literal["StartVisualFormSceneAction"]
+    prompt: str
+    inputs: NotRequired[List[FormInput]]
+    support_prompts: NotRequired[List[str]]
+
+
+@with_config(_config)
+class VisualFormSceneActionStarted(ActionStartedEvent):
+    type: Literal["VisualFormSceneActionStarted"]
+
+
+@with_config(_config)
+class VisualFormSceneActionConfirmationUpdated(ActionEvent):
+    type: Literal["VisualFormSceneActionConfirmationUpdated"]
+    confirmation_status: str
+
+
+@with_config(_config)
+class VisualFormSceneActionInputUpdated(ActionEvent):
+    type: Literal["VisualFormSceneActionInputUpdated"]
+    interim_inputs: List[FormInput]
+
+
+@with_config(_config)
+class StopVisualFormSceneAction(ActionEvent):
+    type: Literal["StopVisualFormSceneAction"]
+
+
+@with_config(_config)
+class VisualFormSceneActionFinished(ActionFinishedEvent):
+    type: Literal["VisualFormSceneActionFinished"]
+
+
+########################################################################################################################
+# DECODING
+########################################################################################################################
+
+UMIM_EVENT_MODELS = {
+    model.__annotations__["type"].__args__[0]: model
+    for model in [
+        PipelineAcquired,
+        PipelineReleased,
+        UserIntent,
+        BotIntent,
+        StartTimerBotAction,
+        TimerBotActionStarted,
+        ChangeTimerBotAction,
+        StopTimerBotAction,
+        TimerBotActionFinished,
+        UtteranceUserActionStarted,
+        UtteranceUserActionTranscriptUpdated,
+        UtteranceUserActionFinished,
+        StartUtteranceBotAction,
+        UtteranceBotActionStarted,
+        UtteranceBotActionScriptUpdated,
+        StopUtteranceBotAction,
+        UtteranceBotActionFinished,
+        StartGestureBotAction,
+        GestureBotActionStarted,
+        StopGestureBotAction,
+        GestureBotActionFinished,
+        StartPostureBotAction,
+        PostureBotActionStarted,
+        StopPostureBotAction,
+        PostureBotActionFinished,
+        AttentionUserActionStarted,
+        AttentionUserActionUpdated,
+        AttentionUserActionFinished,
+        PresenceUserActionStarted,
+        PresenceUserActionFinished,
+        StartVisualInformationSceneAction,
+        VisualInformationSceneActionStarted,
+        StopVisualInformationSceneAction,
+        VisualInformationSceneActionConfirmationUpdated,
+        VisualInformationSceneActionFinished,
+        StartVisualChoiceSceneAction,
+        VisualChoiceSceneActionStarted,
+        VisualChoiceSceneActionConfirmationUpdated,
+        VisualChoiceSceneActionChoiceUpdated,
+        StopVisualChoiceSceneAction,
+        VisualChoiceSceneActionFinished,
+        StartVisualFormSceneAction,
+        VisualFormSceneActionStarted,
+        VisualFormSceneActionConfirmationUpdated,
+        VisualFormSceneActionInputUpdated,
+        StopVisualFormSceneAction,
+        VisualFormSceneActionFinished,
+    ]
+}
+
+_GENERIC_EVENT = "__generic__"
+_GENERIC_ACTION_EVENT = "__generic_action__"
+_GENERIC_ACTION_FINISHED_EVENT = "__generic_action_finished__"
+
+
+def _event_tag(event: Any) -> str:
+    event_type = event.get("type", "") if isinstance(event, dict) else ""
+    if event_type in UMIM_EVENT_MODELS:
+        return event_type
+    if not isinstance(event_type, str) or "Action" not in event_type:
+        return _GENERIC_EVENT
+    if "ActionFinished" in event_type:
+        return _GENERIC_ACTION_FINISHED_EVENT
+    return _GENERIC_ACTION_EVENT
+
+
+def _check_failure_reason(event: Dict[str, Any]) -> Dict[str, Any]:
+    if "ActionFinished" in event["type"] and not event["is_success"] and "failure_reason" not in event:
+        raise ValueError("Unsuccessful ***ActionFinished events need to provide 'failure_reason'.")
+    return event
+
+
+UmimEvent = Annotated[
+    Union[
+        tuple(Annotated[model, Tag(event_type)] for event_type, model in UMIM_EVENT_MODELS.items())
+        + (
+            Annotated[Event, Tag(_GENERIC_EVENT)],
+            Annotated[ActionEvent, Tag(_GENERIC_ACTION_EVENT)],
+            Annotated[ActionFinishedEvent, Tag(_GENERIC_ACTION_FINISHED_EVENT)],
+        )
+    ],
+    Discriminator(_event_tag),
+    AfterValidator(_check_failure_reason),
+]
+
+_event_adapter: TypeAdapter = TypeAdapter(UmimEvent)
+_event_list_adapter: TypeAdapter = TypeAdapter(List[UmimEvent])
+
+
+def decode_event(data: Union[str, bytes]) -> Dict[str, Any]:
+    """Parse and validate a JSON encoded event. Raises a ValidationError if the event is not UMIM compliant."""
+    return _event_adapter.validate_json(data)
+
+
+def decode_events(data: List[Union[str, bytes]]) -> List[Dict[str, Any]]:
+    """
+    Parse and validate a batch of JSON encoded events in one pass.
+    Raises a ValidationError if any of the events is not UMIM compliant.
+    """
+    if not data:
+        return []
+    encoded = [d.encode() if isinstance(d, str) else d for d in data]
+    return _event_list_adapter.validate_json(b"[" + b",".join(encoded) + b"]")
+
+
+def validate_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate an already parsed event. Raises a ValidationError if the event is not UMIM compliant."""
+    return _event_adapter.validate_python(event)
@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022-2024 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+
+"""
+Benchmark for the basic event validation of the event client. The validators compiled per event type are compared
+against checking every rule of the schema for every event, as all validators were run before they were compiled.
+
+    python validator_benchmark.py --events 100000
+"""
+
+import argparse
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from event_client import _event_schema, _type_validator, is_valid_event, new_event, new_uuid
+
+
+def is_valid_event_uncompiled(event: Dict[str, Any]) -> bool:
+    """Checks every rule of the schema against the event instead of the validators compiled for its type"""
+    if not _type_validator.function(event):
+        return False
+    for rule in _event_schema:
+        if rule.applies_to(event["type"]) and not rule.validator.function(event):
+            return False
+    return True
+
+
+def create_events(count: int) -> List[Dict[str, Any]]:
+    """A mix of utterance, timer and intent events, one in six is missing a required field"""
+    templates = [
+        new_event("UtteranceUserActionFinished", action_uid=new_uuid(), final_transcript="hello", is_success=True),
+        new_event("StartUtteranceBotAction", script="Hi there"),
+        new_event("UtteranceBotActionScriptUpdated", action_uid=new_uuid(), interim_script="Hi"),
+        new_event("TimerBotActionStarted", action_uid=new_uuid()),
+        new_event("BotIntent", intent="greeting"),
+    ]
+    templates.append({key: value for key, value in templates[0].items() if key != "final_transcript"})
+    return [templates[i % len(templates)] for i in range(count)]
+
+
+def run(validate: Callable[[Dict[str, Any]], bool], events: List[Dict[str, Any]], repeat: int) -> float:
+    """Best time of `repeat` runs over all events"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for event in events:
+            validate(event)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark for the compiled event validators")
+    parser.add_argument("--events", default=100000, type=int, help="Number of events to validate")
+    parser.add_argument("--repeat", default=5, type=int, help="Number of runs, the best one is reported")
+    args = parser.parse_args(argv)
+
+    events = create_events(args.events)
+    if [is_valid_event(event) for event in events] != [is_valid_event_uncompiled(event) for event in events]:
+        print("The compiled validators do not agree with the schema")
+        return 1
+
+    uncompiled_s = run(is_valid_event_uncompiled, events, args.repeat)
+    compiled_s = run(is_valid_event, events, args.repeat)
+
+    print(f"Events:              {args.events}")
+    print(f"All rules:           {uncompiled_s * 1000:.1f} ms ({uncompiled_s / args.events * 1e6:.2f} us per event)")
+    print(f"Compiled per type:   {compiled_s * 1000:.1f} ms ({compiled_s / args.events * 1e6:.2f} us per event)")
+    print(f"Speedup:             {uncompiled_s / compiled_s:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+ copyright(c) 2024 NVIDIA Corporation.All rights reserved.
+
+ NVIDIA Corporation and its licensors retain all intellectual property
+ and proprietary rights in and to this software, related documentation
+ and any modifications thereto.Any use, reproduction, disclosure or
+ distribution of this software and related documentation without an express
+ license agreement from NVIDIA Corporation is strictly prohibited.
+"""
+
+"""
+Latency statistics shared by the chat, event and speech clients, so that all of them report the same percentiles.
+"""
+
+import math
+from typing import Dict, Iterable, List
+
+# Percentiles reported by all clients
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list of values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize_latencies(latencies_ms: Iterable[float]) -> Dict[str, float]:
+    """Count, mean, PERCENTILES (as p50, ...) and max of the latencies"""
+    values = sorted(latencies_ms)
+    summary: Dict[str, float] = {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 3) if values else 0.0,
+    }
+    for q in PERCENTILES:
+        summary[f"p{q}"] = round(percentile(values, q), 3)
+    summary["max"] = round(values[-1], 3) if values else 0.0
+    return summary
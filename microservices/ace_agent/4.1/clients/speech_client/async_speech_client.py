@@ -0,0 +1,784 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+
+"""
+Asynchronous version of the speech client. For every stream the audio is sent in real time while the TTS audio and
+the speech results are received at the same time. Several streams can run in parallel to measure the end to end
+latency of the ASR -> Chat Engine -> TTS pipeline under load.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+import wave
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import grpc
+
+# We need to import python lib files generated from the proto
+import ace_agent_pb2
+import ace_agent_pb2_grpc
+
+# The latency statistics are shared with the other clients
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from latency_stats import summarize_latencies
+
+
+@dataclass
+class AudioInput:
+    """
+    PCM audio of a wav file, read completely before streaming so that file IO does not disturb the pacing.
+    """
+
+    path: str
+    sample_rate: int
+    channels: int
+    frame_size: int
+    frames: bytes
+
+    def is_speech(self, chunk: bytes, silence_threshold: int) -> bool:
+        """
+        Whether the peak amplitude of the chunk is above silence_threshold. Only 16 bit audio is analyzed, any other
+        audio is considered speech until the end of the file.
+        """
+        if self.frame_size != 2:
+            return True
+        samples = array("h", chunk[: len(chunk) // 2 * 2])
+        return bool(samples) and max(max(samples), -min(samples)) > silence_threshold
+
+    @classmethod
+    def read(cls, path: str) -> "AudioInput":
+        with wave.open(path, "rb") as audio_file:
+            return cls(
+                path=path,
+                sample_rate=audio_file.getframerate(),
+                channels=audio_file.getnchannels(),
+                frame_size=audio_file.getsampwidth(),
+                frames=audio_file.readframes(audio_file.getnframes()),
+            )
+
+    @property
+    def bytes_per_second(self) -> int:
+        return self.sample_rate * self.channels * self.frame_size
+
+
+LATENCY_METRICS = [
+    "speech_end_to_final_transcript_ms",
+    "transcript_to_first_text_ms",
+    "text_to_first_audio_ms",
+    "speech_end_to_first_audio_ms",
+    "tts_audio_duration_ms",
+]
+
+
+def elapsed_ms(start: Optional[float], end: Optional[float]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return round((end - start) * 1000, 3)
+
+
+@dataclass
+class Turn:
+    """
+    Arrival times of the speech results of a single user turn and the bot response to it.
+    """
+
+    first_partial_at: Optional[float] = None
+    partials: int = 0
+    final_transcript_at: Optional[float] = None
+    transcript: str = ""
+    first_text_at: Optional[float] = None
+    bot_text: str = ""
+    first_audio_at: Optional[float] = None
+    last_audio_at: Optional[float] = None
+    speech_end_at: Optional[float] = None
+    # Latencies reported by the Chat Controller
+    asr_latency_ms: Optional[float] = None
+    chat_engine_latency_ms: Optional[float] = None
+    tts_latency_ms: Optional[float] = None
+
+    def latencies(self) -> Dict[str, Optional[float]]:
+        return {
+            "speech_end_to_final_transcript_ms": elapsed_ms(self.speech_end_at, self.final_transcript_at),
+            "transcript_to_first_text_ms": elapsed_ms(self.final_transcript_at, self.first_text_at),
+            "text_to_first_audio_ms": elapsed_ms(self.first_text_at, self.first_audio_at),
+            "speech_end_to_first_audio_ms": elapsed_ms(self.speech_end_at, self.first_audio_at),
+            "tts_audio_duration_ms": elapsed_ms(self.first_audio_at, self.last_audio_at),
+        }
+
+
+@dataclass
+class AudioStats:
+    """
+    Delivery of the TTS audio compared against playing it back in real time from the first chunk of every bot
+    response. An underrun is a chunk that arrived after the audio received before it would have finished playing.
+    """
+
+    chunks: int = 0
+    audio_ms: float = 0.0
+    underruns: int = 0
+    gap_ms: float = 0.0
+    max_gap_ms: float = 0.0
+    # Interarrival jitter as defined by RFC 3550
+    jitter_ms: float = 0.0
+    # Smallest amount of buffered audio left when a chunk arrived
+    min_lead_ms: Optional[float] = None
+    # Number of times the receiving of audio had to wait for the writer because the ring buffer was full
+    overflows: int = 0
+    delivery_ms: float = 0.0
+    delivered_audio_ms: float = 0.0
+
+    @property
+    def realtime_factor(self) -> Optional[float]:
+        """
+        Audio duration delivered per time, faster than real time if above 1
+        """
+        if not self.delivery_ms:
+            return None
+        return self.delivered_audio_ms / self.delivery_ms
+
+    def report(self) -> Dict:
+        return {
+            "chunks": self.chunks,
+            "audio_ms": round(self.audio_ms, 3),
+            "realtime_factor": round(self.realtime_factor, 3) if self.realtime_factor else None,
+            "underruns": self.underruns,
+            "gap_ms": round(self.gap_ms, 3),
+            "max_gap_ms": round(self.max_gap_ms, 3),
+            "jitter_ms": round(self.jitter_ms, 3),
+            "min_lead_ms": round(self.min_lead_ms, 3) if self.min_lead_ms is not None else None,
+            "overflows": self.overflows,
+        }
+
+
+class AudioSink:
+    """
+    Memory bounded sink for the TTS audio of a stream. Chunks are copied into a ring buffer that is preallocated for
+    buffer_seconds of audio and written to a wav or raw PCM file by a background thread, so that file IO never
+    blocks the receiving of audio. Without path the audio is only analyzed.
+    """
+
+    def __init__(self, path: Optional[str], buffer_seconds: float, prebuffer_ms: float):
+        self.path = path
+        self.buffer_seconds = buffer_seconds
+        self.prebuffer = prebuffer_ms / 1000
+        self.stats = AudioStats()
+        self.bytes_per_second = 0
+        self._file = None
+        self._buffer = None
+        self._read = 0
+        self._size = 0
+        self._closed = False
+        self._error = None
+        self._condition = threading.Condition()
+        self._space_available = asyncio.Event()
+        self._loop = None
+        self._thread = None
+        self._play_end = None
+        self._last_arrival = 0.0
+        self._last_duration = 0.0
+
+    def _configure(self, sample_rate: int, channels: int, frame_size: int) -> None:
+        bytes_per_frame = channels * frame_size
+        self.bytes_per_second = sample_rate * bytes_per_frame
+        if not self.path:
+            return
+        if self.path.endswith(".wav"):
+            self._file = wave.open(self.path, "wb")
+            self._file.setnchannels(channels)
+            self._file.setsampwidth(frame_size)
+            self._file.setframerate(sample_rate)
+        else:
+            self._file = open(self.path, "wb")
+        frames = max(int(self.buffer_seconds * sample_rate), 1)
+        self._buffer = bytearray(frames * bytes_per_frame)
+        self._loop = asyncio.get_running_loop()
+        self._thread = threading.Thread(target=self._write_loop, name=f"audio-sink-{self.path}", daemon=True)
+        self._thread.start()
+
+    def new_utterance(self) -> None:
+        """
+        Start the playback again with the next chunk, the silence between bot responses is no underrun.
+        """
+        self._play_end = None
+
+    def _track(self, arrived_at: float, duration: float) -> None:
+        stats = self.stats
+        if self._play_end is None:
+            self._play_end = arrived_at + self.prebuffer
+        else:
+            interval = arrived_at - self._last_arrival
+            stats.jitter_ms += (abs(interval - self._last_duration) * 1000 - stats.jitter_ms) / 16
+            stats.delivery_ms += interval * 1000
+            stats.delivered_audio_ms += self._last_duration * 1000
+            lead_ms = (self._play_end - arrived_at) * 1000
+            if stats.min_lead_ms is None or lead_ms < stats.min_lead_ms:
+                stats.min_lead_ms = lead_ms
+            if lead_ms < 0:
+                stats.underruns += 1
+                stats.gap_ms -= lead_ms
+                stats.max_gap_ms = max(stats.max_gap_ms, -lead_ms)
+                self._play_end = arrived_at
+        self._play_end += duration
+        self._last_arrival = arrived_at
+        self._last_duration = duration
+        stats.chunks += 1
+        stats.audio_ms += duration * 1000
+
+    async def write(self, response, arrived_at: float) -> None:
+        if not self.bytes_per_second:
+            self._configure(response.sample_rate_hertz, response.audio_channel_count, response.frame_size)
+        self._track(arrived_at, len(response.audio_content) / self.bytes_per_second)
+        if self._buffer is None:
+            return
+
+        data = memoryview(response.audio_content)
+        capacity = len(self._buffer)
+        while data:
+            with self._condition:
+                if self._error:
+                    raise self._error
+                free = capacity - self._size
+                if free:
+                    start = (self._read + self._size) % capacity
+                    count = min(free, len(data), capacity - start)
+                    self._buffer[start : start + count] = data[:count]
+                    self._size += count
+                    data = data[count:]
+                    self._condition.notify()
+                    continue
+                self._space_available.clear()
+            self.stats.overflows += 1
+            await self._space_available.wait()
+
+    def _write_loop(self) -> None:
+        capacity = len(self._buffer)
+        view = memoryview(self._buffer)
+        while True:
+            with self._condition:
+                while not self._size and not self._closed:
+                    self._condition.wait()
+                if not self._size:
+                    return
+                start = self._read
+                count = min(self._size, capacity - start)
+            # The producer does not overwrite this part before the read position moved on
+            try:
+                if isinstance(self._file, wave.Wave_write):
+                    self._file.writeframesraw(view[start : start + count])
+                else:
+                    self._file.write(view[start : start + count])
+            except Exception as e:
+                with self._condition:
+                    self._error = e
+                    self._size = 0
+                self._loop.call_soon_threadsafe(self._space_available.set)
+                return
+            with self._condition:
+                self._read = (start + count) % capacity
+                self._size -= count
+            self._loop.call_soon_threadsafe(self._space_available.set)
+
+    async def close(self) -> None:
+        """
+        Write the remaining audio and close the file. Raises the error of the writer if there was one.
+        """
+        if self._thread:
+            with self._condition:
+                self._closed = True
+                self._condition.notify()
+            await asyncio.to_thread(self._thread.join)
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self._error:
+            raise self._error
+
+
+@dataclass
+class SessionResult:
+    stream_id: str
+    audio_file: str
+    started_at: float = field(default_factory=time.monotonic)
+    turns: List[Turn] = field(default_factory=list)
+    transcripts: List[str] = field(default_factory=list)
+    bot_responses: List[str] = field(default_factory=list)
+    tts_audio_bytes: int = 0
+    speech_end_at: Optional[float] = None
+    first_audio_at: Optional[float] = None
+    audio: AudioStats = field(default_factory=AudioStats)
+    error: Optional[str] = None
+
+    @property
+    def end_to_end_ms(self) -> Optional[float]:
+        """
+        Time from the end of the user speech until the first TTS audio chunk that was received after it. Audio of
+        responses to earlier utterances of the same file is not counted.
+        """
+        if self.speech_end_at is None or self.first_audio_at is None:
+            return None
+        return (self.first_audio_at - self.speech_end_at) * 1000
+
+
+class SpeechSession:
+    """
+    A single stream: acquires a pipeline, streams the audio in real time and at the same time receives the TTS audio
+    and the speech results until the bot has finished speaking.
+    """
+
+    def __init__(self, stub, audio: AudioInput, tts_output_path: Optional[str], args):
+        self.stub = stub
+        self.audio = audio
+        self.args = args
+        self.stream_id = str(uuid.uuid4())
+        self.result = SessionResult(stream_id=self.stream_id, audio_file=audio.path)
+        self.tts_started = asyncio.Event()
+        self.first_audio = asyncio.Event()
+        self.sink = AudioSink(tts_output_path, args.audio_buffer_seconds, args.audio_prebuffer_ms)
+        self.result.audio = self.sink.stats
+        self.last_audio_at = 0.0
+        # Time at which the last chunk with speech before a silent chunk was sent, the end of the latest utterance
+        self.speech_end_at: Optional[float] = None
+
+    def log(self, message: str) -> None:
+        print(f"[{self.stream_id[:8]}] {message}")
+
+    async def run(self) -> SessionResult:
+        try:
+            status_response = await self.stub.CreatePipeline(ace_agent_pb2.PipelineRequest(stream_id=self.stream_id))
+        except grpc.aio.AioRpcError as e:
+            self.result.error = f"{e.code().name}: {e.details()}"
+            self.log(f"Could not create pipeline: {self.result.error}")
+            return self.result
+        if status_response.status != ace_agent_pb2.PIPELINE_AVAILABLE:
+            self.result.error = f"Could not create pipeline: {status_response.response_msg}"
+            self.log(self.result.error)
+            return self.result
+
+        # Subscribe to the results and the TTS audio before sending any audio so that no message is missed
+        tasks = [
+            asyncio.create_task(self.receive_speech_results()),
+            asyncio.create_task(self.receive_audio()),
+        ]
+        try:
+            await self.wait_for_pipeline()
+            self.log("Pipeline created successfully...")
+            request_status = await self.stub.SendAudio(self.audio_requests())
+            if request_status.status == ace_agent_pb2.ERROR:
+                self.log(f"Sending audio failed: {request_status.response_msg}")
+            await asyncio.wait_for(self.wait_for_bot_response(), self.args.response_timeout)
+        except asyncio.TimeoutError:
+            self.result.error = f"No complete bot response within {self.args.response_timeout}s"
+            self.log(self.result.error)
+        except grpc.aio.AioRpcError as e:
+            self.result.error = f"{e.code().name}: {e.details()}"
+            self.log(f"Request failed with {self.result.error}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await self.sink.close()
+            except Exception as e:
+                self.result.error = f"Writing TTS audio failed: {e}"
+                self.log(self.result.error)
+            # Once done with all the requests, we will free up the acquired pipeline on the Chat Controller server
+            try:
+                await self.stub.FreePipeline(ace_agent_pb2.PipelineRequest(stream_id=self.stream_id))
+            except grpc.aio.AioRpcError as e:
+                self.log(f"Could not free pipeline: {e.code().name}: {e.details()}")
+
+        return self.result
+
+    async def wait_for_pipeline(self) -> None:
+        """
+        Wait until the pipeline left the INIT state, at most pipeline_timeout seconds.
+        """
+        deadline = time.monotonic() + self.args.pipeline_timeout
+        while time.monotonic() < deadline:
+            try:
+                status = await self.stub.GetStatus(ace_agent_pb2.GetStatusRequest(stream_id=self.stream_id))
+            except grpc.aio.AioRpcError:
+                # Without pipeline status we can only wait for the full timeout
+                await asyncio.sleep(max(deadline - time.monotonic(), 0))
+                return
+            if status.pipeline_state.state != ace_agent_pb2.INIT:
+                return
+            await asyncio.sleep(0.1)
+
+    async def audio_requests(self):
+        """
+        Generate the SendAudio requests. Every chunk is sent once its duration has passed since the start of the
+        stream like it would be by a microphone, followed by one second of silence to indicate the end of speech.
+        The end of every utterance is detected from the audio level of the chunks.
+        """
+        audio = self.audio
+        config = ace_agent_pb2.StreamingRecognitionConfig(
+            encoding=ace_agent_pb2.LINEAR_PCM, sample_rate_hertz=audio.sample_rate, audio_channel_count=audio.channels
+        )
+        yield ace_agent_pb2.SendAudioRequest(streaming_config=config, stream_id=self.stream_id)
+
+        bytes_per_frame = audio.channels * audio.frame_size
+        chunk_size = self.args.chunk_frames * bytes_per_frame
+        chunks = [audio.frames[i : i + chunk_size] for i in range(0, len(audio.frames), chunk_size)]
+        speech_chunks = len(chunks)
+        # We'll split the silence into 10 chunks for easier processing
+        chunks += [bytes(audio.sample_rate // 10 * bytes_per_frame)] * 10
+
+        start = time.monotonic()
+        sent_bytes = 0
+        last_speech_at = None
+        for index, chunk in enumerate(chunks):
+            sent_bytes += len(chunk)
+            if self.args.realtime:
+                await asyncio.sleep(max(start + sent_bytes / audio.bytes_per_second - time.monotonic(), 0))
+            yield ace_agent_pb2.SendAudioRequest(audio_content=chunk, stream_id=self.stream_id)
+            sent_at = time.monotonic()
+            if index < speech_chunks and audio.is_speech(chunk, self.args.silence_threshold):
+                last_speech_at = sent_at
+            elif last_speech_at is not None:
+                self.speech_end_at = last_speech_at
+                last_speech_at = None
+            if index == speech_chunks - 1:
+                self.result.speech_end_at = sent_at
+
+    def user_turn(self, now: float) -> Turn:
+        """
+        The turn the user is currently speaking in, a new turn starts with the first transcript after a final one.
+        """
+        turns = self.result.turns
+        if not turns or turns[-1].final_transcript_at is not None:
+            turns.append(Turn(first_partial_at=now))
+        return turns[-1]
+
+    def bot_turn(self) -> Optional[Turn]:
+        """
+        The latest turn the bot responds to.
+        """
+        for turn in reversed(self.result.turns):
+            if turn.final_transcript_at is not None:
+                return turn
+        return None
+
+    async def receive_audio(self) -> None:
+        """
+        Receive the TTS audio of the stream and pass it to the audio sink.
+        """
+        try:
+            async for response in self.stub.ReceiveAudio(ace_agent_pb2.ReceiveAudioRequest(stream_id=self.stream_id)):
+                self.last_audio_at = time.monotonic()
+                turn = self.bot_turn()
+                if turn is not None:
+                    if turn.first_audio_at is None:
+                        turn.first_audio_at = self.last_audio_at
+                        self.sink.new_utterance()
+                    turn.last_audio_at = self.last_audio_at
+                if self.result.speech_end_at is not None and self.result.first_audio_at is None:
+                    self.result.first_audio_at = self.last_audio_at
+                self.first_audio.set()
+                self.result.tts_audio_bytes += len(response.audio_content)
+                await self.sink.write(response, self.last_audio_at)
+        except Exception as e:
+            self.result.error = f"Receiving TTS audio failed: {e}"
+            self.log(self.result.error)
+
+    async def receive_speech_results(self) -> None:
+        """
+        Consume the Stream Speech Results API. The messages contain ASR transcripts, Chat Engine responses,
+        pipeline states and TTS latency etc.
+        """
+        request = ace_agent_pb2.StreamingSpeechResultsRequest(stream_id=self.stream_id, request_id=str(uuid.uuid4()))
+        try:
+            async for response in self.stub.StreamSpeechResults(request):
+                try:
+                    self.handle_speech_result(response, time.monotonic())
+                except (IndexError, KeyError, TypeError, ValueError) as e:
+                    # Skip the invalid message, the following ones can still be processed
+                    self.result.error = f"Invalid speech result: {e!r}"
+                    self.log(self.result.error)
+        except grpc.aio.AioRpcError as e:
+            self.result.error = f"Receiving speech results failed: {e.code().name}: {e.details()}"
+            self.log(self.result.error)
+        except Exception as e:
+            self.result.error = f"Receiving speech results failed: {e}"
+            self.log(self.result.error)
+
+    def handle_speech_result(self, response, now: float) -> None:
+        """
+        Update the turns with a message of the Stream Speech Results API that arrived at now.
+        """
+        if response.message_type == ace_agent_pb2.ASR_RESPONSE:
+            transcript = response.asr_result.results.alternatives[0].transcript
+            turn = self.user_turn(now)
+            if response.asr_result.results.is_final:
+                turn.final_transcript_at = now
+                turn.transcript = transcript
+                turn.asr_latency_ms = response.asr_result.latency_ms
+                # The transcript belongs to the latest utterance, unless that one was already transcribed before
+                previous_turns = self.result.turns[:-1]
+                if not previous_turns or previous_turns[-1].speech_end_at != self.speech_end_at:
+                    turn.speech_end_at = self.speech_end_at
+                self.result.transcripts.append(transcript)
+                self.log(f"[FINAL] : {transcript}")
+            else:
+                turn.partials += 1
+                if self.args.verbose:
+                    self.log(f"[PARTIAL] : {transcript}")
+        elif response.message_type == ace_agent_pb2.CHAT_ENGINE_RESPONSE:
+            chat_engine_response = json.loads(response.chat_engine_response.result)["Response"]["Text"]
+            turn = self.bot_turn()
+            if turn is not None:
+                if turn.first_text_at is None:
+                    turn.first_text_at = now
+                    turn.chat_engine_latency_ms = response.chat_engine_response.latency_ms
+                turn.bot_text += chat_engine_response
+            self.result.bot_responses.append(chat_engine_response)
+            self.log(f"Bot Response: {chat_engine_response}")
+        elif response.message_type == ace_agent_pb2.TTS_RESPONSE:
+            turn = self.bot_turn()
+            if turn is not None and turn.tts_latency_ms is None:
+                turn.tts_latency_ms = response.tts_result.latency_ms
+            self.tts_started.set()
+
+    async def wait_for_bot_response(self) -> None:
+        """
+        The bot response is complete once TTS started and no more TTS audio arrived for audio_idle_timeout seconds.
+        """
+        await self.tts_started.wait()
+        await self.first_audio.wait()
+        while True:
+            idle = time.monotonic() - self.last_audio_at
+            if idle >= self.args.audio_idle_timeout:
+                return
+            await asyncio.sleep(self.args.audio_idle_timeout - idle)
+
+
+def list_audio_files(args) -> List[str]:
+    if args.audio_dir:
+        return sorted(
+            os.path.join(args.audio_dir, name) for name in os.listdir(args.audio_dir) if name.lower().endswith(".wav")
+        )
+    return [args.audio_file_path]
+
+
+def tts_output_path(args, index: int, audio_file: str) -> Optional[str]:
+    if not args.tts_output_dir:
+        return None
+    name = os.path.splitext(os.path.basename(audio_file))[0]
+    return os.path.join(args.tts_output_dir, f"stream_{index}_{name}.{args.tts_output_format}")
+
+
+def print_summary(results: List[SessionResult]) -> None:
+    print("")
+    print(f"{'Stream':<10}{'Audio file':<30}{'End to end':>12}  Transcript -> Bot response")
+    latencies = []
+    for result in results:
+        latency = result.end_to_end_ms
+        if latency is not None:
+            latencies.append(latency)
+        print(
+            f"{result.stream_id[:8]:<10}{os.path.basename(result.audio_file)[:29]:<30}"
+            f"{f'{latency:.0f} ms' if latency is not None else '-':>12}  "
+            f"{' '.join(result.transcripts)} -> {' '.join(result.bot_responses) or result.error or ''}"
+        )
+    if latencies:
+        latencies.sort()
+        print(
+            f"End to end latency over {len(latencies)}/{len(results)} streams: "
+            f"min {latencies[0]:.0f} ms, median {latencies[len(latencies) // 2]:.0f} ms, max {latencies[-1]:.0f} ms"
+        )
+
+    print("")
+    print(
+        f"{'Stream':<10}{'TTS audio':>12}{'x realtime':>12}{'Underruns':>11}{'Gaps':>10}{'Max gap':>10}"
+        f"{'Jitter':>10}{'Min lead':>10}"
+    )
+    for result in results:
+        audio = result.audio.report()
+        if not audio["chunks"]:
+            continue
+        realtime = f"{audio['realtime_factor']:.2f}" if audio["realtime_factor"] else "-"
+        min_lead = f"{audio['min_lead_ms']:.0f} ms" if audio["min_lead_ms"] is not None else "-"
+        print(
+            f"{result.stream_id[:8]:<10}{audio['audio_ms']:>9.0f} ms{realtime:>12}{audio['underruns']:>11}"
+            f"{audio['gap_ms']:>7.0f} ms{audio['max_gap_ms']:>7.0f} ms{audio['jitter_ms']:>7.1f} ms{min_lead:>10}"
+        )
+
+
+def profile_rows(results: List[SessionResult], run_id: str) -> List[Dict]:
+    """
+    One row per turn with the arrival times relative to the start of the stream and the latencies between them.
+    """
+    rows = []
+    for result in results:
+        for index, turn in enumerate(result.turns):
+            row = {
+                "run_id": run_id,
+                "stream_id": result.stream_id,
+                "audio_file": os.path.basename(result.audio_file),
+                "turn": index,
+                "transcript": turn.transcript,
+                "bot_text": turn.bot_text,
+                "partials": turn.partials,
+            }
+            for name in [
+                "speech_end_at",
+                "first_partial_at",
+                "final_transcript_at",
+                "first_text_at",
+                "first_audio_at",
+                "last_audio_at",
+            ]:
+                row[f"{name}_ms"] = elapsed_ms(result.started_at, getattr(turn, name))
+            row.update(turn.latencies())
+            row["asr_latency_ms"] = turn.asr_latency_ms
+            row["chat_engine_latency_ms"] = turn.chat_engine_latency_ms
+            row["tts_latency_ms"] = turn.tts_latency_ms
+            rows.append(row)
+    return rows
+
+
+def summarize_profile(rows: List[Dict]) -> Dict[str, Dict[str, float]]:
+    summary = {}
+    for metric in LATENCY_METRICS:
+        values = [row[metric] for row in rows if row[metric] is not None]
+        if values:
+            summary[metric] = summarize_latencies(values)
+    return summary
+
+
+def print_profile(summary: Dict[str, Dict[str, float]]) -> None:
+    print("")
+    print(f"{'Latency':<36}{'count':>7}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    for metric, values in summary.items():
+        print(
+            f"{metric:<36}{values['count']:>7}"
+            + "".join(f"{values[name]:>10.0f}" for name in ["mean", "p50", "p90", "p99", "max"])
+        )
+
+
+def export_profile(args, run: Dict, results: List[SessionResult], rows: List[Dict], summary: Dict) -> None:
+    """
+    Write the turns of the run as JSON and/or append them to a CSV file, so that the latencies can be tracked
+    across runs.
+    """
+    if args.profile_json:
+        with open(args.profile_json, "w") as f:
+            streams = [{"stream_id": result.stream_id, "audio": result.audio.report()} for result in results]
+            json.dump({**run, "summary": summary, "turns": rows, "streams": streams}, f, indent=4)
+    if args.profile_csv and rows:
+        write_header = not os.path.exists(args.profile_csv) or os.path.getsize(args.profile_csv) == 0
+        with open(args.profile_csv, "a", newline="") as f:
+            run_columns = {"started_at": run["started_at"], "server": run["server"], "streams": run["streams"]}
+            writer = csv.DictWriter(f, fieldnames=list(run_columns) + list(rows[0]))
+            if write_header:
+                writer.writeheader()
+            for row in rows:
+                writer.writerow({**run_columns, **row})
+
+
+async def main(args) -> None:
+    audio_files = list_audio_files(args)
+    if not audio_files:
+        print(f"No wav files found in {args.audio_dir}")
+        return
+    audio_inputs = {path: AudioInput.read(path) for path in audio_files}
+    streams = args.streams or len(audio_files)
+    if args.tts_output_dir:
+        os.makedirs(args.tts_output_dir, exist_ok=True)
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    async with grpc.aio.insecure_channel(args.server) as channel:
+        stub = ace_agent_pb2_grpc.AceAgentGrpcStub(channel)
+        sessions = []
+        for index in range(streams):
+            audio_file = audio_files[index % len(audio_files)]
+            sessions.append(
+                SpeechSession(stub, audio_inputs[audio_file], tts_output_path(args, index, audio_file), args)
+            )
+        results = await asyncio.gather(*[session.run() for session in sessions])
+
+    print_summary(results)
+
+    if args.profile or args.profile_json or args.profile_csv:
+        run = {"run_id": str(uuid.uuid4()), "started_at": started_at, "server": args.server, "streams": streams}
+        rows = profile_rows(results, run["run_id"])
+        summary = summarize_profile(rows)
+        print_profile(summary)
+        export_profile(args, run, results, rows, summary)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Async Speech Client App")
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument("--audio_file_path", type=str, help="ASR input audio wav file path")
+    input_group.add_argument("--audio_dir", type=str, help="Directory with ASR input audio wav files")
+    parser.add_argument(
+        "--streams",
+        default=0,
+        type=int,
+        help="Number of parallel streams, the audio files are assigned round robin. Defaults to one per audio file",
+    )
+    parser.add_argument("--tts_output_dir", default=None, type=str, help="Directory for the TTS output audio files")
+    parser.add_argument(
+        "--tts_output_format", default="wav", choices=["wav", "raw"], help="Write the TTS audio as wav or raw PCM"
+    )
+    parser.add_argument(
+        "--audio_buffer_seconds", default=10, type=float, help="Size of the TTS audio ring buffer of every stream"
+    )
+    parser.add_argument(
+        "--audio_prebuffer_ms",
+        default=0,
+        type=float,
+        help="Simulated playback starts this long after the first TTS audio chunk of a response",
+    )
+    parser.add_argument("--server", default="0.0.0.0:50055", type=str, help="GRPC Server URL")
+    parser.add_argument("--chunk_frames", default=1600, type=int, help="Number of audio frames per SendAudio request")
+    parser.add_argument(
+        "--silence_threshold",
+        default=500,
+        type=int,
+        help="Peak amplitude of 16 bit audio above which the user is speaking, used to detect the end of every utterance",
+    )
+    parser.add_argument(
+        "--no_realtime", dest="realtime", action="store_false", help="Send the audio as fast as possible"
+    )
+    parser.add_argument(
+        "--pipeline_timeout", default=5, type=float, help="Maximum time to wait for a created pipeline to be ready"
+    )
+    parser.add_argument(
+        "--response_timeout", default=10, type=float, help="Maximum time to wait for the bot response after the audio"
+    )
+    parser.add_argument(
+        "--audio_idle_timeout",
+        default=1,
+        type=float,
+        help="The bot response is complete if no TTS audio was received for this time",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Print partial ASR transcripts")
+    parser.add_argument("--profile", action="store_true", help="Print the latency breakdown of all turns")
+    parser.add_argument("--profile_json", default=None, type=str, help="Write the latencies of all turns to JSON")
+    parser.add_argument("--profile_csv", default=None, type=str, help="Append the latencies of all turns to a CSV file")
+    args = parser.parse_args()
+
+    if args.audio_file_path and not os.path.exists(args.audio_file_path):
+        print("ASR audio input file path is not valid")
+        exit(0)
+
+    asyncio.run(main(args))
@@ -0,0 +1,361 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: LicenseRef-NvidiaProprietary
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+
+"""
+Stand-in for the AceAgentGrpc server of the Chat Controller to test and benchmark the speech clients without GPUs.
+User speech is detected by the audio level, the transcripts and bot responses come from a script and the TTS audio
+is a synthetic tone. All processing delays are configurable.
+
+The server can be started from the command line or in-process with `start_mock_server`.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import grpc
+
+# We need to import python lib files generated from the proto
+import ace_agent_pb2
+import ace_agent_pb2_grpc
+
+DEFAULT_SCRIPT = [
+    {"transcript": "hello there", "response": "Hi! How can I help you today?"},
+    {"transcript": "what is the weather like", "response": "It is sunny with a high of 25 degrees."},
+    {"transcript": "thank you", "response": "You are welcome. Have a nice day!"},
+]
+
+
+@dataclass
+class MockConfig:
+    script: List[Dict[str, str]] = field(default_factory=lambda: list(DEFAULT_SCRIPT))
+    max_pipelines: int = 0
+    # Time after CreatePipeline until the pipeline leaves the INIT state
+    pipeline_ready_ms: float = 0
+    # Peak amplitude of 16 bit audio above which the user is speaking
+    silence_threshold: int = 500
+    # Silence after speech that ends the user turn
+    end_of_speech_ms: float = 300
+    partial_interval_ms: float = 200
+    asr_delay_ms: float = 100
+    chat_delay_ms: float = 300
+    tts_delay_ms: float = 100
+    # Random delay of up to this length added to every delay and TTS audio chunk
+    jitter_ms: float = 0
+    tts_sample_rate: int = 16000
+    tts_chunk_ms: float = 100
+    tts_ms_per_char: float = 60
+    # Speed of the TTS audio delivery relative to real time
+    tts_rate: float = 2.0
+
+    def delay(self, delay_ms: float) -> float:
+        return (delay_ms + random.uniform(0, self.jitter_ms)) / 1000
+
+
+class MockPipeline:
+    """
+    State of a single stream. Speech results and TTS audio are published to every subscribed client.
+    """
+
+    def __init__(self, stream_id: str, config: MockConfig):
+        self.stream_id = stream_id
+        self.ready_at = time.monotonic() + config.pipeline_ready_ms / 1000
+        self.state = ace_agent_pb2.IDLE
+        self.turns = 0
+        self.result_queues: List[asyncio.Queue] = []
+        self.audio_queues: List[asyncio.Queue] = []
+        self.tasks = set()
+
+    def get_state(self) -> int:
+        return ace_agent_pb2.INIT if time.monotonic() < self.ready_at else self.state
+
+    def publish_result(self, **kwargs) -> None:
+        response = ace_agent_pb2.StreamingSpeechResultsResponse(stream_id=self.stream_id, **kwargs)
+        for queue in self.result_queues:
+            queue.put_nowait(response)
+
+    def publish_audio(self, response: ace_agent_pb2.ReceiveAudioResponse) -> None:
+        for queue in self.audio_queues:
+            queue.put_nowait(response)
+
+    def set_state(self, state: int) -> None:
+        self.state = state
+        self.publish_result(
+            message_type=ace_agent_pb2.PIPELINE_STATE_RESPONSE,
+            pipeline_state=ace_agent_pb2.PipelineStateResponse(state=state),
+        )
+
+    def publish_transcript(self, transcript: str, is_final: bool, latency_ms: float = 0) -> None:
+        results = ace_agent_pb2.StreamingRecognitionResult(
+            alternatives=[ace_agent_pb2.SpeechRecognitionAlternative(transcript=transcript, confidence=1.0)],
+            is_final=is_final,
+            stability=1.0 if is_final else 0.5,
+        )
+        self.publish_result(
+            message_type=ace_agent_pb2.ASR_RESPONSE,
+            asr_result=ace_agent_pb2.ASRResult(results=results, latency_ms=latency_ms),
+        )
+
+    def close(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        # Ends the open StreamSpeechResults and ReceiveAudio calls
+        for queue in self.result_queues + self.audio_queues:
+            queue.put_nowait(None)
+
+
+class MockAceAgentServicer(ace_agent_pb2_grpc.AceAgentGrpcServicer):
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.pipelines: Dict[str, MockPipeline] = {}
+        # The tone is an integer number of periods per chunk, so that the same chunk can be sent repeatedly
+        samples = int(config.tts_sample_rate * config.tts_chunk_ms / 1000)
+        frequency = round(440 * config.tts_chunk_ms / 1000) / (config.tts_chunk_ms / 1000)
+        step = 2 * math.pi * frequency / config.tts_sample_rate
+        self.tts_chunk = array("h", (int(3000 * math.sin(step * i)) for i in range(samples))).tobytes()
+
+    async def CreatePipeline(self, request, context):
+        if request.stream_id in self.pipelines:
+            return ace_agent_pb2.APIStatusResponse(
+                stream_id=request.stream_id, status=ace_agent_pb2.PIPELINE_AVAILABLE, response_msg="Pipeline exists"
+            )
+        if self.config.max_pipelines and len(self.pipelines) >= self.config.max_pipelines:
+            return ace_agent_pb2.APIStatusResponse(
+                stream_id=request.stream_id,
+                status=ace_agent_pb2.PIPELINE_NOT_AVAILABLE,
+                response_msg="All pipelines are in use",
+            )
+        self.pipelines[request.stream_id] = MockPipeline(request.stream_id, self.config)
+        return ace_agent_pb2.APIStatusResponse(
+            stream_id=request.stream_id, status=ace_agent_pb2.PIPELINE_AVAILABLE, response_msg="Pipeline created"
+        )
+
+    async def FreePipeline(self, request, context):
+        pipeline = self.pipelines.pop(request.stream_id, None)
+        if pipeline is None:
+            return ace_agent_pb2.APIStatusResponse(
+                stream_id=request.stream_id, status=ace_agent_pb2.ERROR, response_msg="Pipeline not found"
+            )
+        pipeline.close()
+        return ace_agent_pb2.APIStatusResponse(
+            stream_id=request.stream_id, status=ace_agent_pb2.SUCCESS, response_msg="Pipeline is released"
+        )
+
+    async def GetStatus(self, request, context):
+        pipeline = self.pipelines.get(request.stream_id)
+        if pipeline is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, f"No pipeline for stream {request.stream_id}")
+        return ace_agent_pb2.GetStatusResponse(
+            stream_id=request.stream_id, pipeline_state=ace_agent_pb2.PipelineStateResponse(state=pipeline.get_state())
+        )
+
+    async def SendAudio(self, request_iterator, context):
+        """
+        Detect the user turns in the audio stream. Partial transcripts reveal the scripted transcript word by word
+        while the user is speaking, the response starts after end_of_speech_ms of silence or the end of the stream.
+        """
+        config = self.config
+        pipeline = None
+        bytes_per_second = 0
+        speech_ms = silence_ms = 0.0
+        words = []
+        partial_words = 0
+        async for request in request_iterator:
+            if pipeline is None:
+                pipeline = self.pipelines.get(request.stream_id)
+                if pipeline is None:
+                    return ace_agent_pb2.APIStatusResponse(
+                        stream_id=request.stream_id, status=ace_agent_pb2.ERROR, response_msg="Pipeline not found"
+                    )
+            if request.HasField("streaming_config"):
+                streaming_config = request.streaming_config
+                bytes_per_second = streaming_config.sample_rate_hertz * max(streaming_config.audio_channel_count, 1) * 2
+                continue
+            if not bytes_per_second or not request.audio_content:
+                continue
+
+            samples = array("h", request.audio_content[: len(request.audio_content) // 2 * 2])
+            duration_ms = len(request.audio_content) / bytes_per_second * 1000
+            if samples and max(max(samples), -min(samples)) > config.silence_threshold:
+                if not words:
+                    turn = config.script[pipeline.turns % len(config.script)]
+                    words = turn["transcript"].split() or [""]
+                    speech_ms = 0.0
+                    partial_words = 0
+                    pipeline.set_state(ace_agent_pb2.ASR_ACTIVE)
+                silence_ms = 0.0
+                speech_ms += duration_ms
+                due_words = min(int(speech_ms // config.partial_interval_ms), len(words))
+                if due_words > partial_words:
+                    partial_words = due_words
+                    pipeline.publish_transcript(" ".join(words[:partial_words]), is_final=False)
+            elif words:
+                silence_ms += duration_ms
+                if silence_ms >= config.end_of_speech_ms:
+                    self.start_response(pipeline)
+                    words = []
+
+        if pipeline is None:
+            return ace_agent_pb2.APIStatusResponse(status=ace_agent_pb2.ERROR, response_msg="No audio received")
+        if words:
+            self.start_response(pipeline)
+        return ace_agent_pb2.APIStatusResponse(
+            stream_id=pipeline.stream_id, status=ace_agent_pb2.SUCCESS, response_msg="Audio received"
+        )
+
+    def start_response(self, pipeline: MockPipeline) -> None:
+        turn = self.config.script[pipeline.turns % len(self.config.script)]
+        pipeline.turns += 1
+        task = asyncio.create_task(self.respond(pipeline, turn))
+        pipeline.tasks.add(task)
+        task.add_done_callback(pipeline.tasks.discard)
+
+    async def respond(self, pipeline: MockPipeline, turn: Dict[str, str]) -> None:
+        """
+        Publish the final transcript, the bot response and stream the synthetic TTS audio of a user turn.
+        """
+        config = self.config
+        await asyncio.sleep(config.delay(config.asr_delay_ms))
+        pipeline.publish_transcript(turn["transcript"], is_final=True, latency_ms=config.asr_delay_ms)
+
+        pipeline.set_state(ace_agent_pb2.DM_ACTIVE)
+        await asyncio.sleep(config.delay(config.chat_delay_ms))
+        result = {"Response": {"Text": turn["response"], "CleanedText": turn["response"], "IsFinal": True}}
+        pipeline.publish_result(
+            message_type=ace_agent_pb2.CHAT_ENGINE_RESPONSE,
+            chat_engine_response=ace_agent_pb2.ChatEngineResponse(
+                stream_id=pipeline.stream_id, result=json.dumps(result), latency_ms=config.chat_delay_ms
+            ),
+        )
+
+        await asyncio.sleep(config.delay(config.tts_delay_ms))
+        pipeline.set_state(ace_agent_pb2.TTS_ACTIVE)
+        chunks = max(math.ceil(len(turn["response"]) * config.tts_ms_per_char / config.tts_chunk_ms), 1)
+        pipeline.publish_result(
+            message_type=ace_agent_pb2.TTS_RESPONSE,
+            tts_result=ace_agent_pb2.TTSResult(
+                latency_ms=config.tts_delay_ms, time_till_eos_ms=int(chunks * config.tts_chunk_ms)
+            ),
+        )
+        # The chunks are paced against the start of the audio, so that the jitter does not add up
+        start = time.monotonic()
+        interval = config.tts_chunk_ms / 1000 / config.tts_rate
+        for index in range(chunks):
+            await asyncio.sleep(max(start + index * interval + config.delay(0) - time.monotonic(), 0))
+            pipeline.publish_audio(
+                ace_agent_pb2.ReceiveAudioResponse(
+                    stream_id=pipeline.stream_id,
+                    audio_content=self.tts_chunk,
+                    encoding=ace_agent_pb2.LINEAR_PCM,
+                    sample_rate_hertz=config.tts_sample_rate,
+                    audio_channel_count=1,
+                    frame_size=2,
+                )
+            )
+        pipeline.set_state(ace_agent_pb2.IDLE)
+
+    async def subscribe(self, stream_id: str, queues_name: str, context):
+        pipeline = self.pipelines.get(stream_id)
+        if pipeline is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, f"No pipeline for stream {stream_id}")
+        queue = asyncio.Queue()
+        queues = getattr(pipeline, queues_name)
+        queues.append(queue)
+        try:
+            while True:
+                response = await queue.get()
+                if response is None:
+                    return
+                yield response
+        finally:
+            queues.remove(queue)
+
+    async def StreamSpeechResults(self, request, context):
+        async for response in self.subscribe(request.stream_id, "result_queues", context):
+            yield response
+
+    async def ReceiveAudio(self, request, context):
+        async for response in self.subscribe(request.stream_id, "audio_queues", context):
+            yield response
+
+
+async def start_mock_server(address: str = "0.0.0.0:50055", config: Optional[MockConfig] = None) -> grpc.aio.Server:
+    """
+    Start the mock server on the running event loop. Stop it with `await server.stop(None)`.
+    """
+    server = grpc.aio.server()
+    ace_agent_pb2_grpc.add_AceAgentGrpcServicer_to_server(MockAceAgentServicer(config or MockConfig()), server)
+    server.add_insecure_port(address)
+    await server.start()
+    return server
+
+
+async def main(args) -> None:
+    config = MockConfig(
+        max_pipelines=args.max_pipelines,
+        pipeline_ready_ms=args.pipeline_ready_ms,
+        silence_threshold=args.silence_threshold,
+        end_of_speech_ms=args.end_of_speech_ms,
+        partial_interval_ms=args.partial_interval_ms,
+        asr_delay_ms=args.asr_delay_ms,
+        chat_delay_ms=args.chat_delay_ms,
+        tts_delay_ms=args.tts_delay_ms,
+        jitter_ms=args.jitter_ms,
+        tts_sample_rate=args.tts_sample_rate,
+        tts_chunk_ms=args.tts_chunk_ms,
+        tts_ms_per_char=args.tts_ms_per_char,
+        tts_rate=args.tts_rate,
+    )
+    if args.script:
+        with open(args.script) as f:
+            config.script = json.load(f)
+
+    server = await start_mock_server(args.server, config)
+    print(f"Mock AceAgentGrpc server listening on {args.server}")
+    try:
+        await server.wait_for_termination()
+    finally:
+        await server.stop(None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock AceAgentGrpc Server")
+    parser.add_argument("--server", default="0.0.0.0:50055", type=str, help="Address the GRPC server listens on")
+    parser.add_argument(
+        "--script",
+        default=None,
+        type=str,
+        help='JSON file with a list of turns {"transcript": ..., "response": ...} that are used in turn per stream',
+    )
+    parser.add_argument("--max_pipelines", default=0, type=int, help="Maximum number of pipelines, 0 for no limit")
+    parser.add_argument("--pipeline_ready_ms", default=0, type=float, help="Time until a new pipeline is ready")
+    parser.add_argument("--silence_threshold", default=500, type=int, help="Peak amplitude of speech in the audio")
+    parser.add_argument("--end_of_speech_ms", default=300, type=float, help="Silence that ends the user turn")
+    parser.add_argument("--partial_interval_ms", default=200, type=float, help="Speech per partial transcript word")
+    parser.add_argument("--asr_delay_ms", default=100, type=float, help="Delay from end of speech to final transcript")
+    parser.add_argument("--chat_delay_ms", default=300, type=float, help="Delay from transcript to bot response")
+    parser.add_argument("--tts_delay_ms", default=100, type=float, help="Delay from bot response to TTS audio")
+    parser.add_argument("--jitter_ms", default=0, type=float, help="Random delay added to all delays and audio chunks")
+    parser.add_argument("--tts_sample_rate", default=16000, type=int, help="Sample rate of the TTS audio")
+    parser.add_argument("--tts_chunk_ms", default=100, type=float, help="Duration of a TTS audio chunk")
+    parser.add_argument("--tts_ms_per_char", default=60, type=float, help="TTS audio duration per response character")
+    parser.add_argument("--tts_rate", default=2.0, type=float, help="TTS audio delivery speed relative to real time")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        pass
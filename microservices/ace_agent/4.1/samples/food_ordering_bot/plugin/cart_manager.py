@@ -7,15 +7,13 @@
  distribution of this software and related documentation without an express
  license agreement from NVIDIA Corporation is strictly prohibited.
 """
-from dataclasses import asdict
 from typing import Any, Dict
 from uuid import uuid4
 import logging
 
 from data_format import *
-from menu_api import MenuDB
+from menu_api import get_menu_db
 
-menu_db = MenuDB()
 logger = logging.getLogger("plugin")
 
 
@@ -36,48 +34,34 @@ class CartManager:
         return 0
 
     def __get_menu_item_by_id(self, id_to_search):
-        return menu_db.get_item_from_id(id_to_search)
+        return get_menu_db().get_item_from_id(id_to_search)
 
     def __get_details_from_variation(self, menu_item, current_item):
-        item_desc = None
-        item_img_loc = None
-        item_size = None
-        item_calories = None
-        item_price = None
-        variations = None
-        for key, value in menu_item.items():
-            if key == "variations":
-                variations = value
-
-        print(variations, current_item)
-        for variation in variations:
-            if "is_default" in variation:
-                item_desc = variation["description"]
-                item_img_loc = variation["image"]
-                item_size = variation["size"]
-                item_calories = variation["calories"]
-                item_price = variation["price"]
+        # Description and image always come from the default variation
+        default_variation = get_menu_db().get_default_variation(menu_item["item_id"]) or {}
+        item_desc = default_variation.get("description")
+        item_img_loc = default_variation.get("image")
 
         if "size" not in current_item:
             return [
                 menu_item["name"],
                 item_img_loc,
-                item_size,
-                item_calories,
-                item_price,
+                default_variation.get("size"),
+                default_variation.get("calories"),
+                default_variation.get("price"),
                 item_desc,
             ]
 
-        for variation in variations:
-            if current_item["size"] == variation["size"]:
-                return [
-                    menu_item["name"],
-                    item_img_loc,
-                    variation["size"],
-                    variation["calories"],
-                    variation["price"],
-                    item_desc,
-                ]
+        variation = get_menu_db().get_variation(menu_item["item_id"], current_item["size"])
+        if variation is not None:
+            return [
+                menu_item["name"],
+                item_img_loc,
+                variation["size"],
+                variation["calories"],
+                variation["price"],
+                item_desc,
+            ]
 
     def __get_toppings_for_item_id(self, item_toppings):
         mesg = "Success"
@@ -101,41 +85,40 @@ class CartManager:
             )
         return toppings, mesg
 
-    def __update_total_bill_calories(self, uuid):
-        self._cart_table[uuid].total_bill = round(
-            sum(cart_item["price"] for cart_item in self._cart_table[uuid].items), 2
-        )
-
-        for item in self._cart_table[uuid].items:
-            print("Item is: {}".format(item))
+    def __update_total_bill_calories(self, uuid, price_change, calories_change):
+        """Update the totals of the cart with the change of a single cart line"""
+        cart = self._cart_table[uuid]
+        if not cart.lines:
+            # Same as the sum over the lines of an empty cart
+            cart.total_bill = 0
+            cart.total_calories = 0
+        else:
+            cart.total_bill = round(cart.total_bill + price_change, 2)
+            cart.total_calories = round(cart.total_calories + calories_change, 2)
 
-        self._cart_table[uuid].total_calories = round(
-            sum(cart_item["calories"] for cart_item in self._cart_table[uuid].items), 2
-        )
-
-        print(
-            "Updated total bill: {}, {}".format(
-                self._cart_table[uuid].total_bill, self._cart_table[uuid].total_calories
-            )
-        )
+        print("Updated total bill: {}, {}".format(cart.total_bill, cart.total_calories))
 
     def __fold_cart(self, uuid):
+        """
+        Merge cart lines which became the same item configuration, e.g. after their toppings changed.
+        The last of the similar lines keeps its position and absorbs the others.
+        """
         print("Trying to fold cart")
-        for i in range(len(self._cart_table[uuid].items) - 1, 0, -1):
-            for j in range(i - 1, -1, -1):
-                if self._cart_table[uuid].items[i] == self._cart_table[uuid].items[j]:
-                    print("Found similar items in pos {} and {}. Clubbing them into one.".format(i, j))
-                    self._cart_table[uuid].items[i].quantity += self._cart_table[uuid].items[j].quantity
-                    self._cart_table[uuid].items[i].price += self._cart_table[uuid].items[j].price
-                    self._cart_table[uuid].items[i].calories += self._cart_table[uuid].items[j].calories
-                    self._cart_table[uuid].items[j].item_id = -1
-
-        new_cart = Cart()
-        for item in self._cart_table[uuid].items:
-            if item.item_id != -1:
-                new_cart.items.append(item)
-        new_cart.total_bill = self._cart_table[uuid].total_bill
-        new_cart.total_calories = self._cart_table[uuid].total_calories
+        cart = self._cart_table[uuid]
+        folded = {}
+        for cart_item in reversed(cart.items):
+            key = cart_item.key
+            if key in folded:
+                print("Found similar items {}. Clubbing them into one.".format(key))
+                folded[key].quantity += cart_item.quantity
+                folded[key].price += cart_item.price
+                folded[key].calories += cart_item.calories
+            else:
+                folded[key] = cart_item
+
+        new_cart = Cart(cart.total_bill, cart.total_calories)
+        for cart_item in reversed(list(folded.values())):
+            new_cart.add_line(cart_item)
 
         self._cart_table[uuid] = new_cart
 
@@ -155,55 +138,52 @@ class CartManager:
             return mesg
         total_toppings_price = sum(top.price for top in added_toppings)
         total_toppings_calories = sum(top.calories for top in added_toppings)
+        topping_ids = tuple(sorted(top.item_id for top in added_toppings))
 
         # Logic to increase the count of item in cart,
         # if similar item config already present
-        for cart_item in self._cart_table[uuid].items:
-            if (
-                cart_item.item_id == item_to_add["item_id"]
-                and cart_item.toppings == added_toppings
-                and (
-                    cart_item.size == ""
-                    or item_to_add.get("size", None) is None
-                    or (cart_item.size != "" and cart_item.size == item_to_add["size"])
-                )
-            ):
+        for cart_item in self._cart_table[uuid].find_lines(item_to_add["item_id"], topping_ids):
+            if cart_item.size == "" or item_to_add.get("size", None) is None or cart_item.size == item_to_add["size"]:
                 # same item, increment the count instead.
                 cart_item.quantity += item_to_add["quantity"]
 
-                cart_item.price = round(
+                price = round(
                     cart_item.price + item_to_add["quantity"] * (item_price + total_toppings_price),
                     2,
                 )
-                cart_item.calories = round(
+                calories = round(
                     cart_item.calories + item_to_add["quantity"] * (item_calories + total_toppings_calories),
                     2,
                 )
-                self.__update_total_bill_calories(uuid)
+                self.__update_total_bill_calories(uuid, price - cart_item.price, calories - cart_item.calories)
+                cart_item.price = price
+                cart_item.calories = calories
                 print("Item already present. Updating count in cart.")
                 return
 
-        self._cart_table[uuid].items.append(
-            CartItem(
-                item_to_add["item_id"],
-                item_name,
-                added_toppings,
-                item_size,
-                round(
-                    item_to_add["quantity"] * (item_calories + total_toppings_calories),
-                    2,
-                ),
-                item_img_loc,
-                item_to_add["quantity"],
-                round(item_to_add["quantity"] * (item_price + total_toppings_price), 2),
-                item_desc,
-                menu_item["category"],
-                str(uuid4()),
-            )
+        cart_item = CartItem(
+            item_to_add["item_id"],
+            item_name,
+            added_toppings,
+            item_size,
+            round(
+                item_to_add["quantity"] * (item_calories + total_toppings_calories),
+                2,
+            ),
+            item_img_loc,
+            item_to_add["quantity"],
+            round(item_to_add["quantity"] * (item_price + total_toppings_price), 2),
+            item_desc,
+            menu_item["category"],
+            str(uuid4()),
         )
+        if not self._cart_table[uuid].lines:
+            # Start the totals from 0 like the sum over the lines
+            self._cart_table[uuid].total_bill = 0
+            self._cart_table[uuid].total_calories = 0
+        self._cart_table[uuid].add_line(cart_item)
 
-        self.__update_total_bill_calories(uuid)
-        self.__fold_cart(uuid)
+        self.__update_total_bill_calories(uuid, cart_item.price, cart_item.calories)
         return mesg
 
     def __add_item(self, session_id, item_to_add):
@@ -224,15 +204,15 @@ class CartManager:
         for item in items_to_add:
             mesg = self.__add_item(session_id, item)
             if mesg != "Success":
-                return 409, asdict(self._cart_table[session_id])
+                return 409, self._cart_table[session_id].asdict()
             print('item "{}" added to cart'.format(item))
 
-        return 200, asdict(self._cart_table.get(session_id))
+        return 200, self._cart_table[session_id].asdict()
 
     def items_in_cart(self, session_id):
         """List of items in cart for given session_id"""
         if session_id in self._cart_table:
-            return asdict(self._cart_table.get(session_id, {}))
+            return self._cart_table[session_id].asdict()
         return {}
 
     def __remove_from_cart(self, uuid, menu_item, item_to_remove):
@@ -242,28 +222,25 @@ class CartManager:
         _, _, _, item_calories, item_price, _ = self.__get_details_from_variation(menu_item, item_to_remove)
 
         removed_toppings, mesg = self.__get_toppings_for_item_id(item_to_remove["toppings"])
+        topping_ids = tuple(sorted(top.item_id for top in removed_toppings))
         print("Checking if item {} is present in the cart".format(item_to_remove))
-        for idx, cart_item in enumerate(self._cart_table[uuid].items):
-            if (
-                cart_item.item_id == item_to_remove["item_id"]
-                and ("toppings" not in item_to_remove or cart_item.toppings == removed_toppings)
-                and ("size" not in item_to_remove or cart_item.size.lower() == item_to_remove["size"].lower())
-            ):
+        for cart_item in self._cart_table[uuid].find_lines(item_to_remove["item_id"], topping_ids):
+            if "size" not in item_to_remove or cart_item.size.lower() == item_to_remove["size"].lower():
                 if cart_item.quantity >= item_to_remove["quantity"]:
                     cart_item.quantity -= item_to_remove["quantity"]
-                    total_toppings_price = 0
                     total_toppings_price = sum(top.price for top in removed_toppings)
                     total_toppings_calories = sum(top.calories for top in removed_toppings)
-                    cart_item.price = round(
-                        cart_item.price - item_to_remove["quantity"] * (item_price + total_toppings_price), 2
-                    )
-                    cart_item.calories = round(
+                    price = round(cart_item.price - item_to_remove["quantity"] * (item_price + total_toppings_price), 2)
+                    calories = round(
                         cart_item.calories - item_to_remove["quantity"] * (item_calories + total_toppings_calories), 2
                     )
-                    self.__update_total_bill_calories(uuid)
-
                     if cart_item.quantity == 0:
-                        self._cart_table[uuid].items.pop(idx)
+                        # The whole line leaves the cart, even if it was priced in another size
+                        self._cart_table[uuid].remove_line(cart_item.key)
+                        price = calories = 0
+                    self.__update_total_bill_calories(uuid, price - cart_item.price, calories - cart_item.calories)
+                    cart_item.price = price
+                    cart_item.calories = calories
                     logger.info("Item removed from the cart")
                     return True
 
@@ -277,7 +254,6 @@ class CartManager:
         if menu_item_by_id == None:
             return "Could not find the item on the menu", False
         is_item_removed = self.__remove_from_cart(uuid, menu_item_by_id, item_to_remove)
-        self.__fold_cart(uuid)
         return mesg, is_item_removed
 
     def cart_items_delete(self, session_id, req):
@@ -340,13 +316,18 @@ class CartManager:
             ):
                 cart_item.toppings.extend(toppings_to_add)
                 # total_toppings_price = sum(top.price for top in toppings_to_add)
-                cart_item.price = round(cart_item.price + cart_item.quantity * total_toppings_price, 2)
-                cart_item.calories = round(cart_item.calories + cart_item.quantity * total_toppings_calories, 2)
-                self.__update_total_bill_calories(uuid)
+                price = round(cart_item.price + cart_item.quantity * total_toppings_price, 2)
+                calories = round(cart_item.calories + cart_item.quantity * total_toppings_calories, 2)
+                self.__update_total_bill_calories(uuid, price - cart_item.price, calories - cart_item.calories)
+                cart_item.price = price
+                cart_item.calories = calories
                 match_found = True
 
         if not match_found:
             mesg = "Topping could not be added. Check if the requested item is in the cart."
+        else:
+            # The keys of the changed lines include their toppings
+            self.__fold_cart(uuid)
 
         return mesg
 
@@ -395,12 +376,12 @@ class CartManager:
                 for topping in toppings_to_remove:
                     if topping in cart_item.toppings:
                         cart_item.toppings.remove(topping)
-                        cart_item.price = round(cart_item.price - cart_item.quantity * topping.price, 2)
-                        cart_item.calories = round(
-                            cart_item.calories - cart_item.quantity * total_toppings_calories, 2
-                        )
+                        price = round(cart_item.price - cart_item.quantity * topping.price, 2)
+                        calories = round(cart_item.calories - cart_item.quantity * total_toppings_calories, 2)
+                        self.__update_total_bill_calories(uuid, price - cart_item.price, calories - cart_item.calories)
+                        cart_item.price = price
+                        cart_item.calories = calories
 
-        self.__update_total_bill_calories(uuid)
         self.__fold_cart(uuid)
         return mesg
 
@@ -474,10 +455,10 @@ class CartManager:
 
         for cart_item in self._cart_table[session_id].items:
             if cart_item_id == cart_item["cart_item_id"]:
-                self._cart_table[session_id].items.remove(cart_item)
+                self._cart_table[session_id].remove_line(cart_item.key)
                 STATUS = 200
                 MESG = "Success"
-                self.__update_total_bill_calories(session_id)
+                self.__update_total_bill_calories(session_id, -cart_item.price, -cart_item.calories)
                 return STATUS, MESG
 
             else:
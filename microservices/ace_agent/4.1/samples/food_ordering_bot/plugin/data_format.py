@@ -99,14 +99,44 @@ class UserData:
 @dataclass
 class Cart:
     """Cart dataclass for storing all the information
-    pertaining to an order per user per session"""
+    pertaining to an order per user per session.
+    Cart lines are stored in order by their CartItem.key, so every
+    item configuration is a single line"""
 
     total_bill: float = 0.0
     total_calories: float = 0.0
-    items: List["CartItem"] = field(default_factory=lambda: [])
+    lines: Dict[Tuple[str, str, Tuple[str, ...]], "CartItem"] = field(default_factory=lambda: {})
+    # Keys of the lines per item id and toppings in cart order, to find an item in any size
+    variants: Dict[Tuple[str, Tuple[str, ...]], Dict[Tuple[str, str, Tuple[str, ...]], None]] = field(
+        default_factory=lambda: {}, repr=False
+    )
+
+    @property
+    def items(self) -> List["CartItem"]:
+        return list(self.lines.values())
+
+    def add_line(self, item: "CartItem") -> None:
+        key = item.key
+        self.lines[key] = item
+        self.variants.setdefault((key[0], key[2]), {})[key] = None
+
+    def remove_line(self, key: Tuple[str, str, Tuple[str, ...]]) -> None:
+        del self.lines[key]
+        variants = self.variants[(key[0], key[2])]
+        del variants[key]
+        if not variants:
+            del self.variants[(key[0], key[2])]
+
+    def find_lines(self, item_id: str, topping_ids: Tuple[str, ...]) -> List["CartItem"]:
+        """Lines of the item with the given sorted topping ids in any size, in cart order"""
+        return [self.lines[key] for key in self.variants.get((item_id, topping_ids), ())]
 
     def asdict(self):
-        return asdict(self)
+        return {
+            "total_bill": self.total_bill,
+            "total_calories": self.total_calories,
+            "items": [asdict(item) for item in self.lines.values()],
+        }
 
 
 @dataclass
@@ -147,6 +177,11 @@ class CartItem:
     category: str = ""
     cart_item_id: str = ""
 
+    @property
+    def key(self) -> Tuple[str, str, Tuple[str, ...]]:
+        """Canonical key of the item configuration: item id, size and sorted topping ids"""
+        return (self.item_id, self.size, tuple(sorted(topping.item_id for topping in self.toppings)))
+
     def __getitem__(self, item):
         return getattr(self, item)
 
@@ -9,112 +9,381 @@
 """
 
 import json
+import logging
 import os
+import pickle
 import re
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
 
-from tinydb import Query, TinyDB
+try:
+    from tinydb import TinyDB
+except ImportError:
+    TinyDB = None
+
+from name_index import FuzzyNameIndex
+
+MENU_API = os.path.join(os.path.dirname(os.path.abspath(__file__)), "all_gtc_items_with_diff_sizes_v3.json")
+
+# Fields of the menu items with a hash index
+INDEXED_FIELDS = ("item_id", "name", "category", "menu_item")
+
+# Categories of the menu items that can be ordered by name
+ORDERABLE_CATEGORIES = ("sides", "drinks", "salads", "entrees")
+
+logger = logging.getLogger("plugin")
+
+_menu_db = None
+_menu_db_lock = threading.Lock()
+
+
+def load_menu_items(path: str, cache_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Load the menu items from the JSON file. If a cache path is given, the parsed items are pickled there and loaded
+    from the cache as long as the JSON file did not change. The cache is best-effort, any error reading or writing
+    it is logged and the items are loaded from the JSON file.
+    """
+    stat = os.stat(path)
+    version = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if cache_path:
+        try:
+            with open(cache_path, "rb") as f:
+                cached_version, items = pickle.load(f)
+            if cached_version == version:
+                return items
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring the menu cache {cache_path}: {e}")
+
+    with open(path) as f:
+        items = json.load(f)
+
+    if cache_path:
+        # Write to a temporary file first, so that workers sharing the cache never read a partial file
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump((version, items), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Could not write the menu cache {cache_path}: {e}")
+            Path(tmp_path).unlink(missing_ok=True)
+    return items
+
+
+def get_menu_db() -> "MenuDB":
+    """
+    Return the menu database shared by all plugin modules of the process. It is created on first use.
+    """
+    global _menu_db
+    if _menu_db is None:
+        with _menu_db_lock:
+            if _menu_db is None:
+                _menu_db = MenuDB()
+    return _menu_db
+
+
+class MenuStore:
+    """
+    Immutable in-memory menu with hash indexes on the INDEXED_FIELDS and a map from size to variation per item.
+    Besides the items, the indexes also store the positions of the items in the menu for the filter planner.
+    The menu items are shared between all callers and must not be modified.
+    """
+
+    __slots__ = (
+        "items",
+        "indexes",
+        "positions",
+        "field_positions",
+        "all_positions",
+        "variations",
+        "default_variations",
+    )
+
+    def __init__(self, items: List[Dict[str, Any]]) -> None:
+        self.items = tuple(items)
+        positions = {field: {} for field in INDEXED_FIELDS}
+        variations = {}
+        default_variations = {}
+        for position, item in enumerate(self.items):
+            for field, index in positions.items():
+                if field in item:
+                    index.setdefault(item[field], []).append(position)
+            item_variations = {}
+            for variation in item.get("variations", []):
+                item_variations.setdefault(variation.get("size"), variation)
+                if "is_default" in variation:
+                    default_variations[item["item_id"]] = variation
+            variations.setdefault(item["item_id"], MappingProxyType(item_variations))
+
+        self.positions = MappingProxyType(
+            {
+                field: MappingProxyType({key: frozenset(values) for key, values in index.items()})
+                for field, index in positions.items()
+            }
+        )
+        self.indexes = MappingProxyType(
+            {
+                field: MappingProxyType(
+                    {key: tuple(self.items[i] for i in sorted(values)) for key, values in index.items()}
+                )
+                for field, index in self.positions.items()
+            }
+        )
+        self.field_positions = MappingProxyType(
+            {field: frozenset().union(*index.values()) for field, index in self.positions.items()}
+        )
+        self.all_positions = frozenset(range(len(self.items)))
+        self.variations = MappingProxyType(variations)
+        self.default_variations = MappingProxyType(default_variations)
+
+    @classmethod
+    def from_json(cls, path: str, cache_path: Optional[str] = None) -> "MenuStore":
+        return cls(load_menu_items(path, cache_path))
+
+    def lookup(self, field: str, value: Any) -> Tuple[Dict[str, Any], ...]:
+        """Return all items with the given value of an indexed field"""
+        try:
+            return self.indexes[field].get(value, ())
+        except TypeError:
+            # Unhashable values never match
+            return ()
+
+    def lookup_positions(self, field: str, value: Any) -> FrozenSet[int]:
+        """Return the positions of all items with the given value of an indexed field"""
+        try:
+            return self.positions[field].get(value, frozenset())
+        except TypeError:
+            return frozenset()
+
+
+@lru_cache(maxsize=256)
+def _compile_regex(text: str) -> "re.Pattern":
+    try:
+        return re.compile(r"(?i)\b" + text.replace("regex:", "").strip() + r"\b")
+    except Exception:
+        raise ValueError("Invalid regular expression: {}".format(text))
+
+
+def _is_regex(text: Any) -> bool:
+    if isinstance(text, (int, float)):
+        return False
+    return text.startswith("regex:")
+
+
+class IndexCondition:
+    """
+    `eq` or `ne` of a plain value on an indexed field, answered with set operations on the index positions
+    """
+
+    __slots__ = ("matches", "field_positions", "negated")
+    cost = 0
+
+    def __init__(self, store: MenuStore, field: str, value: Any, negated: bool) -> None:
+        self.matches = store.lookup_positions(field, value)
+        self.field_positions = store.field_positions[field]
+        self.negated = negated
+
+    def select(self, store: MenuStore, candidates: FrozenSet[int]) -> FrozenSet[int]:
+        if self.negated:
+            # Like TinyDB, items without the field are not unequal
+            return (candidates & self.field_positions) - self.matches
+        return candidates & self.matches
+
+
+class PredicateCondition:
+    """
+    Any other condition, evaluated item by item on the candidates only
+    """
+
+    __slots__ = ("predicate",)
+    cost = 1
+
+    def __init__(self, predicate: Callable[[Dict[str, Any]], bool]) -> None:
+        self.predicate = predicate
+
+    def select(self, store: MenuStore, candidates: FrozenSet[int]) -> FrozenSet[int]:
+        items = store.items
+        predicate = self.predicate
+        return frozenset(i for i in candidates if predicate(items[i]))
+
+
+def compile_condition(store: MenuStore, field: str, value: Any, op: str, is_list: bool):
+    """
+    Compile a single filter into an index lookup if possible, else into a predicate on the items
+    """
+    if op not in ("eq", "ne"):
+        raise ValueError("Invalid condition: {}".format(op))
+    is_regex = _is_regex(value)
+    if field in INDEXED_FIELDS and not is_list and not is_regex:
+        return IndexCondition(store, field, value, negated=op == "ne")
+
+    if is_regex:
+        pattern = _compile_regex(f"{value}")
+        if is_list:
+            match = lambda x: any(pattern.search(item) for item in x)
+        else:
+            match = lambda x: MenuDB.regex_match(x, pattern)
+    elif is_list:
+        # Same as TinyDB `any`, elements of the field are matched with the `in` operator
+        match = lambda x: any(item in value for item in x)
+    else:
+        match = lambda x: x == value
+
+    def condition(item):
+        return field in item and match(item[field])
+
+    if op == "eq":
+        return PredicateCondition(condition)
+    if is_list or is_regex:
+        return PredicateCondition(lambda item: not condition(item))
+    # Like TinyDB, items without the field are not unequal
+    return PredicateCondition(lambda item: field in item and item[field] != value)
+
+
+def plan_filters(steps: List[Tuple[str, Any]]) -> List[Tuple[str, Any]]:
+    """
+    Order the conditions of a filter for evaluation. The filters are combined from left to right, so the order of
+    consecutive `and` conditions does not matter and index lookups are moved before the predicates to narrow
+    the candidates first.
+    """
+    plan = []
+    run = []
+    for logical_op, condition in steps:
+        if logical_op not in ("and", "or"):
+            # Starts a new query, the previous conditions are not evaluated
+            plan = []
+            run = []
+        elif logical_op == "and" and plan:
+            run.append((logical_op, condition))
+            continue
+        plan.extend(sorted(run, key=lambda step: step[1].cost))
+        run = []
+        plan.append((logical_op, condition))
+    plan.extend(sorted(run, key=lambda step: step[1].cost))
+    return plan
 
 
 class MenuDB:
-    def __init__(self) -> None:
-        """Create a menu database using TinyDB and store all the menu items in database"""
-        self.db = self._create_db()
+    def __init__(self, database_path: Optional[str] = None, cache_path: Optional[str] = None) -> None:
+        """
+        Load all the menu items into an in-memory menu store. Use `get_menu_db` to share a single instance.
+        If database_path or the MENU_DATABASE_PATH environment variable is set, the menu is also persisted to
+        a TinyDB database at that path. If cache_path or MENU_CACHE_PATH is set, the parsed menu is cached there.
+        """
+        self.store = MenuStore.from_json(MENU_API, cache_path or os.getenv("MENU_CACHE_PATH"))
+        database_path = database_path or os.getenv("MENU_DATABASE_PATH")
+        self.db = self._create_db(database_path) if database_path else None
         self._sample_value = self.get_item_from_id("25")
+        self._cached_query = lru_cache(maxsize=1024)(self._run_query)
+        self._name_index = (None, None)
 
-    def _create_db(self) -> TinyDB:
+    def _create_db(self, database_path: str) -> "TinyDB":
         """Initialize database and add menu items into database"""
-        DATABASE = "database.json"
-        MENU_API = os.path.join(os.path.dirname(os.path.abspath(__file__)), "all_gtc_items_with_diff_sizes_v3.json")
+        if TinyDB is None:
+            raise ImportError("Persisting the menu requires tinydb. Install it with `pip install tinydb`.")
 
         # Remove older database
-        Path(DATABASE).unlink(missing_ok=True)
+        Path(database_path).unlink(missing_ok=True)
         # Create database object
-        db = TinyDB(DATABASE)
-
-        # load the food items json file
-        with open(MENU_API) as f:
-            data = json.load(f)
+        db = TinyDB(database_path)
 
         # Insert the menu data into the database
-        db.insert_multiple(data)
+        db.insert_multiple(self.store.items)
         return db
 
     def get_all_menu_item(self) -> List[Dict[str, Any]]:
         """Return all the items in the menu"""
-        return self.db.all()
+        return list(self.store.items)
 
     def get_item_from_id(self, id: str) -> Optional[Dict[str, Any]]:
-        query = Query()
-        res = self.db.search(query.item_id == id)
+        res = self.store.lookup("item_id", id)
         if len(res) >= 1:
             return res[0]
         return None
 
-    def filter_query(self, filters):
-        def _is_regex(text):
-            if isinstance(text, (int, float)):
-                return False
-            return text.startswith("regex:")
+    def get_items_by_name(self, name: str) -> Tuple[Dict[str, Any], ...]:
+        return self.store.lookup("name", name)
 
-        def _compile_regex(text):
-            try:
-                return re.compile(r"(?i)\b" + text.replace("regex:", "").strip() + r"\b")
-            except Exception:
-                raise ValueError("Invalid regular expression: {}".format(text))
-
-        def comparison_op(field, value, op):
-            query = Query()
-
-            field_type = self._sample_value.get(field)
-            is_regex = False
-            if _is_regex(value):
-                value = _compile_regex(f"{value}")
-                is_regex = True
-
-            if op == "eq":
-                if isinstance(field_type, list):
-                    if is_regex:
-                        return getattr(query, field).test(lambda x: any(re.search(value, item) for item in x))
-                    query = getattr(query, field).any(value)
-                else:
-                    if is_regex:
-                        return getattr(query, field).test(MenuDB.regex_match, value)
-                    query = getattr(query, field) == value
-            elif op == "ne":
-                if isinstance(field_type, list):
-                    if is_regex:
-                        return ~getattr(query, field).test(lambda x: any(re.search(value, item) for item in x))
-                    query = ~getattr(query, field).any(value)
-                else:
-                    if is_regex:
-                        return ~getattr(query, field).test(MenuDB.regex_match, value)
-                    query = getattr(query, field) != value
-            return query
-
-        logical_ops = {"and": "&", "or": "|"}
-        query = Query()
+    def get_items_by_category(self, category: str) -> Tuple[Dict[str, Any], ...]:
+        return self.store.lookup("category", category)
+
+    def get_menu_items(self) -> Tuple[Dict[str, Any], ...]:
+        """Return the items that can be ordered on their own, excluding toppings and ingredients"""
+        return self.store.lookup("menu_item", True)
+
+    def get_orderable_names(self) -> List[str]:
+        """Return the names of the menu items in the ORDERABLE_CATEGORIES, in menu order"""
+        return [
+            item.get("name", "") for item in self.get_menu_items() if item.get("category", "") in ORDERABLE_CATEGORIES
+        ]
+
+    def get_name_index(self) -> FuzzyNameIndex:
+        """
+        Return the fuzzy index over the orderable names. It is built on first use and only rebuilt when the menu
+        store is replaced.
+        """
+        store, index = self._name_index
+        if store is not self.store:
+            store = self.store
+            index = FuzzyNameIndex(self.get_orderable_names())
+            self._name_index = (store, index)
+        return index
+
+    def get_variation(self, id: str, size: str) -> Optional[Dict[str, Any]]:
+        """Return the variation of an item for the given size"""
+        return self.store.variations.get(id, {}).get(size)
+
+    def get_default_variation(self, id: str) -> Optional[Dict[str, Any]]:
+        return self.store.default_variations.get(id)
+
+    def filter_query(self, filters):
+        """
+        Return the items matching the filters. The filters are combined from left to right with their logical
+        operator, a filter without `and` or `or` starts a new query. As with the TinyDB query this replaces, no items
+        are returned if the query starts with `and` or `or` (there is nothing to combine the filter with).
+        Results are memoized per filter spec, since the menu does not change.
+        """
         try:
-            for i, filter in enumerate(filters):
-                logical_op = logical_ops.get(filter.get("logical", ""), "")
-                value = filter["values"]
-                comp = filter["condition"]
-                field = filter["field"]
-
-                if logical_op == "&":
-                    query = query & comparison_op(field, value, comp)
-                elif logical_op == "|":
-                    query = query | comparison_op(field, value, comp)
-                else:
-                    query = comparison_op(field, value, comp)
-
-            result = self.db.search(query)
-            return {"items": result}
+            # The type is part of the key, so that e.g. 1 and True are not answered from the same entry
+            key = tuple(
+                (f["field"], f["values"], type(f["values"]), f["condition"], f.get("logical", "")) for f in filters
+            )
+            try:
+                items = self._cached_query(key)
+            except TypeError:
+                # Unhashable filter values can not be memoized
+                items = self._run_query(key)
+            return {"items": list(items)}
         except Exception as e:
             print(f"Exception {e} while building response")
             return {"items": []}
 
+    def _run_query(self, key: Iterable[Tuple[str, Any, type, str, str]]) -> Tuple[Dict[str, Any], ...]:
+        store = self.store
+        steps = []
+        for field, value, _, op, logical_op in key:
+            is_list = isinstance(self._sample_value.get(field), list)
+            steps.append((logical_op, compile_condition(store, field, value, op, is_list)))
+
+        plan = plan_filters(steps)
+        if not plan or plan[0][0] in ("and", "or"):
+            return ()
+
+        result = None
+        for logical_op, condition in plan:
+            if result is not None and logical_op == "and":
+                result = condition.select(store, result)
+            elif result is not None and logical_op == "or":
+                result = result | condition.select(store, store.all_positions - result)
+            else:
+                result = condition.select(store, store.all_positions)
+        return tuple(store.items[i] for i in sorted(result))
+
     @staticmethod
     def regex_match(query, pattern):
         return re.search(pattern, query) is not None
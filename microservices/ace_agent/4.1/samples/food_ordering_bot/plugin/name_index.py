@@ -0,0 +1,139 @@
+"""
+ copyright(c) 2023 NVIDIA Corporation.All rights reserved.
+
+ NVIDIA Corporation and its licensors retain all intellectual property
+ and proprietary rights in and to this software, related documentation
+ and any modifications thereto.Any use, reproduction, disclosure or
+ distribution of this software and related documentation without an express
+ license agreement from NVIDIA Corporation is strictly prohibited.
+"""
+
+"""Fuzzy index over menu item names to match food names with ASR errors"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import editdistance
+
+NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+# Rewrite rules for a simplified phonetic code, applied in order
+PHONETIC_RULES = (
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"ck"), "k"),
+    (re.compile(r"^kn"), "n"),
+    (re.compile(r"^wr"), "r"),
+    (re.compile(r"wh"), "w"),
+    (re.compile(r"dg(?=[eiy])"), "j"),
+    (re.compile(r"c(?=[eiy])"), "s"),
+    (re.compile(r"[cq]"), "k"),
+    (re.compile(r"x"), "ks"),
+    (re.compile(r"z"), "s"),
+    (re.compile(r"gh"), "g"),
+    (re.compile(r"(?<=.)[aeiouy]+"), ""),
+    (re.compile(r"(.)\1+"), r"\1"),
+    # Plural forms sound the same as singular ones for matching
+    (re.compile(r"(?<=.)s$"), ""),
+)
+
+
+def normalize_name(text: Optional[str]) -> str:
+    """Lower case the text and replace punctuation and repeated whitespace with a single space"""
+    if not text:
+        return ""
+    return NON_ALPHANUMERIC.sub(" ", str(text).lower()).strip()
+
+
+def compact_name(text: Optional[str]) -> str:
+    """Normalized text without spaces, so that words split or joined by ASR still match, e.g. cheese burger"""
+    return normalize_name(text).replace(" ", "")
+
+
+def phonetic_key(text: Optional[str]) -> str:
+    """Simplified phonetic code of the compact text, e.g. kola and cola or lemon aid and lemonade have the same key"""
+    key = compact_name(text)
+    for pattern, replacement in PHONETIC_RULES:
+        key = pattern.sub(replacement, key)
+    return key
+
+
+def deletes(word: str, max_distance: int) -> Set[str]:
+    """All variants of the word with up to max_distance characters deleted, including the word itself"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1 :] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+class FuzzyNameIndex:
+    """
+    Symmetric delete index over names (as used by SymSpell). Every name is stored under all variants with up to
+    max_distance characters deleted, so candidates within an edit distance are found with a few hash lookups instead
+    of comparing the query with every name. Names with the same phonetic key are matched as well, with one edit
+    more than max_distance as long as it is at most a quarter of the name, since the key ignores the vowels.
+
+    >>> FuzzyNameIndex(["lemonade", "cola"]).best_match("lemon aid")
+    'lemonade'
+    >>> FuzzyNameIndex(["pasta", "cake"]).best_match("pesto") is None
+    True
+    >>> FuzzyNameIndex(["pasta", "cake"]).best_match("cookie") is None
+    True
+    """
+
+    def __init__(self, names: Iterable[str], max_distance: int = 2) -> None:
+        self.max_distance = max_distance
+        self.names: List[str] = []
+        self.compact_names: List[str] = []
+        self.phonetic_keys: List[str] = []
+        self._deletes: Dict[str, List[int]] = {}
+        self._phonetic: Dict[str, List[int]] = {}
+
+        for name in dict.fromkeys(names):
+            compact = compact_name(name)
+            if not compact:
+                continue
+            position = len(self.names)
+            self.names.append(name)
+            self.compact_names.append(compact)
+            self.phonetic_keys.append(phonetic_key(name))
+            for variant in deletes(compact, max_distance):
+                self._deletes.setdefault(variant, []).append(position)
+            self._phonetic.setdefault(self.phonetic_keys[-1], []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def match(self, text: Optional[str], max_distance: int = 1, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Return the names within max_distance edits of the text, or max_distance + 1 edits (but at most a quarter of
+        the text) with the same phonetic key, as (name, distance). The best match comes first: ordered by edit
+        distance, then matching phonetic key, then the order of the names.
+        """
+        if max_distance > self.max_distance:
+            raise ValueError(f"Index supports a maximum edit distance of {self.max_distance}, got {max_distance}")
+        compact = compact_name(text)
+        if not compact:
+            return []
+
+        key = phonetic_key(text)
+        max_phonetic_distance = min(max_distance + 1, len(compact) // 4)
+        candidates = set(self._phonetic.get(key, ()))
+        for variant in deletes(compact, max_distance):
+            candidates.update(self._deletes.get(variant, ()))
+
+        ranked = []
+        for position in candidates:
+            distance = editdistance.eval(compact, self.compact_names[position])
+            same_sound = self.phonetic_keys[position] == key
+            if distance <= max_distance or (same_sound and distance <= max_phonetic_distance):
+                exact = self.names[position] == text
+                ranked.append(((distance, not exact, not same_sound, position), self.names[position], distance))
+        ranked.sort()
+        return [(name, distance) for _, name, distance in ranked[:limit]]
+
+    def best_match(self, text: Optional[str], max_distance: int = 1) -> Optional[str]:
+        """Return the best matching name, None if no name is similar enough"""
+        matches = self.match(text, max_distance, limit=1)
+        return matches[0][0] if matches else None
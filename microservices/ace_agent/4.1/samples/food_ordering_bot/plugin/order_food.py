@@ -18,58 +18,37 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter
 from word2number import w2n
-import editdistance
 
 from cart_manager import CartManager
-from menu_api import MenuDB
+from menu_api import get_menu_db
 
 router = APIRouter()
 logger = logging.getLogger("plugin")
 
-# Initialize cart manager and menu database
-menudb = MenuDB()
+# Initialize cart manager, the menu database is shared and created on first use
 cart_manager = CartManager()
 
-
-def find_similar_item(input_food, food_list):
-    """Return first item from the cart within editdistance of 1"""
-
-    threshold = 1  # Set the threshold for edit distance
-
-    for food_item in food_list:
-        distance = editdistance.eval(input_food, food_item)
-        if distance <= threshold:
-            return food_item
-
-    return None  # No matching item found
+# Maximum edit distance between a food name and the name of the menu item it is matched with
+MAX_NAME_DISTANCE = 1
 
 
 def get_item_from_menu(food_item: str, food_size: Optional[str] = ""):
     """fetch item details from menu database"""
 
-    # Get all items from the menu
-    items_in_menu = menudb.get_all_menu_item()
-    food_list = []
-    for item in items_in_menu:
-        if item.get("category", "") in ["sides", "drinks", "salads", "entrees"] and item.get("menu_item", False):
-            food_list.append(item.get("name", ""))
-
-    # if food item is not in the menu, check if it's in editdistance of 1 with any menu item
-    if food_item not in food_list:
-        logger.info(f"{food_item} not found in the menu, finding item 1 editdistance from the menu")
-        food_name = find_similar_item(food_item, food_list)
-        if food_name:
-            logger.info(f"Replacing {food_item} with {food_name} for furthur operation")
-            food_item = food_name
-        else:
-            logger.info(f"No similar item to {food_item} found in the menu")
-            # If not match found
-            return []
+    # If food item is not in the menu, use the closest menu item within editdistance of 1 or with the same sound
+    food_name = get_menu_db().get_name_index().best_match(food_item, max_distance=MAX_NAME_DISTANCE)
+    if food_name is None:
+        logger.info(f"No similar item to {food_item} found in the menu")
+        # If not match found
+        return []
+    if food_name != food_item:
+        logger.info(f"Replacing {food_item} with {food_name} for furthur operation")
+        food_item = food_name
 
     # Query to DB to check if food item is present in menu
     query = [{"field": "name", "values": food_item, "condition": "eq"}]
 
-    resp_db = menudb.filter_query(query)
+    resp_db = get_menu_db().filter_query(query)
     result = []
     if food_size:
         for r in resp_db.get("items", []):
@@ -381,11 +360,7 @@ def show_menu() -> str:
     """returns all the itmes in the menu"""
     try:
         logger.info(f"Showing menu items")
-        items = menudb.get_all_menu_item()
-        menu = []
-        for item in items:
-            if item.get("category", "") in ["sides", "drinks", "salads", "entrees"] and item.get("menu_item", False):
-                menu.append(item.get("name", ""))
+        menu = get_menu_db().get_orderable_names()
         logger.info(f"Items in menu: {' '.join(menu)}")
         return " ".join(menu)
     except Exception as e: